@@ -0,0 +1,58 @@
+TEXT_FIELDS = ["proje_amaci", "proje_ozeti", "genel_degerlendirme"]
+LIST_FIELDS = ["kullanilan_teknolojiler", "guclu_yonler", "iyilestirme_alanlari",
+               "guvenlik_onerileri", "performans_onerileri"]
+PLACEHOLDERS = {"Analiz tamamlanıyor...", "Belirlenemedi"}
+
+def merge_analyses(analyses, labels=None, max_examples=10):
+    """Birden fazla kısmi analizi aynı ANALYSIS_TEMPLATE şemasında tek rapora birleştirir"""
+    labels = labels or [None] * len(analyses)
+    merged = {}
+
+    # Metin alanları: her parçanın değerini (varsa etiketiyle) alt alta ekle
+    for field in TEXT_FIELDS:
+        parts = []
+        seen = set()
+        for label, analysis in zip(labels, analyses):
+            text = str(analysis.get(field) or '').strip()
+            if not text or text in PLACEHOLDERS or text in seen:
+                continue
+            seen.add(text)
+            parts.append(f"**{label}:** {text}" if label else text)
+        merged[field] = '\n\n'.join(parts) or "Analiz tamamlanıyor..."
+
+    # Liste alanları: sırayı koruyarak tekrarları ayıkla
+    for field in LIST_FIELDS:
+        items = []
+        seen = set()
+        for analysis in analyses:
+            for item in analysis.get(field) or []:
+                key = str(item).strip().lower()
+                if not key or str(item) in PLACEHOLDERS or key in seen:
+                    continue
+                seen.add(key)
+                items.append(item)
+        merged[field] = items or ["Analiz tamamlanıyor..."]
+
+    # Kod örnekleri: aynı kodu içerenleri bir kez al
+    examples = []
+    seen = set()
+    for label, analysis in zip(labels, analyses):
+        for example in analysis.get('kod_ornekleri') or []:
+            if not isinstance(example, dict) or 'kod' not in example:
+                continue
+            # LLM "kod" alanını null veya liste olarak da döndürebilir
+            code = str(example['kod'] or '')
+            key = code.strip()
+            if not key or key in seen or code == "# Örnek kod hazırlanıyor":
+                continue
+            seen.add(key)
+            description = example.get('aciklama', '')
+            if label:
+                description = f"({label}) {description}"
+            examples.append({"aciklama": description, "kod": code})
+    merged['kod_ornekleri'] = examples[:max_examples] or [{
+        "aciklama": "Kod önerisi hazırlanıyor...",
+        "kod": "# Örnek kod hazırlanıyor"
+    }]
+
+    return merged
@@ -0,0 +1,82 @@
+from analyzers.prompt_builder import count_tokens, truncate_to_tokens
+from config.settings import (
+    CHAT_MEMORY_RECENT_TURNS,
+    CHAT_MEMORY_MAX_TURNS,
+    CHAT_MEMORY_TOKEN_BUDGET,
+    CHAT_MEMORY_TURN_TOKENS,
+    CHAT_SUMMARY_MAX_TOKENS
+)
+
+SUMMARY_ROLE = "Sen bir kod inceleme sohbetinin notlarını tutan bir asistansın."
+
+SUMMARY_REQUEST = f"""Aşağıda bir kod inceleme sohbetinin şimdiye kadarki özeti ve özete henüz girmemiş mesajlar var.
+Özeti bu mesajlarla güncelle: kullanıcının amacını, sorduğu konuları, verilen önemli cevapları, önerilen
+kod değişikliklerini ve kullanıcının kabul ettiği veya reddettiği kararları koru; selamlaşma ve tekrarları at.
+Sadece güncellenmiş özeti düz metin olarak yaz, en fazla {CHAT_SUMMARY_MAX_TOKENS * 3 // 4} kelime."""
+
+class ChatMemory:
+    def __init__(self, recent_turns=CHAT_MEMORY_RECENT_TURNS, max_turns=CHAT_MEMORY_MAX_TURNS,
+                 token_budget=CHAT_MEMORY_TOKEN_BUDGET, turn_tokens=CHAT_MEMORY_TURN_TOKENS,
+                 summary_tokens=CHAT_SUMMARY_MAX_TOKENS):
+        """Last turns verbatim plus a rolling summary of older ones, within a fixed token budget.
+
+        Unsummarized turns accumulate up to max_turns; then all but the last recent_turns are folded
+        into the summary, so a summary request is sent every (max_turns - recent_turns + 1) turns.
+        """
+        self.recent_turns = recent_turns
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.turn_tokens = turn_tokens
+        self.summary_tokens = summary_tokens
+
+    def _truncate(self, text, max_tokens):
+        if count_tokens(text) <= max_tokens:
+            return text
+        return truncate_to_tokens(text, max_tokens - 1) + ' …'
+
+    def build(self, memory):
+        """Cap a stored memory (ChatHistory.get_chat_memory) to the token budget.
+
+        Returns {'summary', 'turns': [(message, response), ...]} with the oldest turn first;
+        the newest turns are kept when the budget runs out.
+        """
+        summary = self._truncate(memory['summary'], self.summary_tokens) if memory['summary'] else ''
+        budget = self.token_budget - count_tokens(summary)
+
+        turns = []
+        for turn in reversed(memory['turns'][-self.max_turns:]):
+            message = self._truncate(turn['message'], self.turn_tokens)
+            response = self._truncate(turn['response'], self.turn_tokens)
+            cost = count_tokens(message) + count_tokens(response)
+            if cost > budget:
+                break
+            turns.append((message, response))
+            budget -= cost
+
+        turns.reverse()
+        return {'summary': summary, 'turns': turns}
+
+    def needs_fold(self, unsummarized_turns):
+        """Check whether this many unsummarized turns should be folded into the summary"""
+        return unsummarized_turns > self.max_turns
+
+    def turns_to_fold(self, memory):
+        """Unsummarized turns that leave the verbatim window, oldest first"""
+        if not self.needs_fold(len(memory['turns'])):
+            return []
+        return memory['turns'][:-self.recent_turns] if self.recent_turns else memory['turns']
+
+    def summary_prompt(self, summary, turns):
+        """Prompt that folds turns into the previous summary"""
+        return {
+            'system': SUMMARY_ROLE,
+            'user': f"{SUMMARY_REQUEST}\n\n# Önceki Özet\n{summary or '(henüz yok)'}\n\n# Yeni Mesajlar\n"
+                    + self.format_turns([(self._truncate(turn['message'], self.turn_tokens),
+                                          self._truncate(turn['response'], self.turn_tokens))
+                                         for turn in turns])
+        }
+
+    @staticmethod
+    def format_turns(turns):
+        """Plain-text transcript of (message, response) pairs"""
+        return '\n\n'.join(f"Kullanıcı: {message}\nAsistan: {response}" for message, response in turns)
@@ -1,13 +1,31 @@
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 import google.generativeai as genai
+import asyncio
 import json
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from analyzers.analysis_merger import merge_analyses
+from analyzers.chat_memory import ChatMemory
+from analyzers.code_chunker import CodeChunker
+from analyzers.llm_router import LLMRouter, is_retryable, retry_after_seconds, backoff_delay
+from analyzers.prompt_builder import PromptBuilder, count_tokens
+from analyzers.static_analyzer import StaticAnalyzer, default_static_analyzer
+from analyzers.unit_diff import split_units, diff_units
+from utils.metrics import LLM_REQUEST_SECONDS, LLM_TOKENS, FALLBACK_RESPONSES
 from config.settings import (
-    SYSTEM_PROMPT, 
     OPENAI_MODEL, 
+    GEMINI_MODEL,
+    OPENAI_BASE_URL,
+    GEMINI_API_ENDPOINT,
     TEMPERATURE, 
     ANALYSIS_TEMPLATE,
-    DEFAULT_AI_SERVICE
+    DEFAULT_AI_SERVICE,
+    CHUNK_ANALYSIS_CONCURRENCY,
+    INCREMENTAL_MAX_CHANGED_RATIO,
+    LLM_OUTPUT_TOKEN_ESTIMATE,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_MAX_DELAY
 )
 class AIServiceFactory:
     @staticmethod
@@ -21,144 +39,434 @@ class AIServiceFactory:
             raise ValueError("No valid API key found for any AI service")
 
 class CodeAnalyzer:
-    def __init__(self, api_keys):
-        """Initialize with API keys"""
+    def __init__(self, api_keys, rate_limiter=None):
+        """Initialize with API keys and an optional shared RateLimiter"""
         self.api_keys = api_keys
+        self.rate_limiter = rate_limiter
         self.service = AIServiceFactory.get_service(api_keys)
         self.ANALYSIS_TEMPLATE = ANALYSIS_TEMPLATE
-        
-        if self.service == "openai":
-            self.client = OpenAI(api_key=api_keys["OPENAI_API_KEY"])
-        elif self.service == "gemini":
-            genai.configure(api_key=api_keys["GEMINI_API_KEY"])
-            self.client = genai.GenerativeModel('gemini-pro')
+        self.chunker = CodeChunker()
+        self.prompt_builder = PromptBuilder()
+        self.static_analyzer = default_static_analyzer
+
+        # Anahtarı olan tüm servisler yapılandırılır; birincil servis önce denenir
+        self.clients = {}
+        self.async_clients = {}
+        if api_keys.get("OPENAI_API_KEY"):
+            # SDK'nın kendi yeniden denemeleri kapalı; denemeler ortak hız sınırından geçer (_call_limited)
+            self.clients["openai"] = OpenAI(api_key=api_keys["OPENAI_API_KEY"], base_url=OPENAI_BASE_URL,
+                                            max_retries=0)
+            # Async yöntemler AsyncRuntime döngüsünde çalışır; bağlantı havuzu o döngüye bağlıdır
+            self.async_clients = {"openai": AsyncOpenAI(api_key=api_keys["OPENAI_API_KEY"],
+                                                        base_url=OPENAI_BASE_URL, max_retries=0)}
+        if api_keys.get("GEMINI_API_KEY"):
+            if GEMINI_API_ENDPOINT:
+                genai.configure(api_key=api_keys["GEMINI_API_KEY"], transport='rest',
+                                client_options={'api_endpoint': GEMINI_API_ENDPOINT})
+            else:
+                genai.configure(api_key=api_keys["GEMINI_API_KEY"])
+            self.clients["gemini"] = genai.GenerativeModel(GEMINI_MODEL)
+
+        self.client = self.clients[self.service]
+        self.models = {"openai": OPENAI_MODEL, "gemini": GEMINI_MODEL}
+        self.model = self.models[self.service]
+        self.router = LLMRouter([self.service] + [name for name in self.clients if name != self.service])
 
     def analyze_code(self, code, notebook_data=None):
         """Main analysis function"""
+        return self.analyze_code_with_origin(code, notebook_data)[0]
+
+    def analyze_code_with_origin(self, code, notebook_data=None):
+        """Analyze code and report who answered: (analysis, (provider, model)).
+
+        The router may answer with a fallback provider. The origin is None for the error template
+        and when chunks were answered by different providers.
+        """
+        provider = None
         try:
-            if self.service == "openai":
-                analysis = self._analyze_with_openai(code, notebook_data)
+            digest, chunks = self._prepare_analysis(code, notebook_data)
+            if len(chunks) > 1:
+                analysis, provider = self._analyze_chunks(chunks, notebook_data)
             else:
-                analysis = self._analyze_with_gemini(code, notebook_data)
+                analysis, provider = self._analyze_single(code, notebook_data, digest)
             
             # Validate and clean the analysis results
             analysis = self._validate_and_clean_analysis(analysis)
-            return analysis
             
         except Exception as e:
             print(f"Analysis error: {str(e)}")
-            return self.ANALYSIS_TEMPLATE
+            analysis = self.ANALYSIS_TEMPLATE
+        
+        return self._with_origin(analysis, provider)
+
+    async def analyze_code_async(self, code, notebook_data=None):
+        """Async version of analyze_code; chunks are analyzed concurrently without threads"""
+        return (await self.analyze_code_with_origin_async(code, notebook_data))[0]
 
-    def _analyze_with_openai(self, code, notebook_data=None):
-        """Analyze code using OpenAI's GPT-4"""
+    async def analyze_code_with_origin_async(self, code, notebook_data=None):
+        """Async version of analyze_code_with_origin"""
+        provider = None
         try:
-            # Prepare context with code and documentation if available
-            context = code
-            if notebook_data:
-                markdown_sections = []
-                if notebook_data.get('documentation'):
-                    doc = notebook_data['documentation']
-                    if doc['project_description']:
-                        markdown_sections.append(f"# Project Description\n{doc['project_description']}")
-                    if doc['usage_examples']:
-                        markdown_sections.append(f"# Usage Examples\n{' '.join(doc['usage_examples'])}")
-                    if doc['parameters']:
-                        markdown_sections.append(f"# Parameters\n{' '.join(doc['parameters'])}")
-                    if doc['notes']:
-                        markdown_sections.append(f"# Notes\n{' '.join(doc['notes'])}")
-
-                if markdown_sections:
-                    context = f"""# Documentation
-{' '.join(markdown_sections)}
-
-# Code
-{code}"""
-
-            prompt = f"""Lütfen aşağıdaki Python kodunu detaylı olarak analiz et.
-            {' Kod ile birlikte verilen dokümantasyonu da dikkate al.' if notebook_data else ''}
-            Yanıtını kesinlikle belirtilen JSON formatında ver ve hiçbir ek açıklama ekleme.
-            Her bölüm için detaylı ve yapıcı geri bildirimler sağla.
-
-            {SYSTEM_PROMPT}
-
-            Analiz edilecek içerik:
-            {context}"""
-
-            response = self.client.chat.completions.create(
-                model=OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": "Sen deneyimli bir Python kod analisti ve geliştiricisisin."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                response_format={"type": "json_object"}
-            )
+            # AST analizi ve parçalama CPU işidir, döngüyü bekletmesin
+            digest, chunks = await asyncio.to_thread(self._prepare_analysis, code, notebook_data)
+            if len(chunks) > 1:
+                analysis, provider = await self._analyze_chunks_async(chunks, notebook_data)
+            else:
+                analysis, provider = await self._analyze_single_async(code, notebook_data, digest)
+            
+            analysis = self._validate_and_clean_analysis(analysis)
+            
+        except Exception as e:
+            print(f"Analysis error: {str(e)}")
+            analysis = self.ANALYSIS_TEMPLATE
+        
+        return self._with_origin(analysis, provider)
+
+    def _with_origin(self, analysis, provider):
+        if analysis == self.ANALYSIS_TEMPLATE:
+            FALLBACK_RESPONSES.inc()
+            return analysis, None
+        return analysis, (provider, self.models[provider]) if provider else None
+
+    def _prepare_analysis(self, code, notebook_data):
+        """Static analysis summary and prompt-sized chunks of the code.
 
-            content = response.choices[0].message.content.strip()
-            return json.loads(content)
+        The code itself is sent, so only the overview and findings go with it (not the per-function
+        metrics). Each chunk gets the summary of its own source in chunk['digest'].
+        """
+        chunks = self.chunker.chunk(code, notebook_data)
+        if len(chunks) == 1:
+            return StaticAnalyzer.summary(self.get_static_metrics(code, notebook_data)), chunks
+
+        for chunk in chunks:
+            metrics = self.static_analyzer.analyze(chunk['source'])
+            # Satır satır bölünmüş parçalar ayrıştırılamaz; sözdizimi hatası gürültüsü gönderilmez
+            chunk['digest'] = None if metrics['syntax_error'] else StaticAnalyzer.summary(metrics)
+        return None, chunks
+
+    def update_analysis(self, code, notebook_data, previous):
+        """Revise the analysis of an earlier version using only the units that changed since.
+
+        previous holds the 'source', 'notebook_data' and 'analysis' of that version. Returns None
+        when a full analysis is the better choice: most units changed, the changes do not fit one
+        prompt, or the update request failed.
+        """
+        try:
+            result, prompt = self._plan_update(code, notebook_data, previous)
+            if prompt is None:
+                return result
+            return self._validate_and_clean_analysis(self._generate_json(prompt, 'update'))
 
         except Exception as e:
-            print(f"OpenAI API error: {str(e)}")
-            return self.ANALYSIS_TEMPLATE
+            print(f"Incremental analysis error: {str(e)}")
+            return None
 
-    def _analyze_with_gemini(self, code, notebook_data=None):
-        """Analyze code using Google's Gemini"""
+    async def update_analysis_async(self, code, notebook_data, previous):
+        """Async version of update_analysis"""
         try:
-            # Prepare context with code and documentation if available
-            context = code
-            if notebook_data:
-                markdown_sections = []
-                if notebook_data.get('documentation'):
-                    doc = notebook_data['documentation']
-                    if doc['project_description']:
-                        markdown_sections.append(f"# Project Description\n{doc['project_description']}")
-                    if doc['usage_examples']:
-                        markdown_sections.append(f"# Usage Examples\n{' '.join(doc['usage_examples'])}")
-                    if doc['parameters']:
-                        markdown_sections.append(f"# Parameters\n{' '.join(doc['parameters'])}")
-                    if doc['notes']:
-                        markdown_sections.append(f"# Notes\n{' '.join(doc['notes'])}")
-
-                if markdown_sections:
-                    context = f"""# Documentation
-{' '.join(markdown_sections)}
-
-# Code
-{code}"""
-
-            prompt = f"""Lütfen aşağıdaki Python kodunu analiz et ve sonucu TAM OLARAK aşağıdaki JSON formatında döndür:
-
-            {SYSTEM_PROMPT}
-
-            Analiz edilecek içerik:
-            {context}
-
-            Önemli kurallar:
-            1. Yanıt MUTLAKA geçerli bir JSON olmalı
-            2. Tüm alanlar doldurulmalı, boş bırakılmamalı
-            3. Dokümantasyondaki bilgiler de dikkate alınmalı
-            4. Her kod örneği için detaylı açıklama eklenmeli
-            5. Her bölüm için kapsamlı analiz yapılmalı
-            6. Yanıtta JSON dışında hiçbir ek metin olmamalı"""
-
-            response = self.client.generate_content(prompt)
-            content = response.text.strip()
-            
-            json_start = content.find('{')
-            json_end = content.rfind('}') + 1
-            
-            if json_start >= 0 and json_end > json_start:
-                content = content[json_start:json_end]
-            
+            result, prompt = await asyncio.to_thread(self._plan_update, code, notebook_data, previous)
+            if prompt is None:
+                return result
+            return self._validate_and_clean_analysis(await self._generate_json_async(prompt, 'update'))
+
+        except Exception as e:
+            print(f"Incremental analysis error: {str(e)}")
+            return None
+
+    def _plan_update(self, code, notebook_data, previous):
+        """(result, None) when no LLM call is needed, otherwise (None, update prompt)"""
+        previous_notebook = previous['notebook_data']
+        previous_code = previous_notebook['code'] if previous_notebook else previous['source']
+        diff = diff_units(split_units(previous_code, previous_notebook, self.chunker),
+                          split_units(code, notebook_data, self.chunker))
+
+        if not diff['changed'] and not diff['removed']:
+            return previous['analysis'], None
+        if len(diff['changed']) > diff['total'] * INCREMENTAL_MAX_CHANGED_RATIO:
+            return None, None
+        if count_tokens('\n\n'.join(unit['source'] for unit in diff['changed'])) > self.chunker.token_budget:
+            return None, None
+
+        # Özet, gövdesi gönderilmeyen (değişmeyen) birimlerin yerine geçer
+        digest = StaticAnalyzer.digest(self.get_static_metrics(code, notebook_data),
+                                       exclude={unit['name'] for unit in diff['changed']})
+        return None, self.prompt_builder.build_update(previous['analysis'], diff['changed'],
+                                                      diff['removed'], digest)
+
+    def get_static_metrics(self, code, notebook_data=None):
+        """Local AST metrics of a file or notebook, cached by content hash"""
+        if notebook_data and notebook_data.get('code_cells'):
+            return self.static_analyzer.analyze_cells(notebook_data['code_cells'])
+        return self.static_analyzer.analyze(code)
+
+    def _analyze_single(self, code, notebook_data=None, digest=None, operation='analysis'):
+        """Analyze code that fits into a single prompt: (analysis, provider that answered or None).
+
+        operation keys the router's latency stats.
+        """
+        try:
+            provider, analysis = self.router.call(self._provider_calls(
+                openai=lambda: self._analyze_with_openai(code, notebook_data, digest),
+                gemini=lambda: self._analyze_with_gemini(code, notebook_data, digest)
+            ), is_valid=self._is_valid_analysis, operation=operation, with_provider=True)
+            return analysis, provider
+        except Exception as e:
+            print(f"AI service error: {str(e)}")
+            return self.ANALYSIS_TEMPLATE, None
+
+    async def _analyze_single_async(self, code, notebook_data=None, digest=None, operation='analysis'):
+        """Async version of _analyze_single"""
+        try:
+            prompt = await asyncio.to_thread(self.prompt_builder.build_analysis, code, notebook_data, digest)
+            provider, analysis = await self._generate_json_async(prompt, operation, with_provider=True)
+            return analysis, provider
+        except Exception as e:
+            print(f"AI service error: {str(e)}")
+            return self.ANALYSIS_TEMPLATE, None
+
+    def _provider_calls(self, **calls):
+        """Keep only the calls of configured services"""
+        return {name: call for name, call in calls.items() if name in self.clients}
+
+    def _is_valid_analysis(self, analysis):
+        """A provider that answers with the error template counts as failed"""
+        return isinstance(analysis, dict) and analysis != self.ANALYSIS_TEMPLATE
+
+    def _call_limited(self, service, prompt_text, request):
+        """Send one provider request under the shared rate limit, retrying throttled and transient errors"""
+        estimated = count_tokens(prompt_text) + LLM_OUTPUT_TOKEN_ESTIMATE
+        model = OPENAI_MODEL if service == "openai" else GEMINI_MODEL
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire(service, estimated)
+            started = time.perf_counter()
             try:
-                analysis = json.loads(content)
-                return self._fix_gemini_output(analysis)
-            except json.JSONDecodeError:
-                return self._extract_analysis_from_text(content)
-                
+                response = request()
+            except Exception as e:
+                time.sleep(self._retry_delay(service, model, started, e, attempt))
+                continue
+            return self._record_response(service, model, started, estimated, response)
+
+    async def _call_limited_async(self, service, prompt_text, request):
+        """Async version of _call_limited; request() returns a coroutine"""
+        # Büyük prompt'larda token sayımı milisaniyeler sürer; ortak döngüde diğer istekleri bekletmesin
+        estimated = await asyncio.to_thread(count_tokens, prompt_text) + LLM_OUTPUT_TOKEN_ESTIMATE
+        model = OPENAI_MODEL if service == "openai" else GEMINI_MODEL
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            if self.rate_limiter:
+                await self.rate_limiter.acquire_async(service, estimated)
+            started = time.perf_counter()
+            try:
+                response = await request()
+            except Exception as e:
+                # pause/settle hız sınırı kovalarına SQLite'ta yazar; döngü dışında çalışır
+                await asyncio.sleep(await asyncio.to_thread(self._retry_delay, service, model, started, e, attempt))
+                continue
+            return await asyncio.to_thread(self._record_response, service, model, started, estimated, response)
+
+    def _retry_delay(self, service, model, started, error, attempt):
+        """Backoff before the next attempt of a failed request; re-raises errors not worth retrying"""
+        LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, provider=service, model=model, outcome='error')
+        retry_after = retry_after_seconds(error)
+        # Uzun Retry-After (ör. günlük kota) beklenmez; yönlendirici diğer servise geçer
+        if (attempt == LLM_MAX_RETRIES or not is_retryable(error)
+                or (retry_after is not None and retry_after > LLM_RETRY_MAX_DELAY)):
+            raise error
+        if retry_after is not None and self.rate_limiter:
+            self.rate_limiter.pause(service, retry_after)
+        return backoff_delay(attempt, retry_after)
+
+    def _record_response(self, service, model, started, estimated, response):
+        # Akışlarda süre ilk yanıt nesnesine kadardır ve kullanım bilgisi yoktur
+        LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, provider=service, model=model, outcome='ok')
+        usage = self._usage_tokens(response)
+        if usage:
+            LLM_TOKENS.inc(usage[0], provider=service, model=model, type='prompt')
+            LLM_TOKENS.inc(usage[1], provider=service, model=model, type='completion')
+        if self.rate_limiter:
+            self.rate_limiter.settle(service, estimated, sum(usage) if usage else None)
+        return response
+
+    @staticmethod
+    def _usage_tokens(response):
+        """(prompt, completion) tokens reported by either SDK; None for streams"""
+        usage = getattr(response, 'usage', None)
+        if usage is not None and getattr(usage, 'prompt_tokens', None) is not None:
+            return usage.prompt_tokens, usage.completion_tokens or 0
+        metadata = getattr(response, 'usage_metadata', None)
+        if metadata is not None and getattr(metadata, 'prompt_token_count', None) is not None:
+            return metadata.prompt_token_count, metadata.candidates_token_count or 0
+        return None
+
+    def _analyze_chunks(self, chunks, notebook_data=None):
+        """Analyze chunks concurrently and merge the partial results"""
+        # Her parça sadece kendi statik analiz özetini görür
+        with ThreadPoolExecutor(max_workers=CHUNK_ANALYSIS_CONCURRENCY) as executor:
+            analyses = list(executor.map(
+                lambda chunk: self._analyze_single(chunk['source'], notebook_data, chunk.get('digest'), 'chunk'), chunks
+            ))
+        return self._merge_chunks(chunks, analyses)
+
+    async def _analyze_chunks_async(self, chunks, notebook_data=None):
+        """Async version of _analyze_chunks"""
+        semaphore = asyncio.Semaphore(CHUNK_ANALYSIS_CONCURRENCY)
+
+        async def analyze(chunk):
+            async with semaphore:
+                return await self._analyze_single_async(chunk['source'], notebook_data, chunk.get('digest'), 'chunk')
+
+        analyses = await asyncio.gather(*(analyze(chunk) for chunk in chunks))
+        return self._merge_chunks(chunks, analyses)
+
+    def _merge_chunks(self, chunks, analyses):
+        """Merge (analysis, provider) results of chunks: (merged, provider if all agree or None)"""
+        # Başarısız parçalar raporu bozmasın
+        results = [(chunk['name'], analysis, provider) for chunk, (analysis, provider) in zip(chunks, analyses)
+                   if analysis != self.ANALYSIS_TEMPLATE]
+        if not results:
+            return self.ANALYSIS_TEMPLATE, None
+
+        providers = {provider for _, _, provider in results}
+        merged = merge_analyses([analysis for _, analysis, _ in results],
+                                labels=[name for name, _, _ in results])
+        return merged, providers.pop() if len(providers) == 1 else None
+
+    def _analyze_with_openai(self, code, notebook_data=None, digest=None):
+        """Analyze code using OpenAI's GPT-4; errors are raised to the router"""
+        try:
+            return self._generate_json_with_openai(self.prompt_builder.build_analysis(code, notebook_data, digest))
+        except Exception as e:
+            print(f"OpenAI API error: {str(e)}")
+            raise
+
+    def _analyze_with_gemini(self, code, notebook_data=None, digest=None):
+        """Analyze code using Google's Gemini; errors are raised to the router"""
+        try:
+            return self._generate_json_with_gemini(self.prompt_builder.build_analysis(code, notebook_data, digest))
         except Exception as e:
             print(f"Gemini API error: {str(e)}")
-            return self.ANALYSIS_TEMPLATE
+            raise
+
+    def _generate_json(self, prompt, operation):
+        """Send a JSON-producing prompt through the router and parse the result"""
+        return self.router.call(self._provider_calls(
+            openai=lambda: self._generate_json_with_openai(prompt),
+            gemini=lambda: self._generate_json_with_gemini(prompt)
+        ), is_valid=self._is_valid_analysis, operation=operation)
+
+    async def _generate_json_async(self, prompt, operation, with_provider=False):
+        """Async version of _generate_json"""
+        return await self.router.call_async(self._provider_calls(
+            openai=lambda: self._generate_json_with_openai_async(prompt),
+            gemini=lambda: self._generate_json_with_gemini_async(prompt)
+        ), is_valid=self._is_valid_analysis, operation=operation, with_provider=with_provider)
+
+    @staticmethod
+    def _openai_json_request(prompt):
+        return dict(
+            model=OPENAI_MODEL,
+            messages=[
+                {"role": "system", "content": prompt['system']},
+                {"role": "user", "content": prompt['user']}
+            ],
+            temperature=0.3,
+            response_format={"type": "json_object"}
+        )
+
+    def _generate_json_with_openai(self, prompt):
+        response = self._call_limited("openai", PromptBuilder.as_text(prompt), lambda: (
+            self.clients["openai"].chat.completions.create(**self._openai_json_request(prompt))
+        ))
+        return json.loads(response.choices[0].message.content.strip())
+
+    async def _generate_json_with_openai_async(self, prompt):
+        response = await self._call_limited_async("openai", PromptBuilder.as_text(prompt), lambda: (
+            self.async_clients["openai"].chat.completions.create(**self._openai_json_request(prompt))
+        ))
+        return json.loads(response.choices[0].message.content.strip())
+
+    def _generate_json_with_gemini(self, prompt):
+        text = PromptBuilder.as_text(prompt)
+        response = self._call_limited("gemini", text, lambda: self.clients["gemini"].generate_content(text))
+        return self._parse_gemini_json(response)
+
+    async def _generate_json_with_gemini_async(self, prompt):
+        text = PromptBuilder.as_text(prompt)
+        response = await self._call_limited_async("gemini", text, lambda: self._gemini_generate_async(text))
+        return self._parse_gemini_json(response)
+
+    async def _gemini_generate_async(self, prompt):
+        # REST aktarımında (GEMINI_API_ENDPOINT) SDK'nın gerçek bir async istemcisi yok,
+        # generate_content_async döngüyü bloklar; bloklayan çağrı iş parçacığında çalıştırılır
+        if GEMINI_API_ENDPOINT:
+            return await asyncio.to_thread(self.clients["gemini"].generate_content, prompt)
+        return await self.clients["gemini"].generate_content_async(prompt)
+
+    def _parse_gemini_json(self, response):
+        content = response.text.strip()
+        json_start = content.find('{')
+        json_end = content.rfind('}') + 1
+        if json_start >= 0 and json_end > json_start:
+            content = content[json_start:json_end]
+        try:
+            return self._fix_gemini_output(json.loads(content))
+        except json.JSONDecodeError:
+            return self._extract_analysis_from_text(content)
+
+    def reduce_analyses(self, file_analyses):
+        """Merge per-file analyses into one repository report with the same schema"""
+        result, prompt = self._plan_reduce(file_analyses)
+        if prompt is None:
+            return result
+
+        try:
+            return self._with_examples(self._validate_and_clean_analysis(self._generate_json(prompt, 'reduce')), result)
+        except Exception as e:
+            print(f"Reduce error: {str(e)}")
+            return result
+
+    async def reduce_analyses_async(self, file_analyses):
+        """Async version of reduce_analyses"""
+        result, prompt = self._plan_reduce(file_analyses)
+        if prompt is None:
+            return result
+
+        try:
+            return self._with_examples(self._validate_and_clean_analysis(await self._generate_json_async(prompt, 'reduce')),
+                                       result)
+        except Exception as e:
+            print(f"Reduce error: {str(e)}")
+            return result
+
+    def _plan_reduce(self, file_analyses):
+        """(final result, None) when no LLM call is needed, otherwise (fallback merge, reduce prompt)"""
+        # Hata şablonuyla dönen dosyalar birleştirmeye katılmaz
+        valid = {path: analysis for path, analysis in file_analyses.items()
+                 if analysis != self.ANALYSIS_TEMPLATE}
+        if not valid:
+            return self.ANALYSIS_TEMPLATE, None
+        if len(valid) == 1:
+            return next(iter(valid.values())), None
+
+        fallback = merge_analyses(list(valid.values()), labels=list(valid))
+        # Kod örnekleri raporun en büyük kısmıdır ve birleştirmede yeniden yazılmaları gerekmez;
+        # istemde yer almazlar, yerel birleştirmenin örnekleri kullanılır (_with_examples)
+        summaries = {path: {key: value for key, value in analysis.items() if key != 'kod_ornekleri'}
+                     for path, analysis in valid.items()}
+        return fallback, self.prompt_builder.build(f"""Aşağıda bir Python deposundaki dosyaların her biri için ayrı ayrı yapılmış analizler var.
+Bunları depo geneline ait TEK bir rapor halinde birleştir. Tekrarlanan maddeleri birleştir,
+projenin amacını ve özetini dosyalar arası ilişkileri dikkate alarak yaz. Kod örnekleri ayrıca
+eklenecek; "kod_ornekleri" alanını boş liste olarak bırak.
+
+Dosya analizleri:
+{json.dumps(summaries, ensure_ascii=False)}""")
+
+    @staticmethod
+    def _with_examples(analysis, merged):
+        """Take the code examples of a reduced report from the local merge"""
+        if analysis == ANALYSIS_TEMPLATE:
+            return merged
+        return {**analysis, 'kod_ornekleri': merged['kod_ornekleri']}
 
     def _fix_gemini_output(self, analysis):
         """Fix and validate Gemini output format"""
@@ -281,46 +589,179 @@ class CodeAnalyzer:
             print(f"Text extraction error: {str(e)}")
             return self.ANALYSIS_TEMPLATE
 
-    def chat_about_code(self, message, code_context):
-        """Chat about code using the selected AI service"""
+    def chat_about_code(self, message, code_context, memory=None):
+        """Chat about code, falling back to or hedging with the other service.
+
+        memory is a ChatMemory.build() result: earlier turns and the summary of older ones.
+        """
         try:
-            if self.service == "openai":
-                return self._chat_with_openai(message, code_context)
-            else:
-                return self._chat_with_gemini(message, code_context)
+            return self.router.call(self._provider_calls(
+                openai=lambda: self._chat_with_openai(message, code_context, memory),
+                gemini=lambda: self._chat_with_gemini(message, code_context, memory)
+            ), is_valid=bool, operation='chat')
         except Exception as e:
             return f"Chat error: {str(e)}"
 
-    def _chat_with_openai(self, message, code_context):
-        """Chat using OpenAI's GPT-4"""
-        response = self.client.chat.completions.create(
+    async def chat_about_code_async(self, message, code_context, memory=None):
+        """Async version of chat_about_code"""
+        try:
+            return await self.router.call_async(self._provider_calls(
+                openai=lambda: self._chat_with_openai_async(message, code_context, memory),
+                gemini=lambda: self._chat_with_gemini_async(message, code_context, memory)
+            ), is_valid=bool, operation='chat')
+        except Exception as e:
+            return f"Chat error: {str(e)}"
+
+    def stream_chat_about_code(self, message, code_context, memory=None):
+        """Stream chat response chunks, failing over to the other service before the first chunk"""
+        return self.router.stream(self._provider_calls(
+            openai=lambda: self._stream_chat_with_openai(message, code_context, memory),
+            gemini=lambda: self._stream_chat_with_gemini(message, code_context, memory)
+        ), operation='chat_stream')
+
+    def generate_text(self, prompt, max_tokens=None, operation='text'):
+        """Send a {'system', 'user'} prompt through the router and return the plain text answer"""
+        return self.router.call(self._provider_calls(
+            openai=lambda: self._generate_text_with_openai(prompt, max_tokens),
+            gemini=lambda: self._generate_text_with_gemini(prompt)
+        ), is_valid=bool, operation=operation)
+
+    async def generate_text_async(self, prompt, max_tokens=None, operation='text'):
+        """Async version of generate_text"""
+        return await self.router.call_async(self._provider_calls(
+            openai=lambda: self._generate_text_with_openai_async(prompt, max_tokens),
+            gemini=lambda: self._generate_text_with_gemini_async(prompt)
+        ), is_valid=bool, operation=operation)
+
+    @staticmethod
+    def _openai_text_request(prompt, max_tokens):
+        request = dict(
             model=OPENAI_MODEL,
             messages=[
-                {
-                    "role": "system",
-                    "content": """Sen deneyimli bir Python geliştiricisin. 
-                    Kullanıcının sorularına net, açıklayıcı ve yapıcı yanıtlar ver.
-                    Kod örnekleri verirken açıklamalarını da ekle."""
-                },
-                {
-                    "role": "user",
-                    "content": f"Kod:\n{code_context}\n\nSoru: {message}"
-                }
-            ],
-            #temperature=0.5
+                {"role": "system", "content": prompt['system']},
+                {"role": "user", "content": prompt['user']}
+            ]
         )
-        return response.choices[0].message.content
+        if max_tokens:
+            request['max_tokens'] = max_tokens
+        return request
 
-    def _chat_with_gemini(self, message, code_context):
-        """Chat using Google's Gemini"""
-        prompt = f"""Sen deneyimli bir Python geliştiricisin. 
+    def _generate_text_with_openai(self, prompt, max_tokens=None):
+        response = self._call_limited("openai", PromptBuilder.as_text(prompt), lambda: (
+            self.clients["openai"].chat.completions.create(**self._openai_text_request(prompt, max_tokens))
+        ))
+        return response.choices[0].message.content.strip()
+
+    async def _generate_text_with_openai_async(self, prompt, max_tokens=None):
+        response = await self._call_limited_async("openai", PromptBuilder.as_text(prompt), lambda: (
+            self.async_clients["openai"].chat.completions.create(**self._openai_text_request(prompt, max_tokens))
+        ))
+        return response.choices[0].message.content.strip()
+
+    def _generate_text_with_gemini(self, prompt):
+        text = PromptBuilder.as_text(prompt)
+        return self._call_limited("gemini", text, lambda: self.clients["gemini"].generate_content(text)).text.strip()
+
+    async def _generate_text_with_gemini_async(self, prompt):
+        text = PromptBuilder.as_text(prompt)
+        response = await self._call_limited_async("gemini", text, lambda: self._gemini_generate_async(text))
+        return response.text.strip()
+
+    def _openai_chat_messages(self, message, code_context, memory=None):
+        """Build the OpenAI chat messages for a question about the code"""
+        messages = [
+            {
+                "role": "system",
+                "content": """Sen deneyimli bir Python geliştiricisin. 
+                Kullanıcının sorularına net, açıklayıcı ve yapıcı yanıtlar ver.
+                Kod örnekleri verirken açıklamalarını da ekle."""
+            }
+        ]
+        if memory:
+            if memory['summary']:
+                messages.append({"role": "system", "content": f"Önceki konuşmanın özeti:\n{memory['summary']}"})
+            for question, answer in memory['turns']:
+                messages.append({"role": "user", "content": question})
+                messages.append({"role": "assistant", "content": answer})
+        messages.append({
+            "role": "user",
+            "content": f"Kod:\n{code_context}\n\nSoru: {message}"
+        })
+        return messages
+
+    def _gemini_chat_prompt(self, message, code_context, memory=None):
+        """Build the Gemini prompt for a question about the code"""
+        history = ''
+        if memory and memory['summary']:
+            history += f"Önceki konuşmanın özeti:\n{memory['summary']}\n\n"
+        if memory and memory['turns']:
+            history += f"Son mesajlar:\n{ChatMemory.format_turns(memory['turns'])}\n\n"
+        return f"""Sen deneyimli bir Python geliştiricisin. 
         Kullanıcının sorularına net, açıklayıcı ve yapıcı yanıtlar ver.
         Kod örnekleri verirken açıklamalarını da ekle.
 
-        Kod:
+        {history}Kod:
         {code_context}
 
         Soru: {message}"""
-        
-        response = self.client.generate_content(prompt)
-        return response.text
\ No newline at end of file
+
+    def _chat_with_openai(self, message, code_context, memory=None):
+        """Chat using OpenAI's GPT-4"""
+        messages = self._openai_chat_messages(message, code_context, memory)
+        response = self._call_limited("openai", self._messages_text(messages), lambda: (
+            self.clients["openai"].chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=messages,
+                #temperature=0.5
+            )
+        ))
+        return response.choices[0].message.content
+
+    async def _chat_with_openai_async(self, message, code_context, memory=None):
+        messages = self._openai_chat_messages(message, code_context, memory)
+        response = await self._call_limited_async("openai", self._messages_text(messages), lambda: (
+            self.async_clients["openai"].chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=messages
+            )
+        ))
+        return response.choices[0].message.content
+
+    def _stream_chat_with_openai(self, message, code_context, memory=None):
+        """Stream chat chunks using OpenAI's GPT-4"""
+        messages = self._openai_chat_messages(message, code_context, memory)
+        stream = self._call_limited("openai", self._messages_text(messages), lambda: (
+            self.clients["openai"].chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=messages,
+                stream=True
+            )
+        ))
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    @staticmethod
+    def _messages_text(messages):
+        return '\n'.join(message['content'] for message in messages)
+
+    def _chat_with_gemini(self, message, code_context, memory=None):
+        """Chat using Google's Gemini"""
+        prompt = self._gemini_chat_prompt(message, code_context, memory)
+        response = self._call_limited("gemini", prompt, lambda: self.clients["gemini"].generate_content(prompt))
+        return response.text
+
+    async def _chat_with_gemini_async(self, message, code_context, memory=None):
+        prompt = self._gemini_chat_prompt(message, code_context, memory)
+        response = await self._call_limited_async("gemini", prompt, lambda: self._gemini_generate_async(prompt))
+        return response.text
+
+    def _stream_chat_with_gemini(self, message, code_context, memory=None):
+        """Stream chat chunks using Google's Gemini"""
+        prompt = self._gemini_chat_prompt(message, code_context, memory)
+        response = self._call_limited("gemini", prompt, lambda: (
+            self.clients["gemini"].generate_content(prompt, stream=True)
+        ))
+        for chunk in response:
+            if chunk.parts:
+                yield chunk.text
@@ -0,0 +1,129 @@
+import ast
+from analyzers.prompt_builder import count_tokens, CHARS_PER_TOKEN
+from analyzers.static_analyzer import parse_source
+from config.settings import CHUNK_TOKEN_BUDGET
+
+class CodeChunker:
+    def __init__(self, token_budget=CHUNK_TOKEN_BUDGET):
+        """Initialize with the maximum token count of a single chunk"""
+        self.token_budget = token_budget
+
+    def chunk(self, code, notebook_data=None):
+        """Split code into chunks that fit the token budget; small inputs stay whole"""
+        if count_tokens(code) <= self.token_budget:
+            return [{'name': 'module', 'source': code}]
+
+        if notebook_data and notebook_data.get('code_cells'):
+            units = self.split_notebook(notebook_data['code_cells'])
+        else:
+            units = self.split_python(code)
+
+        return self.pack(units)
+
+    def split_python(self, code):
+        """Split a module into class/function units using ast; other statements are grouped"""
+        try:
+            tree = parse_source(code)
+        except SyntaxError:
+            return self._split_lines('module', code)
+
+        lines = code.splitlines()
+        units = []
+        pending = []
+
+        def flush():
+            if pending:
+                units.append({'name': 'module', 'source': '\n'.join(pending)})
+                pending.clear()
+
+        # Her birim, önceki birimin bittiği satırdan başlar; aradaki yorumlar kaybolmaz
+        previous_end = 0
+        for node in tree.body:
+            source = '\n'.join(lines[previous_end:node.end_lineno])
+            previous_end = node.end_lineno
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                flush()
+                if isinstance(node, ast.ClassDef) and count_tokens(source) > self.token_budget:
+                    units.extend(self._split_class(node, lines))
+                else:
+                    units.append({'name': node.name, 'source': source})
+            else:
+                pending.append(source)
+        flush()
+
+        return units
+
+    def _split_class(self, node, lines):
+        """Split an oversized class into method units that keep the class header"""
+        header = '\n'.join(lines[self._start_line(node) - 1:node.body[0].lineno - 1]) or f"class {node.name}:"
+        units = []
+        for child in node.body:
+            source = '\n'.join(lines[self._start_line(child) - 1:child.end_lineno])
+            name = f"{node.name}.{getattr(child, 'name', 'body')}"
+            units.append({'name': name, 'source': f"{header}\n{source}"})
+        return units
+
+    @staticmethod
+    def _start_line(node):
+        decorators = getattr(node, 'decorator_list', None)
+        return decorators[0].lineno if decorators else node.lineno
+
+    def split_notebook(self, code_cells):
+        """Group consecutive code cells of the same markdown section into units"""
+        units = []
+        for cell in code_cells:
+            section = cell.get('section', 'General')
+            if units and units[-1]['name'] == section:
+                units[-1]['source'] += '\n\n' + cell['code']
+            else:
+                units.append({'name': section, 'source': cell['code']})
+        return units
+
+    def _split_lines(self, name, source):
+        """Last resort for units that cannot be split structurally"""
+        max_chars = self.token_budget * CHARS_PER_TOKEN
+        units = []
+        current = []
+        size = 0
+        for line in source.splitlines():
+            if current and size + len(line) + 1 > max_chars:
+                units.append({'name': name, 'source': '\n'.join(current)})
+                current, size = [], 0
+            current.append(line)
+            size += len(line) + 1
+        if current:
+            units.append({'name': name, 'source': '\n'.join(current)})
+        return units
+
+    def pack(self, units):
+        """Greedily pack units in source order into chunks under the token budget"""
+        chunks = []
+        names, parts, tokens = [], [], 0
+
+        for unit in units:
+            unit_tokens = count_tokens(unit['source'])
+            if unit_tokens > self.token_budget:
+                pieces = self._split_lines(unit['name'], unit['source'])
+            else:
+                pieces = [unit]
+
+            for piece in pieces:
+                piece_tokens = count_tokens(piece['source'])
+                if parts and tokens + piece_tokens > self.token_budget:
+                    chunks.append({'name': self._chunk_name(names), 'source': '\n\n'.join(parts)})
+                    names, parts, tokens = [], [], 0
+                names.append(piece['name'])
+                parts.append(piece['source'])
+                tokens += piece_tokens
+
+        if parts:
+            chunks.append({'name': self._chunk_name(names), 'source': '\n\n'.join(parts)})
+
+        return chunks
+
+    @staticmethod
+    def _chunk_name(names, limit=3):
+        names = list(dict.fromkeys(names))
+        if len(names) > limit:
+            return ', '.join(names[:limit]) + f" (+{len(names) - limit})"
+        return ', '.join(names)
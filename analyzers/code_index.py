@@ -0,0 +1,172 @@
+import ast
+import math
+import re
+from collections import Counter
+from analyzers.prompt_builder import count_tokens
+from analyzers.static_analyzer import parse_source
+from config.settings import CHAT_CONTEXT_TOKEN_BUDGET, CHAT_TOP_K
+
+WORD_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_]*|\d+')
+CAMEL_PATTERN = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+')
+
+def tokenize(text):
+    """Split text into lowercase terms; identifiers also yield their snake/camel parts"""
+    terms = []
+    for word in WORD_PATTERN.findall(text):
+        lower = word.lower()
+        terms.append(lower)
+        parts = [part.lower() for piece in word.split('_') for part in CAMEL_PATTERN.findall(piece)]
+        if len(parts) > 1:
+            terms.extend(parts)
+    return terms
+
+class CodeIndex:
+    K1 = 1.5
+    B = 0.75
+
+    def __init__(self, source, notebook_data=None):
+        """Build a symbol index over functions, classes and notebook cells"""
+        self.source = source
+        if notebook_data and notebook_data.get('code_cells'):
+            self.source = notebook_data['code']
+            self.entries = self._notebook_entries(notebook_data['code_cells'])
+        else:
+            self.entries = self._python_entries(source)
+
+        self._term_freqs = [Counter(tokenize(entry['name'] + ' ' + entry['source']))
+                            for entry in self.entries]
+        self._lengths = [sum(freqs.values()) for freqs in self._term_freqs]
+        self._avg_length = sum(self._lengths) / len(self._lengths) if self.entries else 0
+
+        document_freqs = Counter()
+        for freqs in self._term_freqs:
+            document_freqs.update(freqs.keys())
+        total = len(self.entries)
+        self._idf = {term: math.log(1 + (total - df + 0.5) / (df + 0.5))
+                     for term, df in document_freqs.items()}
+
+    def _python_entries(self, source):
+        """Index top-level functions, classes, methods and module-level statements"""
+        try:
+            tree = parse_source(source)
+        except SyntaxError:
+            return self._block_entries(source)
+
+        lines = source.splitlines()
+        entries = []
+
+        def segment(node):
+            start = node.decorator_list[0].lineno if getattr(node, 'decorator_list', None) else node.lineno
+            return '\n'.join(lines[start - 1:node.end_lineno])
+
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                entries.append({'name': node.name, 'kind': 'function', 'line': node.lineno,
+                                'signature': self._signature(node), 'source': segment(node)})
+            elif isinstance(node, ast.ClassDef):
+                methods = [child for child in node.body
+                           if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))]
+                header_end = methods[0].lineno - 1 if methods else node.end_lineno
+                header = '\n'.join(lines[node.lineno - 1:header_end]).rstrip()
+                entries.append({'name': node.name, 'kind': 'class', 'line': node.lineno,
+                                'signature': f"class {node.name}",
+                                'methods': [method.name for method in methods],
+                                'source': header})
+                for method in methods:
+                    entries.append({'name': f"{node.name}.{method.name}", 'kind': 'method',
+                                    'line': method.lineno, 'signature': self._signature(method),
+                                    'source': segment(method)})
+            else:
+                # Ardışık modül seviyesindeki ifadeleri tek kayıtta topla
+                if entries and entries[-1]['kind'] == 'module' and entries[-1]['end'] == node.lineno - 1:
+                    entries[-1]['source'] += '\n' + segment(node)
+                else:
+                    entries.append({'name': 'module', 'kind': 'module', 'line': node.lineno,
+                                    'signature': "module code",
+                                    'source': segment(node)})
+                entries[-1]['end'] = node.end_lineno
+
+        return entries
+
+    def _block_entries(self, source):
+        """Fallback for unparsable code: index blank-line separated blocks"""
+        entries = []
+        line = 1
+        for block in re.split(r'\n\s*\n', source):
+            if block.strip():
+                entries.append({'name': 'block', 'kind': 'block', 'line': line,
+                                'signature': "code block", 'source': block})
+            line += block.count('\n') + 2
+        return entries
+
+    def _notebook_entries(self, code_cells):
+        """Index every code cell, including error outputs"""
+        entries = []
+        for number, cell in enumerate(code_cells, 1):
+            source = cell['code']
+            errors = [output['content'] for output in cell.get('outputs', []) if output['type'] == 'error']
+            if errors:
+                source += '\n# Hata çıktısı:\n# ' + '\n# '.join(errors)
+            section = cell.get('section', 'General')
+            entries.append({'name': f"cell {number}", 'kind': 'cell', 'line': number,
+                            'signature': f"cell {number} [{section}]", 'source': source})
+        return entries
+
+    @staticmethod
+    def _signature(node):
+        prefix = 'async def' if isinstance(node, ast.AsyncFunctionDef) else 'def'
+        args = [arg.arg for arg in node.args.args]
+        if node.args.vararg:
+            args.append('*' + node.args.vararg.arg)
+        if node.args.kwarg:
+            args.append('**' + node.args.kwarg.arg)
+        return f"{prefix} {node.name}({', '.join(args)})"
+
+    def search(self, query, top_k=CHAT_TOP_K):
+        """Rank entries against the query with BM25"""
+        terms = set(tokenize(query))
+        scores = []
+        for index, freqs in enumerate(self._term_freqs):
+            score = 0.0
+            length_norm = 1 - self.B + self.B * self._lengths[index] / (self._avg_length or 1)
+            for term in terms:
+                freq = freqs.get(term)
+                if freq:
+                    score += self._idf[term] * freq * (self.K1 + 1) / (freq + self.K1 * length_norm)
+            if score > 0:
+                scores.append((score, index))
+
+        scores.sort(key=lambda item: (-item[0], item[1]))
+        return [self.entries[index] for _, index in scores[:top_k]]
+
+    def outline(self):
+        """Compact outline of the file: one line per function, class or cell"""
+        lines = []
+        for entry in self.entries:
+            if entry['kind'] == 'method':
+                continue
+            line = f"- {entry['signature']} (satır {entry['line']})" if entry['kind'] != 'cell' \
+                else f"- {entry['signature']}"
+            if entry.get('methods'):
+                line += f": {', '.join(entry['methods'])}"
+            lines.append(line)
+        return '\n'.join(lines)
+
+    def build_context(self, query, token_budget=CHAT_CONTEXT_TOKEN_BUDGET, top_k=CHAT_TOP_K):
+        """Return the whole file if it fits, otherwise an outline plus the most relevant snippets"""
+        if count_tokens(self.source) <= token_budget:
+            return self.source
+
+        outline = f"# Dosya yapısı\n{self.outline()}"
+        parts = [outline]
+        used = count_tokens(outline)
+
+        for entry in self.search(query, top_k):
+            snippet = f"# {entry['signature']}\n{entry['source']}"
+            tokens = count_tokens(snippet)
+            if used + tokens > token_budget:
+                continue
+            parts.append(snippet)
+            used += tokens
+
+        return '\n\n'.join(parts)
@@ -0,0 +1,392 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from config.settings import (
+    LLM_HEDGE_ENABLED,
+    LLM_HEDGE_DEFAULT_DELAY,
+    LLM_LATENCY_WINDOW,
+    LLM_MIN_SAMPLES,
+    LLM_BREAKER_FAILURES,
+    LLM_BREAKER_RESET,
+    LLM_RETRY_BASE_DELAY,
+    LLM_RETRY_MAX_DELAY
+)
+
+RETRYABLE_STATUS = (408, 409, 429, 500, 502, 503, 504)
+RETRYABLE_ERRORS = ('APIConnectionError', 'APITimeoutError', 'DeadlineExceeded', 'ServiceUnavailable')
+
+def is_retryable(error):
+    """Throttling, server and connection errors of either SDK are worth retrying"""
+    # openai: status_code, google.api_core: code (HTTP durum kodu)
+    status = getattr(error, 'status_code', None) or getattr(error, 'code', None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS
+    return isinstance(error, (ConnectionError, TimeoutError)) or type(error).__name__ in RETRYABLE_ERRORS
+
+def retry_after_seconds(error):
+    """Seconds from the Retry-After (or retry-after-ms) header of an error response, if any"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not headers:
+        return None
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        value = headers.get('retry-after')
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt, retry_after=None, base=LLM_RETRY_BASE_DELAY, cap=LLM_RETRY_MAX_DELAY):
+    """Full-jitter exponential delay; a server-given Retry-After is honoured with a little jitter on top"""
+    if retry_after is not None:
+        return retry_after + random.uniform(0, base)
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=LLM_BREAKER_FAILURES, reset_timeout=LLM_BREAKER_RESET):
+        """Open after consecutive failures; let one trial call through after reset_timeout"""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def available(self):
+        """Check whether allow() could let a call through, without taking the half-open trial slot"""
+        with self._lock:
+            if self.state == self.OPEN:
+                return time.monotonic() - self.opened_at >= self.reset_timeout
+            if self.state == self.HALF_OPEN:
+                return not self._trial_running
+            return True
+
+    def acquire(self):
+        """Take permission to send a call: 'trial' for the single half-open call, 'closed', or None"""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+            if self.state == self.HALF_OPEN:
+                if self._trial_running:
+                    return None
+                self._trial_running = True
+                return 'trial'
+            return 'closed' if self.state == self.CLOSED else None
+
+    def allow(self):
+        """Take permission to send a call to this provider (the only trial call when half-open)"""
+        return self.acquire() is not None
+
+    def release(self):
+        """Give back the trial slot taken by acquire() when that call ends without an outcome (e.g. a cancelled hedge)"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+class ProviderStats:
+    def __init__(self, window=LLM_LATENCY_WINDOW):
+        """Rolling latency and outcome samples of one provider"""
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency, success):
+        with self._lock:
+            if success:
+                self.latencies.append(latency)
+            self.outcomes.append(success)
+
+    def percentile(self, q):
+        """Latency percentile of successful calls, or None without samples"""
+        with self._lock:
+            samples = sorted(self.latencies)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def error_rate(self):
+        with self._lock:
+            if not self.outcomes:
+                return 0.0
+            return self.outcomes.count(False) / len(self.outcomes)
+
+    def sample_count(self):
+        with self._lock:
+            return len(self.latencies)
+
+class LLMRouter:
+    def __init__(self, providers, hedge=LLM_HEDGE_ENABLED, default_hedge_delay=LLM_HEDGE_DEFAULT_DELAY,
+                 min_samples=LLM_MIN_SAMPLES, max_workers=16):
+        """Route calls across providers in preference order with hedging and circuit breakers"""
+        self.providers = list(providers)
+        self.hedge = hedge
+        self.default_hedge_delay = default_hedge_delay
+        self.min_samples = min_samples
+        # Gecikmeler (sağlayıcı, işlem) başına tutulur: kısa chat turları ile uzun analizlerin
+        # p95'i ayrıdır. Devre kesici sağlayıcı başınadır.
+        self.stats = {}
+        self.breakers = {name: CircuitBreaker() for name in self.providers}
+        self._in_flight = {name: 0 for name in self.providers}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='llm')
+
+    def _stats(self, provider, operation):
+        key = (provider, operation)
+        stats = self.stats.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self.stats.setdefault(key, ProviderStats())
+        return stats
+
+    def _candidates(self, calls):
+        """Providers with a call and a closed (or trial) breaker, in preference order.
+
+        Returns (providers, forced); forced means every breaker is open and the primary is tried anyway.
+        The half-open trial slot is taken by _acquire only when a provider is actually called, so a
+        hedge that is never launched does not keep its breaker half-open forever.
+        """
+        available = [name for name in self.providers if name in calls]
+        allowed = [name for name in available if self.breakers[name].available()]
+        # Tüm devreler açıksa yine de birincil sağlayıcıyı dene
+        return (allowed, False) if allowed else (available[:1], True)
+
+    def _acquire(self, provider, forced):
+        """Take the breaker's permission right before calling a provider ('trial', 'closed', 'forced' or None)"""
+        return 'forced' if forced else self.breakers[provider].acquire()
+
+    def hedge_delay(self, provider, operation='default'):
+        """Wait this long for a provider before hedging: its p95 for this operation, or a default until warmed up"""
+        stats = self.stats.get((provider, operation))
+        if stats is None or stats.sample_count() < self.min_samples:
+            return self.default_hedge_delay
+        return stats.percentile(0.95)
+
+    def _run(self, provider, call, is_valid, operation):
+        started = time.monotonic()
+        with self._lock:
+            self._in_flight[provider] += 1
+        try:
+            result = call()
+        except Exception:
+            self._record(provider, operation, time.monotonic() - started, False)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight[provider] -= 1
+        valid = is_valid(result)
+        self._record(provider, operation, time.monotonic() - started, valid)
+        if not valid:
+            raise ValueError(f"{provider} geçersiz yanıt döndürdü")
+        return result
+
+    async def _run_async(self, provider, call, is_valid, operation, trial=False):
+        started = time.monotonic()
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            # Deneme hakkını sadece onu alan çağrı geri verir
+            if trial:
+                self.breakers[provider].release()
+            raise
+        except Exception:
+            self._record(provider, operation, time.monotonic() - started, False)
+            raise
+        valid = is_valid(result)
+        self._record(provider, operation, time.monotonic() - started, valid)
+        if not valid:
+            raise ValueError(f"{provider} geçersiz yanıt döndürdü")
+        return result
+
+    def _record(self, provider, operation, latency, success):
+        self._stats(provider, operation).record(latency, success)
+        if success:
+            self.breakers[provider].record_success()
+        else:
+            self.breakers[provider].record_failure()
+
+    def call(self, calls, is_valid=lambda result: result is not None, operation='default', with_provider=False):
+        """Run calls[provider]() on the preferred provider, hedging to the next one when slow.
+
+        Returns the first valid result, or (provider, result) with with_provider; raises the last
+        error if every provider fails.
+        A thread cannot be cancelled, so the losing request of a hedged pair still runs to the end
+        and is paid for (quota and API cost). This path therefore hedges only to a provider that
+        has no request of its own in flight; call_async cancels the loser and always hedges.
+        """
+        pending_providers, forced = self._candidates(calls)
+        running = {}
+        last_error = None
+        hedge = self.hedge
+
+        def launch():
+            while pending_providers:
+                provider = pending_providers.pop(0)
+                if not self._acquire(provider, forced):
+                    continue
+                future = self._executor.submit(self._run, provider, calls[provider], is_valid, operation)
+                running[future] = provider
+                return provider
+            return None
+
+        current = launch()
+        while running:
+            timeout = None
+            if hedge and pending_providers and len(running) == 1:
+                timeout = self.hedge_delay(current, operation)
+
+            done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                with self._lock:
+                    busy = self._in_flight[pending_providers[0]] > 0
+                if busy:
+                    # İkinci sağlayıcı meşgul: iptal edilemeyen ikinci bir istek için ödeme yapılmaz
+                    hedge = False
+                    continue
+                # Birincil sağlayıcı p95'i aştı: ikinciye hedge isteği gönder
+                current = launch() or current
+                continue
+
+            for future in done:
+                provider = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                return (provider, result) if with_provider else result
+
+            if not running and pending_providers:
+                current = launch()
+
+        raise last_error or RuntimeError("Kullanılabilir yapay zeka servisi yok")
+
+    async def call_async(self, calls, is_valid=lambda result: result is not None, operation='default',
+                         with_provider=False):
+        """Async version of call; calls[provider]() returns a coroutine.
+
+        Unlike threads, the slower request of a hedged pair is cancelled once the other one wins.
+        """
+        pending_providers, forced = self._candidates(calls)
+        running = {}
+        last_error = None
+
+        def launch():
+            while pending_providers:
+                provider = pending_providers.pop(0)
+                permit = self._acquire(provider, forced)
+                if not permit:
+                    continue
+                task = asyncio.ensure_future(self._run_async(provider, calls[provider], is_valid,
+                                                             operation, trial=permit == 'trial'))
+                running[task] = provider
+                return provider
+            return None
+
+        current = launch()
+        try:
+            while running:
+                timeout = None
+                if self.hedge and pending_providers and len(running) == 1:
+                    timeout = self.hedge_delay(current, operation)
+
+                done, _ = await asyncio.wait(list(running), timeout=timeout,
+                                             return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    current = launch() or current
+                    continue
+
+                for task in done:
+                    provider = running.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        last_error = e
+                        continue
+                    return (provider, result) if with_provider else result
+
+                if not running and pending_providers:
+                    current = launch()
+        finally:
+            # İptal edilen istek başarısızlık sayılmaz (CancelledError, Exception değildir)
+            for task in running:
+                task.cancel()
+
+        raise last_error or RuntimeError("Kullanılabilir yapay zeka servisi yok")
+
+    def stream(self, calls, operation='stream'):
+        """Stream from the preferred provider, failing over only before the first chunk"""
+        last_error = None
+        providers, forced = self._candidates(calls)
+        for provider in providers:
+            if not self._acquire(provider, forced):
+                continue
+            started = time.monotonic()
+            try:
+                chunks = iter(calls[provider]())
+                first = next(chunks)
+            except StopIteration:
+                self._record(provider, operation, time.monotonic() - started, False)
+                last_error = ValueError(f"{provider} boş yanıt döndürdü")
+                continue
+            except Exception as e:
+                self._record(provider, operation, time.monotonic() - started, False)
+                last_error = e
+                continue
+
+            # Akışlarda gecikme olarak ilk parçaya kadar geçen süre kaydedilir
+            self._record(provider, operation, time.monotonic() - started, True)
+            yield first
+            yield from chunks
+            return
+
+        raise last_error or RuntimeError("Kullanılabilir yapay zeka servisi yok")
+
+    def get_stats(self):
+        """Breaker state per provider, with latency percentiles and error rates per operation"""
+        with self._lock:
+            stats = dict(self.stats)
+        return {
+            name: {
+                'breaker': self.breakers[name].state,
+                'operations': {
+                    operation: {
+                        'p50': provider_stats.percentile(0.5),
+                        'p95': provider_stats.percentile(0.95),
+                        'error_rate': provider_stats.error_rate(),
+                        'samples': provider_stats.sample_count()
+                    }
+                    for (provider, operation), provider_stats in stats.items() if provider == name
+                }
+            }
+            for name in self.providers
+        }
@@ -0,0 +1,166 @@
+import json
+from config.settings import SYSTEM_PROMPT, OPENAI_MODEL, PROMPT_TOKEN_BUDGET
+from utils.metrics import PROMPT_BUILD_SECONDS, timed
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+CHARS_PER_TOKEN = 4
+
+_encoding = None
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None:
+        try:
+            _encoding = tiktoken.encoding_for_model(OPENAI_MODEL)
+        except KeyError:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+    return _encoding
+
+def count_tokens(text):
+    """Count tokens locally with tiktoken when installed, otherwise estimate ~4 characters per token"""
+    if tiktoken is not None:
+        return len(_get_encoding().encode(text, disallowed_special=()))
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text to at most max_tokens, on a line boundary where possible"""
+    if max_tokens <= 0:
+        return ''
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    if tiktoken is not None:
+        encoding = _get_encoding()
+        cut = encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+    else:
+        cut = text[:max_tokens * CHARS_PER_TOKEN]
+
+    # Yarım kalan son satırı at
+    if '\n' in cut:
+        cut = cut[:cut.rfind('\n')]
+    return cut
+
+ANALYST_ROLE = "Sen deneyimli bir Python kod analisti ve geliştiricisisin."
+
+# Her istekte bayt bayt aynı kalan ön ek: sağlayıcıların prompt önbelleği bu kısmı tekrar kullanabilir.
+# Değişken içerik (kod, dokümantasyon) her zaman bundan sonra gelir.
+STATIC_PREFIX = f"""{ANALYST_ROLE}
+
+{SYSTEM_PROMPT}
+
+Önemli kurallar:
+1. Yanıt MUTLAKA geçerli bir JSON olmalı, JSON dışında hiçbir ek metin olmamalı
+2. Tüm alanlar doldurulmalı, boş bırakılmamalı
+3. Kod ile birlikte dokümantasyon verildiyse o da dikkate alınmalı
+4. Her kod örneği için detaylı açıklama eklenmeli
+5. Her bölüm için detaylı ve yapıcı geri bildirim verilmeli"""
+
+ANALYSIS_REQUEST = "Lütfen aşağıdaki içeriği analiz et."
+TRUNCATION_NOTE = "\n# ... (token sınırı nedeniyle kısaltıldı)"
+
+UPDATE_REQUEST = """Aşağıda bu dosyanın önceki sürümü için hazırlanmış analiz raporu ve o sürümden bu yana değişen
+veya eklenen kod birimleri var. Raporu yeni sürüme göre güncelle: değişikliklerle artık geçerli olmayan
+maddeleri çıkar veya düzelt, değişen kodla ilgili yeni bulguları ekle, değişmeyen kısımlarla ilgili
+maddeleri olduğu gibi koru. Raporun TAMAMINI aynı JSON formatında döndür."""
+
+class PromptBuilder:
+    def __init__(self, token_budget=PROMPT_TOKEN_BUDGET):
+        """Initialize with the total input token budget of one request"""
+        self.token_budget = token_budget
+        self.prefix_tokens = count_tokens(STATIC_PREFIX)
+
+    @timed(PROMPT_BUILD_SECONDS, kind='analysis')
+    def build_analysis(self, code, notebook_data=None, digest=None):
+        """Build the analysis prompt as {'system', 'user'}; the system part never changes"""
+        budget = self.token_budget - self.prefix_tokens - count_tokens(ANALYSIS_REQUEST)
+
+        # Öncelik sırası: statik analiz özeti > kod > hücre çıktıları > dokümantasyon;
+        # bütçe aşılırsa önce sonuncular kısalır. Özet küçüktür ve kod kısalsa bile tüm yapıyı anlatır.
+        sections = [
+            ('Static Analysis', digest),
+            ('Code', code),
+            ('Cell Outputs', self.format_outputs(notebook_data)),
+            ('Documentation', self._format_documentation(notebook_data))
+        ]
+
+        parts = []
+        for title, text in sections:
+            if not text:
+                continue
+            header = f"# {title}\n"
+            available = budget - count_tokens(header)
+            if available <= 0:
+                break
+
+            body = text
+            if count_tokens(text) > available:
+                body = truncate_to_tokens(text, available - count_tokens(TRUNCATION_NOTE)) + TRUNCATION_NOTE
+            parts.append((title, header + body))
+            budget -= count_tokens(header + body)
+
+        # Dokümantasyon kodun önünde okunur
+        order = ['Documentation', 'Static Analysis', 'Cell Outputs', 'Code']
+        parts.sort(key=lambda part: order.index(part[0]))
+        content = '\n\n'.join(text for _, text in parts)
+
+        return {
+            'system': STATIC_PREFIX,
+            'user': f"{ANALYSIS_REQUEST}\n\n{content}"
+        }
+
+    @timed(PROMPT_BUILD_SECONDS, kind='update')
+    def build_update(self, previous_analysis, changed_units, removed=(), digest=None):
+        """Build the prompt that revises a previous report using only the changed units"""
+        sections = [f"# Previous Report\n{json.dumps(previous_analysis, ensure_ascii=False)}"]
+        if digest:
+            sections.append(f"# Static Analysis\n{digest}")
+        if changed_units:
+            sections.append("# Changed Units\n" + '\n\n'.join(
+                f"## {unit['name']}\n{unit['source']}" for unit in changed_units))
+        if removed:
+            sections.append("# Removed Units\n" + '\n'.join(f"- {name}" for name in removed))
+        return self.build(f"{UPDATE_REQUEST}\n\n" + '\n\n'.join(sections))
+
+    def build(self, content):
+        """Build a prompt with the static prefix for an already prepared request"""
+        return {'system': STATIC_PREFIX, 'user': content}
+
+    @staticmethod
+    def as_text(prompt):
+        """Single-string form for services without a separate system message"""
+        return f"{prompt['system']}\n\n{prompt['user']}"
+
+    @staticmethod
+    def _format_documentation(notebook_data):
+        if not notebook_data or not notebook_data.get('documentation'):
+            return ''
+
+        doc = notebook_data['documentation']
+        sections = []
+        if doc.get('project_description'):
+            sections.append(f"## Project Description\n{doc['project_description']}")
+        if doc.get('usage_examples'):
+            sections.append(f"## Usage Examples\n{' '.join(doc['usage_examples'])}")
+        if doc.get('parameters'):
+            sections.append(f"## Parameters\n{' '.join(doc['parameters'])}")
+        if doc.get('notes'):
+            sections.append(f"## Notes\n{' '.join(doc['notes'])}")
+        return '\n\n'.join(sections)
+
+    @staticmethod
+    def format_outputs(notebook_data):
+        """Cell outputs as sent in the prompt; also part of the analysis cache key"""
+        if not notebook_data or not notebook_data.get('code_cells'):
+            return ''
+
+        outputs = []
+        for cell in notebook_data['code_cells']:
+            for output in cell.get('outputs', []):
+                content = output['content'].strip()
+                if content:
+                    outputs.append(f"[{cell.get('section', 'General')}] {output['type']}: {content}")
+        return '\n'.join(outputs)
@@ -0,0 +1,151 @@
+import sys
+from analyzers.static_analyzer import default_static_analyzer
+from utils.notebook_handler import NotebookHandler
+
+COMPLEXITY_LIMIT = 10
+FUNCTION_LINES_LIMIT = 50
+NESTING_LIMIT = 4
+ARGS_LIMIT = 5
+
+NOT_ANALYZED = "Hızlı raporda bu bölüm için yapay zeka analizi yapılmadı; ayrıntılar için tam analizi başlatın."
+
+class QuickReporter:
+    def __init__(self, static_analyzer=None, notebook_handler=None):
+        """Build reports from local static analysis only, without any LLM call"""
+        self.static_analyzer = static_analyzer or default_static_analyzer
+        self.notebook_handler = notebook_handler or NotebookHandler(self.static_analyzer)
+
+    def build(self, code_context):
+        """Return an ANALYSIS_TEMPLATE-shaped report for a file, notebook or repository context"""
+        if code_context.get('files'):
+            files = [(f['path'], f['source'], f['notebook_data']) for f in code_context['files']]
+        else:
+            files = [(None, code_context['source'], code_context['notebook_data'])]
+
+        metrics = []
+        for path, source, notebook_data in files:
+            if notebook_data:
+                metrics.append((path, notebook_data, self.static_analyzer.analyze_cells(notebook_data['code_cells'])))
+            else:
+                metrics.append((path, None, self.static_analyzer.analyze(source)))
+
+        return {
+            'proje_amaci': self._purpose(metrics),
+            'proje_ozeti': self._summary(metrics),
+            'kullanilan_teknolojiler': self._technologies(metrics),
+            'genel_degerlendirme': self._assessment(metrics),
+            'guclu_yonler': self._strengths(metrics) or ["Belirgin bir güçlü yön tespit edilmedi"],
+            'iyilestirme_alanlari': self._improvements(metrics) or ["Kural tabanlı kontrollerde sorun bulunmadı"],
+            'kod_ornekleri': [NOT_ANALYZED],
+            'guvenlik_onerileri': self._findings(metrics, 'security') or ["Kural tabanlı güvenlik kontrollerinde sorun bulunmadı"],
+            'performans_onerileri': self._performance(metrics) or ["Kural tabanlı performans kontrollerinde sorun bulunmadı"]
+        }
+
+    @staticmethod
+    def _label(path, text):
+        return f"`{path}`: {text}" if path else text
+
+    def _purpose(self, metrics):
+        docstrings = [self._label(path, m['docstring'].strip().splitlines()[0])
+                      for path, _, m in metrics if m['docstring']]
+        if docstrings:
+            return '\n'.join(docstrings)
+        return "Modül açıklaması (docstring) bulunamadı. " + NOT_ANALYZED
+
+    def _summary(self, metrics):
+        lines = sum(m['lines'] for _, _, m in metrics)
+        functions = sum(len(m['functions']) for _, _, m in metrics)
+        classes = sum(len(m['classes']) for _, _, m in metrics)
+        complexity = sum(m['complexity'] for _, _, m in metrics)
+        nesting = max(m['max_nesting'] for _, _, m in metrics)
+
+        summary = (f"{len(metrics)} dosya, " if len(metrics) > 1 else "")
+        summary += (f"{lines} satır, {functions} fonksiyon/metot, {classes} sınıf. "
+                    f"Toplam döngüsel karmaşıklık {complexity}, en derin iç içe yapı {nesting} seviye.")
+
+        cells = [notebook_data['cell_count'] for _, notebook_data, _ in metrics if notebook_data]
+        if cells:
+            summary += (f" Notebook: {sum(c['code'] for c in cells)} kod, "
+                        f"{sum(c['markdown'] for c in cells)} markdown hücresi.")
+        return summary
+
+    @staticmethod
+    def _technologies(metrics):
+        imports = sorted({name for _, _, m in metrics for name in m['imports']})
+        # Standart kütüphane modülleri ayrıca işaretlenir
+        stdlib = getattr(sys, 'stdlib_module_names', set())
+        technologies = ["Python"]
+        technologies += [f"{name} (standart kütüphane)" if name in stdlib else name for name in imports]
+        return technologies
+
+    def _assessment(self, metrics):
+        parts = []
+        for path, notebook_data, m in metrics:
+            if m['syntax_error']:
+                parts.append(self._label(path, f"Kod ayrıştırılamadı: {m['syntax_error']}"))
+            if notebook_data:
+                organization = self.notebook_handler.is_notebook_organized(
+                    notebook_data['markdown_content'], notebook_data['code_cells'])
+                parts.append(self._label(path, (
+                    f"Notebook düzeni: giriş bölümü {'var' if organization['has_introduction'] else 'yok'}, "
+                    f"bölüm başlıkları {'var' if organization['has_sections'] else 'yok'}, "
+                    f"kod/markdown hücre oranı {organization['code_markdown_ratio']:.1f}, "
+                    f"ortalama kod hücresi {organization['avg_code_cell_length']:.1f} satır."
+                )))
+                if notebook_data['has_errors']:
+                    parts.append(self._label(path, "Notebook hata çıktısı içeren hücreler barındırıyor."))
+
+        functions = [f for _, _, m in metrics for f in m['functions']]
+        if functions:
+            documented = sum(f['docstring'] for f in functions)
+            average = sum(f['complexity'] for f in functions) / len(functions)
+            parts.append(f"Fonksiyonların %{documented * 100 // len(functions)}'i belgelenmiş, "
+                         f"ortalama karmaşıklık {average:.1f}.")
+        parts.append("Bu rapor yalnızca yerel statik analizle hazırlanan hızlı rapordur.")
+        return ' '.join(parts)
+
+    @staticmethod
+    def _strengths(metrics):
+        strengths = []
+        functions = [f for _, _, m in metrics for f in m['functions']]
+        if functions and all(f['complexity'] <= COMPLEXITY_LIMIT for f in functions):
+            strengths.append(f"Tüm fonksiyonların döngüsel karmaşıklığı {COMPLEXITY_LIMIT} veya altında")
+        if functions and sum(f['docstring'] for f in functions) >= len(functions) * 0.8:
+            strengths.append("Fonksiyonların büyük çoğunluğu docstring ile belgelenmiş")
+        if any(m['docstring'] for _, _, m in metrics):
+            strengths.append("Modül düzeyinde açıklama mevcut")
+        if all(not m['findings'] for _, _, m in metrics):
+            strengths.append("Kural tabanlı güvenlik ve performans kontrollerinde bulgu yok")
+        return strengths
+
+    def _improvements(self, metrics):
+        improvements = []
+        for path, _, m in metrics:
+            for f in m['functions']:
+                name = self._label(path, f"`{f['name']}` (satır {f['lineno']})")
+                if f['complexity'] > COMPLEXITY_LIMIT:
+                    improvements.append(f"{name} karmaşıklığı {f['complexity']}; daha küçük fonksiyonlara bölünmeli")
+                if f['lines'] > FUNCTION_LINES_LIMIT:
+                    improvements.append(f"{name} {f['lines']} satır; sorumlulukları ayrılmalı")
+                if f['max_nesting'] > NESTING_LIMIT:
+                    improvements.append(f"{name} {f['max_nesting']} seviye iç içe; erken dönüşlerle sadeleştirilmeli")
+                if f['args'] > ARGS_LIMIT:
+                    improvements.append(f"{name} {f['args']} parametre alıyor; parametreler gruplanmalı")
+            undocumented = [f['name'] for f in m['functions'] if not f['docstring']]
+            if undocumented:
+                improvements.append(self._label(path, f"{len(undocumented)} fonksiyonda docstring yok"))
+            improvements += [self._label(path, f"Satır {finding['line']}: {finding['message']}")
+                             for finding in m['findings'] if finding['category'] == 'quality']
+        return improvements
+
+    def _findings(self, metrics, category):
+        return [self._label(path, f"Satır {finding['line']}: {finding['message']}")
+                for path, _, m in metrics for finding in m['findings'] if finding['category'] == category]
+
+    def _performance(self, metrics):
+        performance = self._findings(metrics, 'performance')
+        for path, _, m in metrics:
+            if m['nested_loops']:
+                performance.append(self._label(path, f"{m['nested_loops']} iç içe döngü var; "
+                                                     "büyük verilerde vektörel işlemler veya sözlük aramaları düşünülmeli"))
+        return performance
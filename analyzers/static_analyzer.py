@@ -0,0 +1,329 @@
+import ast
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from config.settings import STATIC_ANALYSIS_CACHE_SIZE
+
+# Notebook sihirli komutları (%matplotlib, !pip ...) Python sözdizimi değildir
+_MAGIC_LINE = re.compile(r'^\s*[%!].*$', re.MULTILINE)
+
+BRANCH_NODES = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.IfExp, ast.ExceptHandler, ast.Assert)
+BLOCK_NODES = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.Try, ast.With, ast.AsyncWith)
+LOOP_NODES = (ast.For, ast.AsyncFor, ast.While)
+if hasattr(ast, 'Match'):
+    BRANCH_NODES += (ast.match_case,)
+    BLOCK_NODES += (ast.Match,)
+if hasattr(ast, 'TryStar'):
+    BLOCK_NODES += (ast.TryStar,)
+
+SECRET_NAME = re.compile(r'(password|passwd|secret|token|api_?key)', re.IGNORECASE)
+
+def _call_name(node):
+    """Dotted name of a call target such as 'os.system' or 'eval'"""
+    parts = []
+    func = node.func
+    while isinstance(func, ast.Attribute):
+        parts.append(func.attr)
+        func = func.value
+    if isinstance(func, ast.Name):
+        parts.append(func.id)
+    return '.'.join(reversed(parts))
+
+# CPython 3.11'de ast.parse sonucunu Python nesnelerine çevirirken yorumlayıcı genelinde ortak bir
+# özyineleme sayacı kullanılır; eşzamanlı çağrılar "AST constructor recursion depth mismatch" verebilir
+_parse_lock = threading.Lock()
+
+def parse_source(code):
+    """ast.parse that is safe to call from several analysis threads"""
+    with _parse_lock:
+        return ast.parse(code)
+
+def strip_magics(code):
+    """Blank out notebook magic lines while keeping line numbers"""
+    return _MAGIC_LINE.sub('', code)
+
+class _MetricsVisitor(ast.NodeVisitor):
+    """Collect imports, symbols and complexity of a module in a single walk"""
+
+    def __init__(self):
+        self.imports = set()
+        self.functions = []
+        self.classes = []
+        self.globals = set()
+        self.findings = []
+        self.conditionals = 0
+        self.nested_loops = 0
+        self.max_nesting = 0
+        self._scopes = []       # açık fonksiyon kayıtları
+        self._class_stack = []
+        self._depth = 0
+        self._loop_depth = 0
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.imports.add(alias.name.split('.')[0])
+
+    def visit_ImportFrom(self, node):
+        # Göreli importlar (from . import x) projenin kendi modülleridir
+        if node.module and not node.level:
+            self.imports.add(node.module.split('.')[0])
+
+    def visit_Assign(self, node):
+        names = [name.id for target in node.targets for name in ast.walk(target) if isinstance(name, ast.Name)]
+        if not self._scopes and not self._class_stack:
+            self.globals.update(names)
+
+        if (isinstance(node.value, ast.Constant) and isinstance(node.value.value, str) and node.value.value
+                and any(SECRET_NAME.search(name) for name in names)):
+            self._finding('security', node, "Koda gömülü parola/anahtar; ortam değişkeninden okunmalı")
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        name = _call_name(node)
+        keywords = {keyword.arg: keyword.value for keyword in node.keywords}
+
+        if name in ('eval', 'exec'):
+            self._finding('security', node, f"{name}() kullanımı dışarıdan gelen veriyle kod çalıştırabilir")
+        elif name in ('os.system', 'os.popen'):
+            self._finding('security', node, f"{name}() yerine argüman listesiyle subprocess.run kullanılmalı")
+        elif name.startswith('subprocess.') and isinstance(keywords.get('shell'), ast.Constant) \
+                and keywords['shell'].value is True:
+            self._finding('security', node, "shell=True komut enjeksiyonuna açıktır")
+        elif name in ('pickle.load', 'pickle.loads'):
+            self._finding('security', node, "Güvenilmeyen veriyi pickle ile yüklemek kod çalıştırabilir")
+        elif name == 'yaml.load' and 'Loader' not in keywords:
+            self._finding('security', node, "yaml.load yerine yaml.safe_load kullanılmalı")
+        if isinstance(keywords.get('verify'), ast.Constant) and keywords['verify'].value is False:
+            self._finding('security', node, "verify=False TLS sertifika doğrulamasını kapatır")
+
+        if name.endswith('.iterrows'):
+            self._finding('performance', node, "iterrows() yavaştır; vektörel işlemler veya itertuples() tercih edilmeli")
+        self.generic_visit(node)
+
+    def visit_For(self, node):
+        # for i in range(len(x))
+        if (isinstance(node.iter, ast.Call) and _call_name(node.iter) == 'range' and len(node.iter.args) == 1
+                and isinstance(node.iter.args[0], ast.Call) and _call_name(node.iter.args[0]) == 'len'):
+            self._finding('performance', node, "range(len(...)) yerine doğrudan yineleme veya enumerate() kullanılmalı")
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node):
+        if self._loop_depth and isinstance(node.op, ast.Add) and (
+                isinstance(node.value, ast.JoinedStr)
+                or (isinstance(node.value, ast.Constant) and isinstance(node.value.value, str))):
+            self._finding('performance', node, "Döngü içinde string birleştirme; parçaları listede toplayıp ''.join() kullanılmalı")
+        self.generic_visit(node)
+
+    def visit_ExceptHandler(self, node):
+        if node.type is None:
+            self._finding('quality', node, "Çıplak except: tüm hataları (KeyboardInterrupt dahil) yutar")
+        self.generic_visit(node)
+
+    def _finding(self, category, node, message):
+        self.findings.append({'category': category, 'line': node.lineno, 'message': message})
+
+    def visit_ClassDef(self, node):
+        record = {
+            'name': node.name,
+            'lineno': node.lineno,
+            'bases': [ast.unparse(base) for base in node.bases],
+            'methods': []
+        }
+        self.classes.append(record)
+        self._class_stack.append(record)
+        self.generic_visit(node)
+        self._class_stack.pop()
+
+    def _visit_function(self, node):
+        owner = self._class_stack[-1] if self._class_stack and not self._scopes else None
+        record = {
+            'name': f"{owner['name']}.{node.name}" if owner else node.name,
+            'lineno': node.lineno,
+            'lines': node.end_lineno - node.lineno + 1,
+            'args': len(node.args.posonlyargs) + len(node.args.args) + len(node.args.kwonlyargs),
+            'complexity': 1,
+            'max_nesting': 0,
+            'docstring': ast.get_docstring(node) is not None
+        }
+        if owner:
+            owner['methods'].append(node.name)
+        self.functions.append(record)
+
+        # İç içe fonksiyonların kendi derinlik sayacı vardır
+        saved = self._depth, self._loop_depth
+        self._depth = self._loop_depth = 0
+        self._scopes.append(record)
+        self.generic_visit(node)
+        self._scopes.pop()
+        self._depth, self._loop_depth = saved
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def visit_BoolOp(self, node):
+        self._add_complexity(len(node.values) - 1)
+        self.generic_visit(node)
+
+    def visit_comprehension(self, node):
+        self._add_complexity(1 + len(node.ifs))
+        self.generic_visit(node)
+
+    def generic_visit(self, node):
+        if isinstance(node, BRANCH_NODES):
+            self._add_complexity(1)
+        if isinstance(node, ast.If):
+            self.conditionals += 1
+
+        is_block = isinstance(node, BLOCK_NODES)
+        is_loop = isinstance(node, LOOP_NODES)
+        if is_block:
+            self._depth += 1
+            self.max_nesting = max(self.max_nesting, self._depth)
+            if self._scopes:
+                self._scopes[-1]['max_nesting'] = max(self._scopes[-1]['max_nesting'], self._depth)
+        if is_loop:
+            if self._loop_depth:
+                self.nested_loops += 1
+            self._loop_depth += 1
+
+        super().generic_visit(node)
+
+        if is_block:
+            self._depth -= 1
+        if is_loop:
+            self._loop_depth -= 1
+
+    def _add_complexity(self, amount):
+        if self._scopes:
+            self._scopes[-1]['complexity'] += amount
+
+class StaticAnalyzer:
+    def __init__(self, cache_size=STATIC_ANALYSIS_CACHE_SIZE):
+        """Initialize with an LRU of results keyed by source hash"""
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def analyze(self, code):
+        """Return static metrics of Python source; notebook magics are ignored"""
+        key = hashlib.sha256(code.encode('utf-8')).hexdigest()
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        metrics = self._compute(code)
+
+        with self._lock:
+            self._cache[key] = metrics
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return metrics
+
+    def analyze_cells(self, code_cells):
+        """Metrics of a notebook; cells that do not parse are skipped and counted"""
+        valid = []
+        skipped = 0
+        for cell in code_cells:
+            try:
+                parse_source(strip_magics(cell['code']))
+                valid.append(cell['code'])
+            except SyntaxError:
+                skipped += 1
+
+        metrics = dict(self.analyze('\n\n'.join(valid)))
+        metrics['lines'] = sum(len(cell['code'].split('\n')) for cell in code_cells)
+        metrics['skipped_cells'] = skipped
+        return metrics
+
+    @staticmethod
+    def _compute(code):
+        metrics = {
+            'lines': len(code.split('\n')),
+            'imports': [],
+            'functions': [],
+            'classes': [],
+            'globals': [],
+            'complexity': 0,
+            'max_nesting': 0,
+            'conditionals': 0,
+            'nested_loops': 0,
+            'findings': [],
+            'docstring': None,
+            'syntax_error': None
+        }
+        try:
+            tree = parse_source(strip_magics(code))
+        except (SyntaxError, ValueError) as e:
+            metrics['syntax_error'] = str(e)
+            return metrics
+
+        visitor = _MetricsVisitor()
+        visitor.visit(tree)
+        metrics.update(
+            imports=sorted(visitor.imports),
+            functions=visitor.functions,
+            classes=visitor.classes,
+            globals=sorted(visitor.globals),
+            complexity=sum(function['complexity'] for function in visitor.functions),
+            max_nesting=visitor.max_nesting,
+            conditionals=visitor.conditionals,
+            nested_loops=visitor.nested_loops,
+            findings=visitor.findings,
+            docstring=ast.get_docstring(tree)
+        )
+        return metrics
+
+    @staticmethod
+    def _overview(metrics):
+        lines = [f"lines: {metrics['lines']}, functions: {len(metrics['functions'])}, "
+                 f"classes: {len(metrics['classes'])}, total complexity: {metrics['complexity']}, "
+                 f"max nesting: {metrics['max_nesting']}"]
+        if metrics['syntax_error']:
+            lines.append(f"syntax error: {metrics['syntax_error']}")
+        if metrics['imports']:
+            lines.append(f"imports: {', '.join(metrics['imports'])}")
+        return lines
+
+    @staticmethod
+    def _findings(metrics, limit=10):
+        return [f"{finding['category']} (line {finding['line']}): {finding['message']}"
+                for finding in metrics['findings'][:limit]]
+
+    @staticmethod
+    def summary(metrics):
+        """Overview and findings only; for prompts that also carry the code itself"""
+        return '\n'.join(StaticAnalyzer._overview(metrics) + StaticAnalyzer._findings(metrics))
+
+    @staticmethod
+    def digest(metrics, max_functions=40, exclude=()):
+        """Compact text summary of the metrics for the LLM prompt, standing in for code that is not sent.
+
+        Classes and functions named in exclude (e.g. units whose source is in the prompt) are left out.
+        """
+        def excluded(name):
+            return name in exclude or name.split('.')[0] in exclude
+
+        lines = StaticAnalyzer._overview(metrics)
+        for cls in metrics['classes']:
+            if excluded(cls['name']):
+                continue
+            bases = f"({', '.join(cls['bases'])})" if cls['bases'] else ''
+            lines.append(f"class {cls['name']}{bases} line {cls['lineno']}: {', '.join(cls['methods']) or '-'}")
+
+        lines.extend(StaticAnalyzer._findings(metrics))
+
+        # En karmaşık fonksiyonlar önce
+        functions = sorted((f for f in metrics['functions'] if not excluded(f['name'])),
+                           key=lambda f: (-f['complexity'], f['lineno']))
+        if functions:
+            lines.append("functions (name: lines, complexity, nesting):")
+            for function in functions[:max_functions]:
+                lines.append(f"- {function['name']} (line {function['lineno']}): {function['lines']}L, "
+                             f"cc={function['complexity']}, depth={function['max_nesting']}")
+            if len(functions) > max_functions:
+                lines.append(f"- ... +{len(functions) - max_functions} more")
+        return '\n'.join(lines)
+
+default_static_analyzer = StaticAnalyzer()
@@ -0,0 +1,41 @@
+from collections import Counter
+from analyzers.code_chunker import CodeChunker
+
+def split_units(code, notebook_data=None, chunker=None):
+    """Split a file into comparable units: top-level functions/classes, or notebook cells"""
+    if notebook_data and notebook_data.get('code_cells'):
+        return [{'name': f"{cell.get('section', 'General')} / hücre {number}", 'source': cell['code']}
+                for number, cell in enumerate(notebook_data['code_cells'], 1)]
+    return (chunker or CodeChunker()).split_python(code)
+
+def _normalize(source):
+    # Satır sonu boşlukları ve boş satırlar değişiklik sayılmaz
+    return '\n'.join(line.rstrip() for line in source.strip().splitlines() if line.strip())
+
+def diff_units(old_units, new_units):
+    """Compare two versions unit by unit.
+
+    A unit is unchanged when the old version has a unit with the same normalized source, so moved
+    functions and reordered cells are not reported. Returns {'changed', 'removed', 'total'} where
+    changed are new units without a match and removed are names of old units that have neither a
+    match nor a changed unit of the same name.
+    """
+    old_sources = Counter(_normalize(unit['source']) for unit in old_units)
+    changed = []
+    for unit in new_units:
+        source = _normalize(unit['source'])
+        if old_sources[source]:
+            old_sources[source] -= 1
+        else:
+            changed.append(unit)
+
+    changed_names = {unit['name'] for unit in changed}
+    removed = []
+    for unit in old_units:
+        source = _normalize(unit['source'])
+        if old_sources[source]:
+            old_sources[source] -= 1
+            if unit['name'] not in changed_names:
+                removed.append(unit['name'])
+
+    return {'changed': changed, 'removed': list(dict.fromkeys(removed)), 'total': len(new_units)}
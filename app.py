@@ -1,53 +1,380 @@
-from flask import Flask, render_template, request, jsonify
-from database.chat_history import ChatHistory
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context, url_for
+from database.chat_history import ChatHistory, to_datetime
+from database.analysis_cache import AnalysisCache
+from database.job_store import JobStore
+from database.rate_limiter import RateLimiter
 from utils.github_handler import GitHubHandler
 from utils.notebook_handler import NotebookHandler
+from utils.job_queue import AnalysisJobQueue, QueueFullError
+from utils.bulk_runner import BulkAnalyzer
+from utils.async_runtime import default_runtime
+from utils import metrics
 from analyzers.code_analyzer import CodeAnalyzer
+from analyzers.code_index import CodeIndex
+from analyzers.chat_memory import ChatMemory
+from analyzers.quick_report import QuickReporter
 from formatters.output_formatter import OutputFormatter
+from config.settings import (
+    REPO_ANALYSIS_CONCURRENCY,
+    CODE_INDEX_CACHE_SIZE,
+    SIDEBAR_PAGE_SIZE,
+    HISTORY_PAGE_SIZE,
+    JOB_EVENTS_MAX_WAIT,
+    BULK_CONCURRENCY
+)
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+import asyncio
+import click
+import hashlib
+import threading
 import os
+import json
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class CodeFeedbackSystem:
-    def __init__(self, api_keys):
-        self.analyzer = CodeAnalyzer(api_keys)
+    def __init__(self, api_keys, analysis_cache=None, rate_limiter=None):
+        self.analyzer = CodeAnalyzer(api_keys, rate_limiter)
         self.github_handler = GitHubHandler()
         self.notebook_handler = NotebookHandler()
         self.formatter = OutputFormatter()
+        self.quick_reporter = QuickReporter(notebook_handler=self.notebook_handler)
+        self.chat_memory = ChatMemory()
+        self.analysis_cache = analysis_cache
+        self._indexes = OrderedDict()
+        self._indexes_lock = threading.Lock()
 
-    def analyze_code(self, github_url):
-        """Analyze code from GitHub URL"""
+    def _cache_keys(self, code, notebook_data):
+        """Cache keys of the content for each provider the router may answer with, in preference order"""
+        return [
+            self.analysis_cache.make_key(code, notebook_data, provider, self.analyzer.models[provider])
+            for provider in self.analyzer.router.providers
+        ]
+
+    def _analyze(self, code, notebook_data=None):
+        """Run the analyzer, serving repeated inputs from the analysis cache"""
+        if not self.analysis_cache:
+            return self.analyzer.analyze_code(code=code, notebook_data=notebook_data)
+
+        analysis = self.analysis_cache.get_any(self._cache_keys(code, notebook_data))
+        if analysis is not None:
+            return analysis
+
+        analysis, origin = self.analyzer.analyze_code_with_origin(code=code, notebook_data=notebook_data)
+        
+        # Sonuç, yanıtı veren sağlayıcının anahtarıyla saklanır (yedek sağlayıcı birincilin yerine geçmesin).
+        # Hata şablonu ve farklı sağlayıcılardan gelen parçalar önbelleğe alınmaz.
+        if origin:
+            self.analysis_cache.set(self.analysis_cache.make_key(code, notebook_data, *origin), analysis)
+        return analysis
+
+    def validate_url(self, github_url):
+        """Reject URLs that cannot be analyzed before any work is queued"""
+        if self.github_handler.is_repository_url(github_url):
+            return
+        if not github_url.endswith(('.py', '.ipynb')):
+            raise ValueError("Unsupported file format. Only .py and .ipynb files are supported.")
+        self.github_handler.get_raw_github_url(github_url)
+
+    def load_code_context(self, github_url, progress=None):
+        """Fetch a file from GitHub and parse it once for analysis and chat"""
+        progress = progress or (lambda stage: None)
+        self.validate_url(github_url)
+        
+        if self.github_handler.is_repository_url(github_url):
+            return self._load_repository_context(github_url, progress)
+        
+        # Get content from GitHub
+        progress('fetching')
+        content = self.github_handler.get_file_content(github_url)
+        
+        # Handle Jupyter notebooks
+        notebook_data = None
+        if github_url.endswith('.ipynb'):
+            progress('parsing')
+            notebook_data = self.notebook_handler.extract_notebook_code(content)
+        
+        return {'source': content, 'notebook_data': notebook_data}
+
+    def _load_repository_context(self, github_url, progress):
+        """Fetch every .py/.ipynb file under a repository or directory URL concurrently"""
+        progress('fetching')
+        listing = self.github_handler.list_repository_files(github_url)
+        contents = self.github_handler.get_files_content(listing['urls'])
+        
+        progress('parsing')
+        return self._build_repository_context(listing, contents)
+
+    def _build_repository_context(self, listing, contents):
+        """Parse fetched repository files into one code context.
+
+        context['coverage'] tells the report how many of the repository's files were analyzed.
+        """
+        files = []
+        for file_url, content in zip(listing['urls'], contents):
+            path = file_url.split('/blob/', 1)[1].split('/', 1)[1]
+            notebook_data = None
+            if path.endswith('.ipynb'):
+                notebook_data = self.notebook_handler.extract_notebook_code(content)
+            files.append({'path': path, 'source': content, 'notebook_data': notebook_data})
+        
+        # Chat için tüm dosyaların kodunu tek bir bağlamda birleştir
+        source = '\n\n'.join(
+            f"# File: {f['path']}\n{f['notebook_data']['code'] if f['notebook_data'] else f['source']}"
+            for f in files
+        )
+        coverage = {
+            'analyzed_files': len(files),
+            'total_files': listing['total_files'],
+            'tree_truncated': listing['tree_truncated']
+        }
+        return {'source': source, 'notebook_data': None, 'files': files, 'coverage': coverage}
+
+    async def load_code_context_async(self, github_url, progress=None):
+        """Async version of load_code_context"""
+        progress = progress or (lambda stage: None)
+        self.validate_url(github_url)
+        
+        if self.github_handler.is_repository_url(github_url):
+            return await self._load_repository_context_async(github_url, progress)
+        
+        progress('fetching')
+        content = await self.github_handler.get_file_content_async(github_url)
+        
+        notebook_data = None
+        if github_url.endswith('.ipynb'):
+            progress('parsing')
+            notebook_data = await asyncio.to_thread(self.notebook_handler.extract_notebook_code, content)
+        
+        return {'source': content, 'notebook_data': notebook_data}
+
+    async def _load_repository_context_async(self, github_url, progress):
+        """Async version of _load_repository_context"""
+        progress('fetching')
+        # Listeleme bir iki API isteğidir; dosyalar eşzamanlı ve iş parçacığı kullanmadan indirilir
+        listing = await asyncio.to_thread(self.github_handler.list_repository_files, github_url)
+        contents = await self.github_handler.get_files_content_async(listing['urls'])
+        
+        progress('parsing')
+        return await asyncio.to_thread(self._build_repository_context, listing, contents)
+
+    def _analyze_repository(self, files):
+        """Analyze files in parallel and reduce the results into one report"""
+        def analyze_file(file):
+            notebook_data = file['notebook_data']
+            if notebook_data:
+                return self._analyze(code=notebook_data['code'], notebook_data=notebook_data)
+            return self._analyze(code=file['source'])
+        
+        with ThreadPoolExecutor(max_workers=REPO_ANALYSIS_CONCURRENCY) as executor:
+            analyses = list(executor.map(analyze_file, files))
+        
+        return self.analyzer.reduce_analyses(
+            {file['path']: analysis for file, analysis in zip(files, analyses)}
+        )
+
+    async def _analyze_async(self, code, notebook_data=None):
+        """Async version of _analyze"""
+        if not self.analysis_cache:
+            return await self.analyzer.analyze_code_async(code=code, notebook_data=notebook_data)
+
+        analysis = await asyncio.to_thread(self.analysis_cache.get_any, self._cache_keys(code, notebook_data))
+        if analysis is not None:
+            return analysis
+
+        analysis, origin = await self.analyzer.analyze_code_with_origin_async(code=code, notebook_data=notebook_data)
+        
+        if origin:
+            await asyncio.to_thread(self.analysis_cache.set,
+                                    self.analysis_cache.make_key(code, notebook_data, *origin), analysis)
+        return analysis
+
+    async def _analyze_repository_async(self, files):
+        """Async version of _analyze_repository"""
+        semaphore = asyncio.Semaphore(REPO_ANALYSIS_CONCURRENCY)
+
+        async def analyze_file(file):
+            notebook_data = file['notebook_data']
+            async with semaphore:
+                if notebook_data:
+                    return await self._analyze_async(code=notebook_data['code'], notebook_data=notebook_data)
+                return await self._analyze_async(code=file['source'])
+        
+        analyses = await asyncio.gather(*(analyze_file(file) for file in files))
+        return await self.analyzer.reduce_analyses_async(
+            {file['path']: analysis for file, analysis in zip(files, analyses)}
+        )
+
+    def analyze_context(self, code_context, previous=None):
+        """Analyze a loaded code context and return the raw analysis dict.
+
+        previous is an earlier analyzed version of the same file (see ChatHistory.find_previous_analysis);
+        when given, only the units changed since then are sent to the LLM.
+        """
+        notebook_data = code_context['notebook_data']
+        if code_context.get('files'):
+            return self._analyze_repository(code_context['files'])
+        
+        code = notebook_data['code'] if notebook_data else code_context['source']
+        if previous:
+            analysis = self._update_analysis(code, notebook_data, previous)
+            if analysis is not None:
+                return analysis
+        return self._analyze(code=code, notebook_data=notebook_data)
+
+    def _update_analysis(self, code, notebook_data, previous):
+        """Incremental analysis; an exact cache hit for the new version still wins"""
+        if self.analysis_cache:
+            analysis = self.analysis_cache.get_any(self._cache_keys(code, notebook_data))
+            if analysis is not None:
+                return analysis
+        
+        # Sonuç önceki rapora bağlı olduğu için içerik önbelleğine yazılmaz
+        return self.analyzer.update_analysis(code, notebook_data, previous)
+
+    async def analyze_context_async(self, code_context, previous=None):
+        """Async version of analyze_context"""
+        notebook_data = code_context['notebook_data']
+        if code_context.get('files'):
+            return await self._analyze_repository_async(code_context['files'])
+        
+        code = notebook_data['code'] if notebook_data else code_context['source']
+        if previous:
+            analysis = await self._update_analysis_async(code, notebook_data, previous)
+            if analysis is not None:
+                return analysis
+        return await self._analyze_async(code=code, notebook_data=notebook_data)
+
+    async def _update_analysis_async(self, code, notebook_data, previous):
+        """Async version of _update_analysis"""
+        if self.analysis_cache:
+            analysis = await asyncio.to_thread(self.analysis_cache.get_any, self._cache_keys(code, notebook_data))
+            if analysis is not None:
+                return analysis
+        
+        return await self.analyzer.update_analysis_async(code, notebook_data, previous)
+
+    def analyze(self, github_url, code_context=None, progress=None, previous=None):
+        """Analyze code from GitHub URL and return (raw analysis or None on error, formatted response)"""
+        progress = progress or (lambda stage: None)
         try:
-            # Get content from GitHub
-            content = self.github_handler.get_file_content(github_url)
+            if code_context is None:
+                code_context = self.load_code_context(github_url, progress)
             
-            # Handle Jupyter notebooks
-            if github_url.endswith('.ipynb'):
-                notebook_data = self.notebook_handler.extract_notebook_code(content)
-                analysis = self.analyzer.analyze_code(
-                    code=notebook_data['code'], 
-                    notebook_data=notebook_data
-                )
-            elif github_url.endswith('.py'):
-                analysis = self.analyzer.analyze_code(code=content)
-            else:
-                raise ValueError("Unsupported file format. Only .py and .ipynb files are supported.")
+            progress('llm')
+            analysis = self.analyze_context(code_context, previous)
+            
+            progress('formatting')
+            return analysis, self.format_report(analysis, code_context)
+            
+        except Exception as e:
+            return None, f"Error occurred: {str(e)}"
+
+    async def analyze_async(self, github_url, code_context=None, progress=None, previous=None):
+        """Async version of analyze"""
+        progress = progress or (lambda stage: None)
+        try:
+            if code_context is None:
+                code_context = await self.load_code_context_async(github_url, progress)
+            
+            progress('llm')
+            analysis = await self.analyze_context_async(code_context, previous)
             
-            return self.formatter.format_analysis(analysis)
+            progress('formatting')
+            return analysis, await asyncio.to_thread(self.format_report, analysis, code_context)
             
         except Exception as e:
-            return f"Error occurred: {str(e)}"
+            return None, f"Error occurred: {str(e)}"
+
+    def analyze_code(self, github_url, code_context=None, progress=None):
+        """Analyze code from GitHub URL"""
+        return self.analyze(github_url, code_context, progress)[1]
+
+    def format_report(self, analysis, code_context):
+        """Format an analysis as markdown, noting repository files that were left out"""
+        return self.formatter.format_analysis(analysis, code_context.get('coverage'))
+
+    def quick_report(self, code_context):
+        """Format a report from local static analysis only, without an LLM call"""
+        return self.format_report(self.quick_reporter.build(code_context), code_context)
+
+    def _get_index(self, code_context):
+        """Get the symbol index of a code context from a small per-worker LRU"""
+        key = hashlib.sha1(code_context['source'].encode('utf-8')).hexdigest()
+        with self._indexes_lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+                return index
+        
+        index = CodeIndex(code_context['source'], code_context['notebook_data'])
+        with self._indexes_lock:
+            self._indexes[key] = index
+            while len(self._indexes) > CODE_INDEX_CACHE_SIZE:
+                self._indexes.popitem(last=False)
+        return index
+
+    def _chat_inputs(self, message, code_context, memory):
+        """Relevant code for the question and the token-capped conversation memory"""
+        context = self._get_index(code_context).build_context(message)
+        return context, self.chat_memory.build(memory) if memory else None
+
+    def chat_about_code(self, message, code_context, memory=None):
+        """Chat about code using AI; memory is ChatHistory.get_chat_memory() of the conversation"""
+        try:
+            return self.analyzer.chat_about_code(message, *self._chat_inputs(message, code_context, memory))
+        except Exception as e:
+            return f"Chat error: {str(e)}"
 
-    def chat_about_code(self, message, code_context):
-        """Chat about code using AI"""
+    async def chat_about_code_async(self, message, code_context, memory=None):
+        """Async version of chat_about_code"""
         try:
-            return self.analyzer.chat_about_code(message, code_context)
+            inputs = await asyncio.to_thread(self._chat_inputs, message, code_context, memory)
+            return await self.analyzer.chat_about_code_async(message, *inputs)
         except Exception as e:
             return f"Chat error: {str(e)}"
 
-def create_app():
-    """Create and configure the Flask application"""
+    def stream_chat_about_code(self, message, code_context, memory=None):
+        """Stream chat response chunks about code using AI"""
+        try:
+            inputs = self._chat_inputs(message, code_context, memory)
+            for chunk in self.analyzer.stream_chat_about_code(message, *inputs):
+                yield chunk
+        except Exception as e:
+            yield f"Chat error: {str(e)}"
+
+    def remember_turn(self, chat_history, conversation_id, memory):
+        """Call after a new turn is stored; folds turns that left the verbatim window into the summary.
+
+        The summary request runs in the background, so it never delays the answer.
+        """
+        if self.chat_memory.needs_fold(len(memory['turns']) + 1):
+            default_runtime.submit(self._fold_chat_memory(chat_history, conversation_id))
+
+    async def _fold_chat_memory(self, chat_history, conversation_id):
+        try:
+            memory = await asyncio.to_thread(chat_history.get_chat_memory, conversation_id)
+            turns = self.chat_memory.turns_to_fold(memory)
+            if not turns:
+                return
+            
+            prompt = await asyncio.to_thread(self.chat_memory.summary_prompt, memory['summary'], turns)
+            summary = await self.analyzer.generate_text_async(prompt, self.chat_memory.summary_tokens,
+                                                           operation='summary')
+            await asyncio.to_thread(chat_history.save_chat_summary, conversation_id, summary, turns[-1]['id'])
+        except Exception as e:
+            # Özetlenmeyen turlar bir sonraki mesajda tekrar denenir
+            print(f"Chat memory error: {str(e)}")
+
+def sse_event(event, data):
+    """Format a Server-Sent Events frame"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def create_app(test_config=None):
+    """Create and configure the Flask application; test_config overrides settings such as database paths"""
     app = Flask(__name__)
     
     # Configuration
@@ -56,7 +383,11 @@ def create_app():
         GEMINI_API_KEY=os.getenv('GEMINI_API_KEY'),
         DEFAULT_AI_SERVICE=os.getenv('DEFAULT_AI_SERVICE', 'auto'),
         DATABASE=os.path.join(app.instance_path, 'chat_history.sqlite'),
+        ANALYSIS_CACHE=os.path.join(app.instance_path, 'analysis_cache.sqlite'),
+        RATE_LIMITS=os.path.join(app.instance_path, 'rate_limits.sqlite'),
     )
+    if test_config:
+        app.config.from_mapping(test_config)
     
     # Ensure the instance folder exists
     try:
@@ -70,63 +401,229 @@ def create_app():
         "OPENAI_API_KEY": app.config['OPENAI_API_KEY'],
         "GEMINI_API_KEY": app.config['GEMINI_API_KEY']
     }
-    feedback_system = CodeFeedbackSystem(api_keys)
+    analysis_cache = AnalysisCache(app.config['ANALYSIS_CACHE'])
+    rate_limiter = RateLimiter(app.config['RATE_LIMITS'])
+    feedback_system = CodeFeedbackSystem(api_keys, analysis_cache, rate_limiter)
+    job_store = JobStore(app.config['DATABASE'])
+    # Yeniden başlatılan worker'ların yarım kalan işleri sonsuza dek 'running' görünmesin
+    job_store.fail_orphaned_jobs()
+    job_queue = AnalysisJobQueue(feedback_system, chat_history, job_store)
+
+    @app.template_filter('format_timestamp')
+    def format_timestamp(timestamp_us, fmt='%Y-%m-%d %H:%M'):
+        """Format stored epoch microseconds only where they are displayed"""
+        return to_datetime(timestamp_us).strftime(fmt)
+
+    def render_chat(**context):
+        """Render chat.html with the first page of the conversation sidebar"""
+        page = chat_history.get_conversations_page()
+        return render_template('chat.html',
+                             histories=page['conversations'],
+                             histories_cursor=page['next_cursor'],
+                             **context)
 
     @app.route('/')
     def home():
         """Home page route with conversation history"""
-        histories = chat_history.get_all_conversations()
-        return render_template('chat.html', histories=histories)
+        return render_chat()
+
+    @app.route('/api/conversations')
+    def list_conversations():
+        """Get the next page of the conversation sidebar"""
+        try:
+            limit = max(1, min(request.args.get('limit', SIDEBAR_PAGE_SIZE, type=int), 100))
+            page = chat_history.get_conversations_page(limit, request.args.get('cursor'))
+            return jsonify({
+                'conversations': [
+                    {
+                        'id': conversation['id'],
+                        'name': conversation['github_url'].split('/')[-1],
+                        'url': url_for('get_history', conversation_id=conversation['id']),
+                        'created_at': format_timestamp(conversation['created_at'])
+                    } for conversation in page['conversations']
+                ],
+                'next_cursor': page['next_cursor']
+            })
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+    @app.route('/api/conversations/<int:conversation_id>/messages')
+    def list_messages(conversation_id):
+        """Get the page of messages before the cursor, oldest first, for scrolling back through a conversation"""
+        try:
+            limit = max(1, min(request.args.get('limit', HISTORY_PAGE_SIZE, type=int), 100))
+            page = chat_history.get_messages_page(conversation_id, limit, request.args.get('cursor'))
+            return jsonify({
+                'messages': [
+                    {
+                        'id': msg['id'],
+                        'message': msg['message'],
+                        # HTML'i saklanmamış eski mesajlar istemcide render edilir
+                        'response': msg['response'] if msg['response_html'] is None else None,
+                        'response_html': msg['response_html'],
+                        'timestamp': format_timestamp(msg['timestamp'])
+                    } for msg in page['messages']
+                ],
+                'next_cursor': page['next_cursor']
+            })
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
     @app.route('/analyze', methods=['POST'])
-    def analyze():
-        """Analyze code from GitHub URL"""
+    async def analyze():
+        """Queue analysis of code from GitHub URL and return a job ID"""
         try:
             data = request.json
             github_url = data['url']
+            feedback_system.validate_url(github_url)
+            
+            if data.get('mode') == 'quick':
+                return await quick_analyze(github_url)
             
             # Start new conversation
             conversation_id = chat_history.start_conversation(github_url)
             
-            # Analyze code
-            response = feedback_system.analyze_code(github_url)
+            # Analyze code in the background
+            job_id = job_queue.submit(conversation_id, github_url)
             
-            # Save initial analysis
-            chat_history.add_message(conversation_id, "Analyze code", response)
+            return jsonify({
+                'conversation_id': conversation_id,
+                'job_id': job_id
+            }), 202
             
+        except QueueFullError as e:
+            return jsonify({
+                'error': str(e)
+            }), 503
+        except Exception as e:
+            return jsonify({
+                'error': str(e)
+            }), 400
+
+    async def quick_analyze(github_url):
+        """Answer with a static-analysis report right away; the LLM analysis can follow later"""
+        code_context = await default_runtime.run(feedback_system.load_code_context_async(github_url))
+        conversation_id = chat_history.start_conversation(github_url)
+        chat_history.save_code_context(conversation_id, code_context['source'],
+                                       code_context['notebook_data'],
+                                       feedback_system.github_handler.get_repo_path(github_url))
+        
+        response = feedback_system.quick_report(code_context)
+        chat_history.add_message(conversation_id, "Quick report", response)
+        
+        return jsonify({
+            'conversation_id': conversation_id,
+            'response': response,
+            'mode': 'quick'
+        })
+
+    @app.route('/analyze/<int:conversation_id>/full', methods=['POST'])
+    def upgrade_analysis(conversation_id):
+        """Queue the full LLM analysis for a conversation that started with a quick report"""
+        try:
+            try:
+                github_url = chat_history.get_github_url(conversation_id)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 404
+
+            # Tek dosyalarda kayıtlı bağlam kullanılır; depolar dosya listesi için yeniden alınır
+            code_context = None
+            if not feedback_system.github_handler.is_repository_url(github_url):
+                code_context = chat_history.get_code_context(conversation_id)
+            
+            job_id = job_queue.submit(conversation_id, github_url, code_context)
             return jsonify({
                 'conversation_id': conversation_id,
-                'response': response
-            })
+                'job_id': job_id
+            }), 202
             
+        except QueueFullError as e:
+            return jsonify({
+                'error': str(e)
+            }), 503
         except Exception as e:
             return jsonify({
                 'error': str(e)
             }), 400
 
+    @app.route('/jobs/<job_id>')
+    def job_status(job_id):
+        """Get status, stage and result of an analysis job"""
+        job = job_store.get_job(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(job)
+
+    @app.route('/jobs/<job_id>/events')
+    def job_events(job_id):
+        """Subscribe to stage changes of an analysis job as Server-Sent Events"""
+        job = job_store.get_job(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        def generate():
+            last_stage = None
+            deadline = time.monotonic() + JOB_EVENTS_MAX_WAIT
+            while True:
+                job = job_store.get_job(job_id)
+                if job is None:
+                    # Saklama süresi dolan iş başka bir istekte silinmiş olabilir
+                    yield sse_event('error', {'id': job_id, 'error': 'Job not found'})
+                    return
+                if job['stage'] != last_stage:
+                    last_stage = job['stage']
+                    yield sse_event('progress', job)
+                if job['status'] in ('done', 'failed'):
+                    return
+                if time.monotonic() >= deadline:
+                    # İstemci yeniden bağlanabilir veya /jobs/<id> ile sorgulamaya devam edebilir
+                    yield sse_event('timeout', {'id': job_id, 'stage': job['stage']})
+                    return
+                time.sleep(0.5)
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
     @app.route('/chat', methods=['POST'])
-    def chat():
+    async def chat():
         """Handle chat messages"""
         try:
             data = request.json
             message = data['message']
             conversation_id = data['conversation_id']
             
-            # Get conversation history
-            history = chat_history.get_conversation_history(conversation_id)
-            github_url = history['github_url']
+            # Get code context stored when the conversation started
+            code_context = chat_history.get_code_context(conversation_id)
+            
+            if code_context is None:
+                # Conversations created before code contexts were stored
+                github_url = chat_history.get_github_url(conversation_id)
+                code_context = await default_runtime.run(feedback_system.load_code_context_async(github_url))
+                chat_history.save_code_context(conversation_id, code_context['source'],
+                                               code_context['notebook_data'],
+                                               feedback_system.github_handler.get_repo_path(github_url))
             
-            # Get code context
-            code_context = feedback_system.github_handler.get_file_content(github_url)
+            # Son turlar ve eski turların özeti; toplam boyut CHAT_MEMORY_TOKEN_BUDGET ile sınırlı
+            memory = chat_history.get_chat_memory(conversation_id)
             
-            if github_url.endswith('.ipynb'):
-                code_context = feedback_system.notebook_handler.extract_notebook_code(code_context)
+            if data.get('stream'):
+                # Async view'da stream_with_context kullanılamaz; üreteç request nesnesine erişmez
+                return Response(
+                    stream_chat(conversation_id, message, code_context, memory),
+                    mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+                )
             
-            # Get AI response
-            response = feedback_system.chat_about_code(message, code_context)
+            # LLM çağrısı worker'ın ortak döngüsünde, paylaşılan bağlantı havuzuyla çalışır
+            response = await default_runtime.run(
+                feedback_system.chat_about_code_async(message, code_context, memory))
             
             # Save message and response
             chat_history.add_message(conversation_id, message, response)
+            feedback_system.remember_turn(chat_history, conversation_id, memory)
             
             return jsonify({'response': response})
             
@@ -135,34 +632,88 @@ def create_app():
                 'error': str(e)
             }), 400
 
+    def stream_chat(conversation_id, message, code_context, memory):
+        """Forward response chunks as SSE and save the full text once the stream ends"""
+        chunks = []
+        try:
+            for chunk in feedback_system.stream_chat_about_code(message, code_context, memory):
+                chunks.append(chunk)
+                yield sse_event('chunk', {'text': chunk})
+        finally:
+            # Client disconnects still keep whatever was generated
+            if chunks:
+                chat_history.add_message(conversation_id, message, ''.join(chunks))
+                feedback_system.remember_turn(chat_history, conversation_id, memory)
+        yield sse_event('done', {})
+
     @app.route('/history/<int:conversation_id>')
     def get_history(conversation_id):
-        """Get chat history for a conversation"""
+        """Get chat history for a conversation; older messages are loaded on upward scroll"""
         try:
-            history = chat_history.get_conversation_history(conversation_id)
-            histories = chat_history.get_all_conversations()
-            return render_template('chat.html', 
-                                 history=history, 
-                                 histories=histories,
-                                 conversation_id=conversation_id)
+            history = chat_history.get_conversation_history(conversation_id, limit=HISTORY_PAGE_SIZE)
+            return render_chat(history=history, 
+                             conversation_id=conversation_id)
         except Exception as e:
             return str(e), 400
 
+    @app.route('/cache/stats')
+    def cache_stats():
+        """Get analysis cache hit/miss statistics"""
+        return jsonify(analysis_cache.get_stats())
+
+    @app.route('/llm/stats')
+    def llm_stats():
+        """Get per-provider latency, error rate and circuit breaker state"""
+        return jsonify(feedback_system.analyzer.router.get_stats())
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        """Per-stage latency histograms and token/cache/fallback counters in Prometheus text format"""
+        return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
+    @app.route('/llm/rate-limits')
+    def rate_limit_stats():
+        """Get the shared request/token buckets and how long this worker waited for quota"""
+        return jsonify(rate_limiter.get_stats())
+
+    @app.cli.command('bulk-analyze')
+    @click.argument('input_path', type=click.Path(exists=True, dir_okay=False))
+    @click.argument('output_path', type=click.Path(dir_okay=False))
+    @click.option('--concurrency', default=BULK_CONCURRENCY, show_default=True,
+                  help='URLs fetched and analyzed at the same time')
+    @click.option('--retry-failed/--skip-failed', default=True,
+                  help='Re-run items that failed in a previous run')
+    def bulk_analyze(input_path, output_path, concurrency, retry_failed):
+        """Analyze GitHub URLs from a JSONL file, appending results to OUTPUT_PATH.
+
+        Items already finished in OUTPUT_PATH are skipped, so an interrupted
+        run can be resumed with the same command.
+        """
+        runner = BulkAnalyzer(feedback_system, concurrency=concurrency, retry_failed=retry_failed)
+
+        def report(record, counts):
+            click.echo(f"[{counts['done'] + counts['failed']}] {record['status']:>6} "
+                       f"{record['elapsed']:6.1f}s {record['url']}", err=True)
+
+        counts = runner.run(input_path, output_path, on_result=report)
+        click.echo(f"{counts['done']} done, {counts['failed']} failed, "
+                   f"{counts['skipped']} skipped")
+
+    @app.cli.command('render-history')
+    def render_history():
+        """Pre-render the markdown of messages stored before responses were rendered on the server"""
+        count = chat_history.render_missing_html()
+        click.echo(f"{count} messages rendered")
+
     @app.errorhandler(404)
     def not_found_error(error):
         """Handle 404 errors"""
-        histories = chat_history.get_all_conversations()
-        return render_template('chat.html', 
-                             error="Page not found",
-                             histories=histories), 404
+        return render_chat(error="Page not found"), 404
 
     @app.errorhandler(500)
     def internal_error(error):
         """Handle 500 errors"""
-        histories = chat_history.get_all_conversations()
-        return render_template('chat.html', 
-                             error="Internal server error",
-                             histories=histories), 500
+        return render_chat(error="Internal server error"), 500
 
     return app
 
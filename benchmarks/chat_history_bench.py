@@ -0,0 +1,117 @@
+"""ChatHistory throughput under concurrent worker processes.
+
+Compares the previous connect-per-call, rollback-journal access pattern with
+the pooled WAL connections used by ChatHistory:
+
+    python -m benchmarks.chat_history_bench --workers 4 --seconds 5
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from database.chat_history import ChatHistory
+from database.connection import close_connections
+
+SEED_CONVERSATIONS = 200
+SEED_MESSAGES = 5
+
+def baseline_read(db_path, conversation_id):
+    """Read path as it was before connection reuse: new connection per call"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        c = conn.cursor()
+        c.execute("SELECT id, github_url, created_at FROM conversations WHERE id = ?", (conversation_id,))
+        c.fetchone()
+        c.execute("""SELECT message, response, timestamp FROM messages
+                    WHERE conversation_id = ? ORDER BY timestamp""", (conversation_id,))
+        return c.fetchall()
+    finally:
+        conn.close()
+
+def baseline_write(db_path, conversation_id):
+    """Write path as it was before connection reuse: new connection per call"""
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("""INSERT INTO messages (conversation_id, message, response, timestamp)
+                       VALUES (?, ?, ?, ?)""",
+                    (conversation_id, "soru", "yanıt " * 50, datetime.now()))
+        conn.commit()
+    finally:
+        conn.close()
+
+def seed(db_path, journal_mode):
+    """Create and fill a database, then switch it to the given journal mode"""
+    history = ChatHistory(db_path)
+    for i in range(SEED_CONVERSATIONS):
+        conversation_id = history.start_conversation(f"https://github.com/u/r/blob/main/f{i}.py")
+        for _ in range(SEED_MESSAGES):
+            history.add_message(conversation_id, "soru", "yanıt " * 50)
+    close_connections()
+
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"PRAGMA journal_mode={journal_mode}")
+    conn.close()
+
+def worker(mode, db_path, seconds, read_ratio, results):
+    """Run mixed reads and writes for a fixed time and report counts"""
+    random.seed(os.getpid())
+    history = ChatHistory(db_path) if mode == 'pooled' else None
+    reads = writes = errors = 0
+    deadline = time.perf_counter() + seconds
+
+    while time.perf_counter() < deadline:
+        conversation_id = random.randint(1, SEED_CONVERSATIONS)
+        try:
+            if random.random() < read_ratio:
+                if history:
+                    history.get_conversation_history(conversation_id)
+                else:
+                    baseline_read(db_path, conversation_id)
+                reads += 1
+            else:
+                if history:
+                    history.add_message(conversation_id, "soru", "yanıt " * 50)
+                else:
+                    baseline_write(db_path, conversation_id)
+                writes += 1
+        except sqlite3.OperationalError:
+            errors += 1
+
+    results.put((reads, writes, errors))
+
+def run(mode, workers, seconds, read_ratio):
+    directory = tempfile.mkdtemp()
+    db_path = os.path.join(directory, f'{mode}.sqlite')
+    seed(db_path, 'WAL' if mode == 'pooled' else 'DELETE')
+
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=worker, args=(mode, db_path, seconds, read_ratio, results))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    totals = [sum(values) for values in zip(*(results.get() for _ in processes))]
+    for process in processes:
+        process.join()
+
+    reads, writes, errors = totals
+    print(f"{mode:>9}: {reads / seconds:10.0f} reads/s  {writes / seconds:8.0f} writes/s  "
+          f"{errors} lock errors")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4, help='concurrent worker processes')
+    parser.add_argument('--seconds', type=float, default=5, help='duration of each run')
+    parser.add_argument('--read-ratio', type=float, default=0.8, help='share of read operations')
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers, {args.seconds}s, read ratio {args.read_ratio}")
+    for mode in ('baseline', 'pooled'):
+        run(mode, args.workers, args.seconds, args.read_ratio)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""End-to-end latency and throughput of the app against local stub GitHub/LLM servers.
+
+Drives /analyze (plus job polling), /chat, / and /history/<id> with a weighted mix at a fixed
+concurrency and reports p50/p95/p99 latency and requests per second per endpoint. By default
+the stubs and the app run in this process on temporary databases:
+
+    python -m benchmarks.load_bench --concurrency 16 --seconds 30 --mix analyze=1,chat=3,home=2,history=2
+
+To measure a separately started server (e.g. gunicorn), start the stubs with
+`python -m benchmarks.stub_servers`, export the printed variables for the server, then:
+
+    python -m benchmarks.load_bench --target http://127.0.0.1:5000 --concurrency 32
+"""
+import argparse
+import itertools
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from benchmarks.stub_servers import StubServer, add_arguments, config_from_args
+
+def percentile(samples, q):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class Recorder:
+    def __init__(self):
+        """Latency samples and error counts per endpoint"""
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, ok):
+        with self._lock:
+            self.latencies[name].append(seconds)
+            if not ok:
+                self.errors[name] += 1
+
+    def report(self, elapsed):
+        print(f"{'endpoint':<16}{'count':>8}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        total = 0
+        for name in sorted(self.latencies):
+            samples = self.latencies[name]
+            total += len(samples) if name != 'analyze job' else 0
+            print(f"{name:<16}{len(samples):>8}{self.errors[name]:>8}{len(samples) / elapsed:>9.1f}"
+                  f"{percentile(samples, 0.50) * 1000:>10.1f}{percentile(samples, 0.95) * 1000:>10.1f}"
+                  f"{percentile(samples, 0.99) * 1000:>10.1f}")
+        print(f"total HTTP requests/s (excluding job polling): {total / elapsed:.1f}")
+
+class LoadDriver:
+    def __init__(self, base_url, recorder, notebook_share=0.2, distinct_files=0, poll_interval=0.05):
+        """Run weighted scenarios against base_url and record their latency"""
+        self.base_url = base_url.rstrip('/')
+        self.recorder = recorder
+        self.notebook_share = notebook_share
+        self.distinct_files = distinct_files
+        self.poll_interval = poll_interval
+        self.conversations = []
+        self._counter = itertools.count()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        # Her iş parçacığının kendi keep-alive oturumu olur
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _timed(self, name, method, path, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", timeout=300, **kwargs)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            response, ok = None, False
+        self.recorder.record(name, time.perf_counter() - started, ok)
+        return response
+
+    def _file_url(self):
+        number = next(self._counter)
+        if self.distinct_files:
+            number %= self.distinct_files
+        # Her yeni yol önbellekleri atlatır; distinct_files ile tekrar eden yollar önbellek isabetini ölçer
+        extension = 'ipynb' if random.random() < self.notebook_share else 'py'
+        return f"https://github.com/bench/repo/blob/main/pkg/module_{number}.{extension}"
+
+    def analyze(self):
+        started = time.perf_counter()
+        response = self._timed('POST /analyze', 'POST', '/analyze', json={'url': self._file_url()})
+        if response is None or response.status_code != 202:
+            self.recorder.record('analyze job', time.perf_counter() - started, False)
+            return
+
+        data = response.json()
+        while True:
+            job = self.session.get(f"{self.base_url}/jobs/{data['job_id']}", timeout=30).json()
+            if job.get('status') in ('done', 'failed'):
+                break
+            time.sleep(self.poll_interval)
+        self.recorder.record('analyze job', time.perf_counter() - started, job.get('status') == 'done')
+        with self._lock:
+            self.conversations.append(data['conversation_id'])
+
+    def _conversation(self):
+        with self._lock:
+            return random.choice(self.conversations)
+
+    def chat(self):
+        self._timed('POST /chat', 'POST', '/chat', json={
+            'message': 'Bu kodda performans nasıl iyileştirilir?',
+            'conversation_id': self._conversation()
+        })
+
+    def home(self):
+        self._timed('GET /', 'GET', '/')
+
+    def history(self):
+        self._timed('GET /history', 'GET', f"/history/{self._conversation()}")
+
+    def run(self, mix, concurrency, seconds):
+        """Run the mix with `concurrency` closed-loop clients for `seconds`; returns the elapsed time"""
+        scenarios = [getattr(self, name) for name in mix]
+        weights = list(mix.values())
+        deadline = time.monotonic() + seconds
+
+        def client():
+            while time.monotonic() < deadline:
+                random.choices(scenarios, weights)[0]()
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for future in [executor.submit(client) for _ in range(concurrency)]:
+                future.result()
+        return time.monotonic() - started
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name not in ('analyze', 'chat', 'home', 'history'):
+            raise argparse.ArgumentTypeError(f"unknown scenario: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def start_local_app(stub):
+    """Start the app in this process against the stubs, on temporary databases"""
+    os.environ.update(stub.environ())
+    os.environ.setdefault('OPENAI_API_KEY', 'stub')
+    os.environ.setdefault('GEMINI_API_KEY', 'stub')
+    # İstemci tarafı hız sınırı kapalı; sınırlayıcının kendisini ölçmek için bu değişkenleri ayarlayın
+    for name in ('OPENAI_RPM', 'OPENAI_TPM', 'GEMINI_RPM', 'GEMINI_TPM'):
+        os.environ.setdefault(name, '0')
+    # Ayarlar içe aktarılırken okunur; ortam değişkenleri bundan önce ayarlanmalı
+    from werkzeug.serving import make_server
+    from app import create_app
+
+    directory = tempfile.mkdtemp(prefix='load_bench_')
+    app = create_app({
+        'DATABASE': os.path.join(directory, 'chat_history.sqlite'),
+        'ANALYSIS_CACHE': os.path.join(directory, 'analysis_cache.sqlite'),
+        'RATE_LIMITS': os.path.join(directory, 'rate_limits.sqlite')
+    })
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target', help='base URL of a running app; default starts one in-process')
+    parser.add_argument('--concurrency', type=int, default=8, help='closed-loop clients')
+    parser.add_argument('--seconds', type=float, default=20, help='measurement duration')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('analyze=1,chat=3,home=2,history=2'),
+                        help='scenario weights, e.g. analyze=1,chat=3,home=2,history=2')
+    parser.add_argument('--seed-analyses', type=int, default=4, help='analyses run before measuring')
+    parser.add_argument('--notebook-share', type=float, default=0.2, help='share of analyses on .ipynb files')
+    parser.add_argument('--distinct-files', type=int, default=0,
+                        help='cycle through this many file paths (0 = always a new path, no cache hits)')
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = None
+    stub = None
+    if args.target:
+        base_url = args.target
+    else:
+        stub = StubServer(config_from_args(args)).start()
+        base_url, server = start_local_app(stub)
+
+    recorder = Recorder()
+    driver = LoadDriver(base_url, recorder, args.notebook_share, args.distinct_files)
+    for _ in range(args.seed_analyses):
+        driver.analyze()
+    if not driver.conversations:
+        raise SystemExit("seed analyses failed; is the app reachable and pointed at the stubs?")
+
+    recorder = driver.recorder = Recorder()
+    print(f"target {base_url}, {args.concurrency} clients, {args.seconds:.0f} s, mix {args.mix}")
+    elapsed = driver.run(args.mix, args.concurrency, args.seconds)
+    recorder.report(elapsed)
+
+    if server:
+        server.shutdown()
+        stub.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Microbenchmarks of NotebookHandler, OutputFormatter and ChatHistory on synthetic large inputs.
+
+    python -m benchmarks.micro_bench --iterations 50 --cells 300 --analysis-kb 64 --messages 200
+"""
+import argparse
+import itertools
+import os
+import tempfile
+import time
+from benchmarks.load_bench import percentile
+from benchmarks.notebook_bench import build_notebook
+from benchmarks.stub_servers import analysis_payload, synthetic_python
+from database.chat_history import ChatHistory
+from formatters.markdown_renderer import render_markdown
+from formatters.output_formatter import OutputFormatter
+from utils.notebook_handler import NotebookHandler
+
+def measure(label, function, iterations):
+    """Call function `iterations` times and print mean/p50/p95 in milliseconds"""
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    print(f"{label:<48}{sum(samples) / len(samples) * 1000:>10.2f}"
+          f"{percentile(samples, 0.50) * 1000:>10.2f}{percentile(samples, 0.95) * 1000:>10.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--cells', type=int, default=300, help='code cells of the synthetic notebook')
+    parser.add_argument('--image-kb', type=int, default=32, help='image payload per notebook cell')
+    parser.add_argument('--analysis-kb', type=int, default=64, help='size of the analysis to format')
+    parser.add_argument('--conversations', type=int, default=500, help='conversations in the test database')
+    parser.add_argument('--messages', type=int, default=200, help='messages in the measured conversation')
+    args = parser.parse_args()
+
+    print(f"{'operation':<48}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+
+    handler = NotebookHandler()
+    notebook = build_notebook(args.cells, args.image_kb, 20)
+    measure(f"NotebookHandler.extract ({len(notebook) / 2 ** 20:.1f} MB)",
+            lambda: handler.extract_notebook_code(notebook), args.iterations)
+
+    analysis = analysis_payload(args.analysis_kb)
+    measure(f"OutputFormatter.format_analysis ({args.analysis_kb} KB)",
+            lambda: OutputFormatter.format_analysis(analysis), args.iterations)
+
+    report = OutputFormatter.format_analysis(analysis)
+    measure(f"render_markdown ({len(report) // 1024} KB report)", lambda: render_markdown(report), args.iterations)
+
+    history = ChatHistory(os.path.join(tempfile.mkdtemp(prefix='micro_bench_'), 'chat_history.sqlite'),
+                          context_cache_size=1)
+    source = synthetic_python('micro', 64)
+    for number in range(args.conversations):
+        history.start_conversation(f"https://github.com/bench/repo/blob/main/module_{number}.py")
+    conversation_id = history.start_conversation("https://github.com/bench/repo/blob/main/large.py")
+    history.save_code_context(conversation_id, source)
+    other_id = history.start_conversation("https://github.com/bench/repo/blob/main/other.py")
+    history.save_code_context(other_id, source)
+    response = OutputFormatter.format_analysis(analysis_payload(4))
+    for _ in range(args.messages):
+        history.add_message(conversation_id, "Bu fonksiyon neden yavaş?", response)
+
+    measure("ChatHistory.add_message", lambda: history.add_message(other_id, "soru", response), args.iterations)
+    measure(f"ChatHistory.get_conversation_history ({args.messages})",
+            lambda: history.get_conversation_history(conversation_id), args.iterations)
+    measure(f"ChatHistory.get_messages_page (latest of {args.messages})",
+            lambda: history.get_messages_page(conversation_id), args.iterations)
+    measure("ChatHistory.get_conversations_page", history.get_conversations_page, args.iterations)
+
+    # Önbellek tek kayıtlık: iki konuşma arasında gidip gelmek her seferinde SQLite'tan okur
+    contexts = itertools.cycle([conversation_id, other_id])
+    measure("ChatHistory.get_code_context (64 KB, uncached)",
+            lambda: history.get_code_context(next(contexts)), args.iterations)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Notebook parsing cost on notebooks with large embedded outputs.
+
+Compares the nbformat path (full parse and validation of every output) with
+the streaming parser that skips image/display payloads in place:
+
+    python -m benchmarks.notebook_bench --cells 200 --image-kb 256
+"""
+import argparse
+import base64
+import json
+import os
+import time
+import tracemalloc
+import nbformat
+from utils.notebook_handler import NotebookHandler
+
+def build_notebook(cells, image_kb, stream_lines):
+    """Create a v4 notebook whose code cells carry a PNG-sized payload and printed output"""
+    image = base64.b64encode(os.urandom(image_kb * 1024)).decode('ascii')
+    notebook = nbformat.v4.new_notebook()
+    for i in range(cells):
+        if i % 10 == 0:
+            notebook.cells.append(nbformat.v4.new_markdown_cell(f"## Section {i // 10}\nUsage example {i}"))
+        notebook.cells.append(nbformat.v4.new_code_cell(
+            source=f"import numpy as np\nresult_{i} = np.arange({i})\nprint(result_{i})",
+            outputs=[
+                nbformat.v4.new_output('stream', name='stdout',
+                                       text=''.join(f"line {n}\n" for n in range(stream_lines))),
+                nbformat.v4.new_output('display_data', data={'image/png': image, 'text/plain': '<Figure>'})
+            ]
+        ))
+    return nbformat.writes(notebook)
+
+def parse_nbformat(handler, content):
+    return handler._extract_from_cells(nbformat.reads(content, as_version=4).cells)
+
+def parse_streaming(handler, content):
+    return handler.extract_notebook_code(content)
+
+def measure(label, parse, handler, content):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = parse(handler, content)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>10}: {elapsed * 1000:8.1f} ms  peak {peak / 2 ** 20:8.1f} MB")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cells', type=int, default=200, help='code cells in the notebook')
+    parser.add_argument('--image-kb', type=int, default=256, help='raw size of the image embedded in each cell')
+    parser.add_argument('--stream-lines', type=int, default=50, help='printed lines per cell')
+    args = parser.parse_args()
+
+    content = build_notebook(args.cells, args.image_kb, args.stream_lines)
+    print(f"notebook size: {len(content) / 2 ** 20:.1f} MB")
+
+    handler = NotebookHandler()
+    full = measure("nbformat", parse_nbformat, handler, content)
+    streamed = measure("streaming", parse_streaming, handler, content)
+
+    same = json.dumps(full, sort_keys=True) == json.dumps(streamed, sort_keys=True)
+    print(f"identical results: {same}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Row decoding cost of a large conversation history.
+
+Compares text timestamps parsed with strptime on every row (the previous
+storage format) with integer epoch microseconds returned as-is:
+
+    python -m benchmarks.row_decode_bench --messages 100000
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+from database.chat_history import now_us
+
+def build(db_path, count, integer):
+    conn = sqlite3.connect(db_path)
+    conn.execute("""CREATE TABLE messages (id INTEGER PRIMARY KEY, conversation_id INTEGER,
+                    message TEXT, response TEXT, timestamp)""")
+    start = datetime.now()
+    base_us = now_us()
+    rows = [(1, "soru", "yanıt",
+             base_us + i if integer else str(start + timedelta(microseconds=i + 1)))
+            for i in range(count)]
+    conn.executemany("INSERT INTO messages (conversation_id, message, response, timestamp) VALUES (?, ?, ?, ?)",
+                     rows)
+    conn.commit()
+    return conn
+
+def decode_text(conn):
+    return [
+        {'message': m, 'response': r, 'timestamp': datetime.strptime(t, '%Y-%m-%d %H:%M:%S.%f')}
+        for m, r, t in conn.execute("SELECT message, response, timestamp FROM messages ORDER BY timestamp")
+    ]
+
+def decode_integer(conn):
+    return [
+        {'message': m, 'response': r, 'timestamp': t}
+        for m, r, t in conn.execute("SELECT message, response, timestamp FROM messages ORDER BY timestamp")
+    ]
+
+def measure(label, decode, conn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = decode(conn)
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:>20}: {best * 1000:8.1f} ms for {len(rows)} rows "
+          f"({best / len(rows) * 1e6:.2f} µs/row)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=100000, help='rows to decode')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per variant (best is reported)')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    text_conn = build(os.path.join(directory, 'text.sqlite'), args.messages, integer=False)
+    integer_conn = build(os.path.join(directory, 'integer.sqlite'), args.messages, integer=True)
+
+    measure("text + strptime", decode_text, text_conn, args.repeat)
+    measure("integer epoch µs", decode_integer, integer_conn, args.repeat)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+"""Local stand-ins for GitHub, OpenAI and Gemini with configurable latency and payload sizes.
+
+One HTTP server answers all three so that benchmarks never spend API money:
+
+    /raw/<user>/<repo>/<branch>/<path>   raw.githubusercontent.com (.py and .ipynb)
+    /api/repos/...                       api.github.com (repository and tree listing)
+    /v1/chat/completions                 OpenAI chat completions, JSON or streamed
+    /v1beta/models/<model>:...           Gemini generateContent / streamGenerateContent (REST)
+
+Run it standalone and point a separately started app at it with the printed variables:
+
+    python -m benchmarks.stub_servers --llm-latency-ms 800 --github-latency-ms 40
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+class Latency:
+    def __init__(self, median_ms=0.0, sigma=0.0):
+        """Log-normal latency around a median; sigma=0 is a fixed delay"""
+        self.median = median_ms / 1000
+        self.sigma = sigma
+
+    def sample(self):
+        if self.median <= 0:
+            return 0.0
+        return random.lognormvariate(0, self.sigma) * self.median if self.sigma else self.median
+
+    def sleep(self):
+        delay = self.sample()
+        if delay:
+            time.sleep(delay)
+
+def synthetic_python(seed, size_kb):
+    """Deterministic Python module of about size_kb, different for every path"""
+    rng = random.Random(seed)
+    parts = [f'"""Synthetic module {seed}"""\nimport os\nimport json\n']
+    size = len(parts[0])
+    index = 0
+    while size < size_kb * 1024:
+        depth = rng.randint(1, 4)
+        body = ''.join(f"{'    ' * (level + 1)}for item_{level} in range({rng.randint(2, 9)}):\n"
+                       for level in range(depth))
+        body += f"{'    ' * (depth + 1)}total += item_{depth - 1} * {rng.randint(1, 99)}\n"
+        function = (f"\ndef function_{index}(data, limit={rng.randint(1, 50)}):\n"
+                    f"    \"\"\"Process data block {index}\"\"\"\n    total = 0\n{body}    return total\n")
+        parts.append(function)
+        size += len(function)
+        index += 1
+    return ''.join(parts)
+
+def analysis_payload(size_kb):
+    """Analysis JSON in the app's schema, padded to about size_kb"""
+    item = "Kod okunabilirliği artırılabilir; fonksiyonlar daha küçük parçalara bölünebilir."
+    count = max(1, size_kb * 1024 // (len(item) * 5))
+    return {
+        "proje_amaci": "Sentetik benchmark projesi",
+        "proje_ozeti": "Stub sunucu tarafından üretilmiş analiz",
+        "kullanilan_teknolojiler": ["Python", "json", "os"],
+        "genel_degerlendirme": "Benchmark yanıtı",
+        "guclu_yonler": [item] * count,
+        "iyilestirme_alanlari": [item] * count,
+        "kod_ornekleri": [{"aciklama": "Örnek", "kod": "def f(x):\n    return [i * 2 for i in x]"}] * count,
+        "guvenlik_onerileri": [item] * count,
+        "performans_onerileri": [item] * count
+    }
+
+class StubConfig:
+    def __init__(self, github_latency=None, llm_latency=None, chunk_ms=20, py_kb=8, notebook_cells=50,
+                 image_kb=64, analysis_kb=4, chat_chars=1500, chat_chunks=30, repo_files=5, error_rate=0.0):
+        self.github_latency = github_latency or Latency()
+        self.llm_latency = llm_latency or Latency()
+        self.chunk_delay = chunk_ms / 1000
+        self.py_kb = py_kb
+        self.notebook_cells = notebook_cells
+        self.image_kb = image_kb
+        self.analysis = json.dumps(analysis_payload(analysis_kb), ensure_ascii=False)
+        self.chat_text = ("Bu fonksiyon listeyi tek geçişte işliyor. " * (chat_chars // 40 + 1))[:chat_chars]
+        self.chat_chunks = chat_chunks
+        self.repo_files = repo_files
+        self.error_rate = error_rate
+        self._notebook = None
+        self._lock = threading.Lock()
+
+    def notebook(self):
+        # Notebook üretimi pahalı; tüm yollar aynı içeriği paylaşır. Uygulama modülleri burada içe
+        # aktarılır: load_bench ortam değişkenlerini ayarlamadan önce config.settings yüklenmemeli
+        from benchmarks.notebook_bench import build_notebook
+        with self._lock:
+            if self._notebook is None:
+                self._notebook = build_notebook(self.notebook_cells, self.image_kb, 20)
+            return self._notebook
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    config = StubConfig()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, content_type='application/json'):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _start_stream(self, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+    def _write_chunk(self, text):
+        data = text.encode('utf-8')
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+    def _end_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _chat_pieces(self):
+        text = self.config.chat_text
+        size = max(1, len(text) // self.config.chat_chunks)
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        config = self.config
+        if path.startswith('/raw/'):
+            config.github_latency.sleep()
+            if path.endswith('.ipynb'):
+                return self._send(200, config.notebook())
+            if path.endswith('.py'):
+                return self._send(200, synthetic_python(path, config.py_kb), 'text/plain; charset=utf-8')
+        elif path.startswith('/api/repos/'):
+            config.github_latency.sleep()
+            if '/git/trees/' in path:
+                tree = [{'path': f'pkg/module_{i}.py', 'type': 'blob'} for i in range(config.repo_files)]
+                return self._send(200, json.dumps({'tree': tree}))
+            return self._send(200, json.dumps({'default_branch': 'main'}))
+        self._send(404, json.dumps({'error': 'not found'}))
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        config = self.config
+
+        config.llm_latency.sleep()
+        if config.error_rate and random.random() < config.error_rate:
+            self.send_response(429)
+            self.send_header('Retry-After', '1')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        if path == '/v1/chat/completions':
+            return self._openai(request)
+        if path.startswith('/v1beta/models/'):
+            return self._gemini(path, request)
+        self._send(404, json.dumps({'error': 'not found'}))
+
+    def _openai(self, request):
+        model = request.get('model', 'stub')
+        prompt_tokens = sum(len(message.get('content', '')) for message in request.get('messages', [])) // 4
+        if request.get('stream'):
+            self._start_stream('text/event-stream')
+            for piece in self._chat_pieces():
+                chunk = {'id': 'stub', 'object': 'chat.completion.chunk', 'created': 0, 'model': model,
+                         'choices': [{'index': 0, 'delta': {'content': piece}, 'finish_reason': None}]}
+                self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+                time.sleep(self.config.chunk_delay)
+            self._write_chunk("data: [DONE]\n\n")
+            return self._end_stream()
+
+        is_json = (request.get('response_format') or {}).get('type') == 'json_object'
+        content = self.config.analysis if is_json else self.config.chat_text
+        self._send(200, json.dumps({
+            'id': 'stub', 'object': 'chat.completion', 'created': 0, 'model': model,
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': len(content) // 4,
+                      'total_tokens': prompt_tokens + len(content) // 4}
+        }))
+
+    def _gemini(self, path, request):
+        prompt = ''.join(part.get('text', '') for content in request.get('contents', [])
+                         for part in content.get('parts', []))
+
+        def response(text):
+            return json.dumps({
+                'candidates': [{'content': {'parts': [{'text': text}], 'role': 'model'}, 'finishReason': 1, 'index': 0}],
+                'usageMetadata': {'promptTokenCount': len(prompt) // 4, 'candidatesTokenCount': len(text) // 4,
+                                  'totalTokenCount': (len(prompt) + len(text)) // 4}
+            })
+
+        if path.endswith(':streamGenerateContent'):
+            # REST akışı tek bir JSON dizisinin parça parça gönderilmesidir
+            self._start_stream('application/json')
+            pieces = self._chat_pieces()
+            for index, piece in enumerate(pieces):
+                self._write_chunk(('[' if index == 0 else ',\r\n') + response(piece))
+                time.sleep(self.config.chunk_delay)
+            self._write_chunk(']')
+            return self._end_stream()
+
+        text = self.config.analysis if 'JSON' in prompt else self.config.chat_text
+        self._send(200, response(text))
+
+class QuietThreadingHTTPServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # İptal edilen hedge istekleri bağlantıyı yanıt bitmeden kapatır
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+class StubServer:
+    def __init__(self, config=None, host='127.0.0.1', port=0):
+        """Threaded stub server; port=0 picks a free port"""
+        handler = type('ConfiguredStubHandler', (StubHandler,), {'config': config or StubConfig()})
+        self.server = QuietThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def environ(self):
+        """Environment variables that point the app at this server"""
+        return {
+            'GITHUB_RAW_BASE_URL': f"{self.base_url}/raw",
+            'GITHUB_API_BASE_URL': f"{self.base_url}/api",
+            'OPENAI_BASE_URL': f"{self.base_url}/v1",
+            'GEMINI_API_ENDPOINT': self.base_url
+        }
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def add_arguments(parser):
+    """Stub options shared by the standalone server and the load benchmark"""
+    parser.add_argument('--github-latency-ms', type=float, default=40, help='median GitHub response time')
+    parser.add_argument('--github-jitter', type=float, default=0.3, help='log-normal sigma of GitHub latency')
+    parser.add_argument('--llm-latency-ms', type=float, default=800, help='median LLM time to first byte')
+    parser.add_argument('--llm-jitter', type=float, default=0.4, help='log-normal sigma of LLM latency')
+    parser.add_argument('--llm-chunk-ms', type=float, default=20, help='delay between streamed chunks')
+    parser.add_argument('--llm-error-rate', type=float, default=0.0, help='share of LLM requests answered with 429')
+    parser.add_argument('--py-kb', type=int, default=8, help='size of served .py files')
+    parser.add_argument('--notebook-cells', type=int, default=50, help='code cells of served notebooks')
+    parser.add_argument('--image-kb', type=int, default=64, help='image payload per notebook cell')
+    parser.add_argument('--analysis-kb', type=int, default=4, help='size of the LLM analysis JSON')
+    parser.add_argument('--chat-chars', type=int, default=1500, help='length of chat answers')
+
+def config_from_args(args):
+    return StubConfig(
+        github_latency=Latency(args.github_latency_ms, args.github_jitter),
+        llm_latency=Latency(args.llm_latency_ms, args.llm_jitter),
+        chunk_ms=args.llm_chunk_ms,
+        py_kb=args.py_kb,
+        notebook_cells=args.notebook_cells,
+        image_kb=args.image_kb,
+        analysis_kb=args.analysis_kb,
+        chat_chars=args.chat_chars,
+        error_rate=args.llm_error_rate
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = StubServer(config_from_args(args), port=args.port).start()
+    for name, value in server.environ().items():
+        print(f"export {name}={value}")
+    print("export OPENAI_API_KEY=stub GEMINI_API_KEY=stub")
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == '__main__':
+    main()
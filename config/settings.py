@@ -7,8 +7,109 @@ sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer)
 DEFAULT_AI_SERVICE = os.getenv('DEFAULT_AI_SERVICE', 'auto')
 
 OPENAI_MODEL = "gpt-4o-mini"
+GEMINI_MODEL = "gemini-pro"
+
+# Sağlayıcı adresleri; benchmark için yerel stub sunuculara yönlendirilebilir (boş = varsayılan)
+OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL') or None
+GEMINI_API_ENDPOINT = os.getenv('GEMINI_API_ENDPOINT') or None
 TEMPERATURE = 0.7
 
+# Çoklu sağlayıcı yönlendirme: hedge ve devre kesici
+LLM_HEDGE_ENABLED = os.getenv('LLM_HEDGE_ENABLED', 'true').lower() == 'true'
+LLM_HEDGE_DEFAULT_DELAY = float(os.getenv('LLM_HEDGE_DEFAULT_DELAY', 20))  # yeterli örnek yokken, saniye
+LLM_LATENCY_WINDOW = int(os.getenv('LLM_LATENCY_WINDOW', 200))
+LLM_MIN_SAMPLES = int(os.getenv('LLM_MIN_SAMPLES', 10))
+LLM_BREAKER_FAILURES = int(os.getenv('LLM_BREAKER_FAILURES', 5))
+LLM_BREAKER_RESET = float(os.getenv('LLM_BREAKER_RESET', 30))  # saniye
+
+# Sağlayıcı hız sınırları: dakikada istek ve token (0 = sınırsız). Sayaçlar SQLite'ta tutulur,
+# böylece tüm gunicorn worker'ları aynı kotayı paylaşır.
+OPENAI_RPM = int(os.getenv('OPENAI_RPM', 500))
+OPENAI_TPM = int(os.getenv('OPENAI_TPM', 200000))
+GEMINI_RPM = int(os.getenv('GEMINI_RPM', 60))
+GEMINI_TPM = int(os.getenv('GEMINI_TPM', 1000000))
+LLM_OUTPUT_TOKEN_ESTIMATE = int(os.getenv('LLM_OUTPUT_TOKEN_ESTIMATE', 1000))  # yanıt gelene kadar ayrılan çıktı tokenı
+LLM_RATE_LIMIT_MAX_WAIT = float(os.getenv('LLM_RATE_LIMIT_MAX_WAIT', 60))  # saniye
+
+# 429/5xx hatalarında Retry-After'a uyan, jitter'lı üstel geri çekilme
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 4))
+LLM_RETRY_BASE_DELAY = float(os.getenv('LLM_RETRY_BASE_DELAY', 1))  # saniye
+LLM_RETRY_MAX_DELAY = float(os.getenv('LLM_RETRY_MAX_DELAY', 30))  # saniye
+
+# Prompt veya şablon değiştiğinde artırılmalı; eski önbellek kayıtları geçersiz olur
+PROMPT_VERSION = "6"
+
+# GitHub içerik indirme
+GITHUB_RAW_BASE_URL = os.getenv('GITHUB_RAW_BASE_URL', 'https://raw.githubusercontent.com')
+GITHUB_API_BASE_URL = os.getenv('GITHUB_API_BASE_URL', 'https://api.github.com')
+GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', 15))  # saniye
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 10))
+FETCH_CACHE_MAX_BYTES = int(os.getenv('FETCH_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+# Tek bir analiz isteğinin toplam girdi token bütçesi (sabit ön ek dahil)
+PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', 12000))
+
+# Büyük dosyaların parçalı analizi (tiktoken yoksa token tahmini: ~4 karakter = 1 token)
+CHUNK_TOKEN_BUDGET = int(os.getenv('CHUNK_TOKEN_BUDGET', 6000))
+CHUNK_ANALYSIS_CONCURRENCY = int(os.getenv('CHUNK_ANALYSIS_CONCURRENCY', 4))
+
+# Artımlı yeniden analiz: aynı dosyanın önceki analizi varsa sadece değişen birimler gönderilir.
+# Birimlerin bu oranından fazlası değiştiyse tam analiz yapılır.
+INCREMENTAL_MAX_CHANGED_RATIO = float(os.getenv('INCREMENTAL_MAX_CHANGED_RATIO', 0.6))
+
+# Notebook ayrıştırma: stream çıktılarının hücre başına saklanan en fazla karakter sayısı
+NOTEBOOK_OUTPUT_MAX_CHARS = int(os.getenv('NOTEBOOK_OUTPUT_MAX_CHARS', 10000))
+
+# Statik (AST) analiz sonuçları için içerik özetine göre LRU boyutu
+STATIC_ANALYSIS_CACHE_SIZE = int(os.getenv('STATIC_ANALYSIS_CACHE_SIZE', 256))
+
+# Chat bağlamı: büyük dosyalarda sadece ilgili parçalar gönderilir
+CHAT_CONTEXT_TOKEN_BUDGET = int(os.getenv('CHAT_CONTEXT_TOKEN_BUDGET', 3000))
+CHAT_TOP_K = int(os.getenv('CHAT_TOP_K', 6))
+CODE_INDEX_CACHE_SIZE = int(os.getenv('CODE_INDEX_CACHE_SIZE', 32))
+
+# Chat hafızası: son turlar olduğu gibi, daha eskileri kayan bir özet olarak gönderilir
+CHAT_MEMORY_RECENT_TURNS = int(os.getenv('CHAT_MEMORY_RECENT_TURNS', 4))
+CHAT_MEMORY_MAX_TURNS = int(os.getenv('CHAT_MEMORY_MAX_TURNS', 8))  # aşılınca eski turlar özete katlanır
+CHAT_MEMORY_TOKEN_BUDGET = int(os.getenv('CHAT_MEMORY_TOKEN_BUDGET', 2500))  # özet + turlar
+CHAT_MEMORY_TURN_TOKENS = int(os.getenv('CHAT_MEMORY_TURN_TOKENS', 400))  # mesaj/yanıt başına
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv('CHAT_SUMMARY_MAX_TOKENS', 500))
+
+# Depo/dizin analizi
+REPO_MAX_FILES = int(os.getenv('REPO_MAX_FILES', 50))
+REPO_FETCH_CONCURRENCY = int(os.getenv('REPO_FETCH_CONCURRENCY', 8))
+REPO_ANALYSIS_CONCURRENCY = int(os.getenv('REPO_ANALYSIS_CONCURRENCY', 4))
+
+# Toplu (komut satırı) analiz
+BULK_CONCURRENCY = int(os.getenv('BULK_CONCURRENCY', 8))
+
+# SQLite bağlantı ayarları (bağlantılar iş parçacığı başına yeniden kullanılır)
+SQLITE_BUSY_TIMEOUT = float(os.getenv('SQLITE_BUSY_TIMEOUT', 10))  # saniye
+SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', 16 * 1024))
+SQLITE_CACHED_STATEMENTS = int(os.getenv('SQLITE_CACHED_STATEMENTS', 256))
+
+# Kenar çubuğunda sayfa başına gösterilen konuşma sayısı
+SIDEBAR_PAGE_SIZE = int(os.getenv('SIDEBAR_PAGE_SIZE', 30))
+
+# Konuşma sayfasında ilk gösterilen ve yukarı kaydırıldıkça yüklenen mesaj (tur) sayısı
+HISTORY_PAGE_SIZE = int(os.getenv('HISTORY_PAGE_SIZE', 20))
+
+# Konuşma başına saklanan kod bağlamı için süreç içi LRU boyutu
+CODE_CONTEXT_CACHE_SIZE = int(os.getenv('CODE_CONTEXT_CACHE_SIZE', 32))
+
+# Arka plan analiz kuyruğu; analizler worker'ın olay döngüsünde çalışır, iş parçacığı tutmaz
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', 64))  # aynı anda çalışan analiz
+ANALYSIS_MAX_PENDING = int(os.getenv('ANALYSIS_MAX_PENDING', 256))
+ANALYSIS_JOB_RETENTION = int(os.getenv('ANALYSIS_JOB_RETENTION', 24 * 60 * 60))  # saniye
+# /jobs/<id>/events akışı bir worker iş parçacığını tutar; gunicorn'un varsayılan 30 sn
+# zaman aşımının altında kalır, istemci yeniden bağlanır (main.js ise /jobs/<id> sorgular)
+JOB_EVENTS_MAX_WAIT = float(os.getenv('JOB_EVENTS_MAX_WAIT', 25))  # saniye
+
+# Analiz sonuç önbelleği
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv('ANALYSIS_CACHE_MAX_ENTRIES', 1000))
+ANALYSIS_CACHE_TTL = int(os.getenv('ANALYSIS_CACHE_TTL', 7 * 24 * 60 * 60))  # saniye
+
 ANALYSIS_TEMPLATE = {
     "proje_amaci": "Analiz sırasında bir hata oluştu",
     "proje_ozeti": "JSON formatı elde edilemedi",
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import time
+import threading
+from config.settings import (
+    PROMPT_VERSION,
+    ANALYSIS_CACHE_MAX_ENTRIES,
+    ANALYSIS_CACHE_TTL
+)
+from analyzers.prompt_builder import PromptBuilder
+from database.connection import get_connection
+from utils.metrics import ANALYSIS_CACHE_REQUESTS
+
+class AnalysisCache:
+    def __init__(self, db_path="analysis_cache.db", max_entries=ANALYSIS_CACHE_MAX_ENTRIES,
+                 ttl=ANALYSIS_CACHE_TTL):
+        """Initialize analysis cache with database path, size cap and TTL (seconds)"""
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.init_db()
+
+    def init_db(self):
+        """Initialize database tables"""
+        conn = get_connection(self.db_path)
+        c = conn.cursor()
+
+        c.execute('''CREATE TABLE IF NOT EXISTS analysis_cache
+                    (cache_key TEXT PRIMARY KEY,
+                     analysis TEXT NOT NULL,
+                     created_at REAL NOT NULL,
+                     last_accessed REAL NOT NULL,
+                     hit_count INTEGER NOT NULL DEFAULT 0)''')
+
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_analysis_cache_last_accessed
+                    ON analysis_cache (last_accessed)''')
+
+        conn.commit()
+
+    @staticmethod
+    def make_key(code, notebook_data, provider, model):
+        """Build a content-addressed key from everything that affects the analysis"""
+        documentation = notebook_data.get('documentation') if notebook_data else None
+        payload = json.dumps({
+            'code': code,
+            'documentation': documentation,
+            # Aynı kodla yeniden çalıştırılmış notebook'un değişen çıktıları eski analize düşmesin
+            'outputs': PromptBuilder.format_outputs(notebook_data),
+            'provider': provider,
+            'model': model,
+            'prompt_version': PROMPT_VERSION
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return the cached analysis for key, or None on miss/expiry"""
+        return self.get_any([key])
+
+    def get_any(self, keys):
+        """Return the cached analysis of the first key that hits, counting one lookup"""
+        now = time.time()
+        conn = get_connection(self.db_path)
+        for key in keys:
+            analysis = self._lookup(conn, key, now)
+            if analysis is not None:
+                self._record(hit=True)
+                return analysis
+
+        self._record(hit=False)
+        return None
+
+    def _lookup(self, conn, key, now):
+        row = conn.execute("""SELECT analysis, created_at
+                             FROM analysis_cache
+                             WHERE cache_key = ?""", (key,)).fetchone()
+
+        if row and now - row[1] > self.ttl:
+            with conn:
+                conn.execute("DELETE FROM analysis_cache WHERE cache_key = ?", (key,))
+            row = None
+
+        if not row:
+            return None
+
+        with conn:
+            conn.execute("""UPDATE analysis_cache
+                           SET last_accessed = ?, hit_count = hit_count + 1
+                           WHERE cache_key = ?""", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, analysis):
+        """Store an analysis and evict least recently used entries above the size cap"""
+        now = time.time()
+        conn = get_connection(self.db_path)
+
+        with conn:
+            conn.execute("""INSERT OR REPLACE INTO analysis_cache
+                           (cache_key, analysis, created_at, last_accessed, hit_count)
+                           VALUES (?, ?, ?, ?, 0)""",
+                        (key, json.dumps(analysis, ensure_ascii=False), now, now))
+
+            # Süresi dolmuş kayıtları temizle
+            conn.execute("DELETE FROM analysis_cache WHERE created_at < ?", (now - self.ttl,))
+
+            # Boyut sınırını aşan en eski kullanılan kayıtları sil
+            conn.execute("""DELETE FROM analysis_cache
+                           WHERE cache_key IN (
+                               SELECT cache_key FROM analysis_cache
+                               ORDER BY last_accessed DESC
+                               LIMIT -1 OFFSET ?)""", (self.max_entries,))
+
+    def clear(self):
+        """Remove all cached analyses"""
+        conn = get_connection(self.db_path)
+        with conn:
+            conn.execute("DELETE FROM analysis_cache")
+
+    def _record(self, hit):
+        ANALYSIS_CACHE_REQUESTS.inc(result='hit' if hit else 'miss')
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get_stats(self):
+        """Get hit/miss counts for this process and the number of stored entries"""
+        conn = get_connection(self.db_path)
+        entries = conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl': self.ttl
+        }
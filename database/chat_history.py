@@ -1,22 +1,60 @@
 import sqlite3
-from datetime import datetime
+import json
+import zlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from config.settings import CODE_CONTEXT_CACHE_SIZE, SIDEBAR_PAGE_SIZE, HISTORY_PAGE_SIZE, CHAT_MEMORY_MAX_TURNS
+from database.connection import get_connection
+from formatters.markdown_renderer import render_markdown
+from utils.metrics import CHAT_HISTORY_SECONDS, timed
+
+# 1: created_at/timestamp stored as integer epoch microseconds
+# 2: code_contexts.repo_path and code_contexts.analysis for incremental re-analysis
+# 3: messages.response_html, server-rendered markdown of the response
+SCHEMA_VERSION = 3
+
+def now_us():
+    """Current time as integer epoch microseconds"""
+    return time.time_ns() // 1000
+
+def to_datetime(timestamp_us):
+    """Convert stored epoch microseconds to a local datetime (for templates and JSON)"""
+    if timestamp_us is None:
+        return None
+    seconds, microseconds = divmod(timestamp_us, 1_000_000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=microseconds)
+
+def _text_to_us(value):
+    """Convert a legacy text timestamp to epoch microseconds"""
+    parsed = datetime.fromisoformat(value)
+    # DEFAULT CURRENT_TIMESTAMP satırları UTC ve mikrosaniyesizdir;
+    # uygulamanın yazdığı datetime.now() değerleri ise yerel saattir
+    if '.' not in value:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    # Saniye kısmı mikrosaniyesiz hesaplanır: int() 1970 öncesinde sıfıra doğru yuvarlardı
+    return int(parsed.replace(microsecond=0).timestamp()) * 1_000_000 + parsed.microsecond
 
 class ChatHistory:
-    def __init__(self, db_path="chat_history.db"):
+    def __init__(self, db_path="chat_history.db", context_cache_size=CODE_CONTEXT_CACHE_SIZE):
         """Initialize chat history with database path"""
         self.db_path = db_path
+        self.context_cache_size = context_cache_size
+        self._context_cache = OrderedDict()
+        self._context_lock = threading.Lock()
         self.init_db()
 
     def init_db(self):
         """Initialize database tables"""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_connection(self.db_path)
         c = conn.cursor()
         
         # Conversations table
         c.execute('''CREATE TABLE IF NOT EXISTS conversations
                     (id INTEGER PRIMARY KEY AUTOINCREMENT,
                      github_url TEXT NOT NULL,
-                     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP)''')
+                     created_at INTEGER NOT NULL)''')
         
         # Messages table
         c.execute('''CREATE TABLE IF NOT EXISTS messages
@@ -24,44 +62,247 @@ class ChatHistory:
                      conversation_id INTEGER NOT NULL,
                      message TEXT NOT NULL,
                      response TEXT NOT NULL,
-                     timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                     timestamp INTEGER NOT NULL,
+                     FOREIGN KEY (conversation_id) REFERENCES conversations (id))''')
+        
+        # Code context table (fetched source and parsed notebook, zlib compressed)
+        c.execute('''CREATE TABLE IF NOT EXISTS code_contexts
+                    (conversation_id INTEGER PRIMARY KEY,
+                     source BLOB NOT NULL,
+                     notebook_data BLOB,
+                     FOREIGN KEY (conversation_id) REFERENCES conversations (id))''')
+        
+        # Rolling chat summary; summarized_until is the last message ID folded into it
+        c.execute('''CREATE TABLE IF NOT EXISTS chat_summaries
+                    (conversation_id INTEGER PRIMARY KEY,
+                     summary TEXT NOT NULL,
+                     summarized_until INTEGER NOT NULL,
                      FOREIGN KEY (conversation_id) REFERENCES conversations (id))''')
         
+        # Indexes for the sidebar (newest first) and per-conversation message reads
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_conversations_created_at
+                    ON conversations (created_at, id)''')
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_messages_conversation_timestamp
+                    ON messages (conversation_id, timestamp)''')
+        
         conn.commit()
-        conn.close()
+        
+        self._migrate(conn)
 
+    def _migrate(self, conn):
+        """Upgrade databases created by older versions"""
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        
+        if version < 1:
+            # Text timestamps -> integer epoch microseconds
+            with conn:
+                for table, column in (('conversations', 'created_at'), ('messages', 'timestamp')):
+                    rows = conn.execute(f"""SELECT id, {column} FROM {table}
+                                           WHERE typeof({column}) = 'text'""").fetchall()
+                    conn.executemany(f"UPDATE {table} SET {column} = ? WHERE id = ?",
+                                     [(_text_to_us(value), row_id) for row_id, value in rows])
+                conn.execute("PRAGMA user_version = 1")
+        
+        if version < 2:
+            # Aynı dosyanın önceki analizini bulmak için depo yolu ve analiz sonucu
+            with conn:
+                # Aynı anda açılan başka bir worker sütunları eklemiş olabilir
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(code_contexts)")}
+                for column, column_type in (('repo_path', 'TEXT'), ('analysis', 'BLOB')):
+                    if column not in columns:
+                        conn.execute(f"ALTER TABLE code_contexts ADD COLUMN {column} {column_type}")
+                conn.execute('''CREATE INDEX IF NOT EXISTS idx_code_contexts_repo_path
+                               ON code_contexts (repo_path, conversation_id)''')
+                conn.execute("PRAGMA user_version = 2")
+        
+        if version < 3:
+            # Eski yanıtların HTML'i boş kalır; istemci bunları render eder (flask render-history ile doldurulabilir)
+            with conn:
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(messages)")}
+                if 'response_html' not in columns:
+                    conn.execute("ALTER TABLE messages ADD COLUMN response_html TEXT")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @timed(CHAT_HISTORY_SECONDS, operation='start_conversation')
     def start_conversation(self, github_url):
         """Start a new conversation and return its ID"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
+        conn = get_connection(self.db_path)
         
-        try:
-            c.execute("""INSERT INTO conversations (github_url, created_at) 
-                        VALUES (?, ?)""", (github_url, datetime.now()))
-            conversation_id = c.lastrowid
-            conn.commit()
-            return conversation_id
-        finally:
-            conn.close()
+        with conn:
+            c = conn.execute("""INSERT INTO conversations (github_url, created_at) 
+                               VALUES (?, ?)""", (github_url, now_us()))
+            return c.lastrowid
 
+    @timed(CHAT_HISTORY_SECONDS, operation='add_message')
     def add_message(self, conversation_id, message, response):
-        """Add a message and its response to a conversation"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
+        """Add a message and its response to a conversation, storing the response pre-rendered as HTML"""
+        # Render yazma sırasında bir kez yapılır; geçmiş sayfası tarayıcıda markdown/Prism çalıştırmaz
+        response_html = render_markdown(response)
+        conn = get_connection(self.db_path)
         
-        try:
-            c.execute("""INSERT INTO messages (conversation_id, message, response, timestamp)
-                        VALUES (?, ?, ?, ?)""",
-                     (conversation_id, message, response, datetime.now()))
-            conn.commit()
-        finally:
-            conn.close()
+        with conn:
+            conn.execute("""INSERT INTO messages (conversation_id, message, response, response_html, timestamp)
+                           VALUES (?, ?, ?, ?, ?)""",
+                        (conversation_id, message, response, response_html, now_us()))
 
-    def get_conversation_history(self, conversation_id):
-        """Get the full history of a conversation"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
+    @timed(CHAT_HISTORY_SECONDS, operation='render_missing_html')
+    def render_missing_html(self, batch_size=200):
+        """Render and store the HTML of messages saved without it; returns the number of rows updated"""
+        conn = get_connection(self.db_path)
+        updated = 0
+        last_id = 0
+        
+        while True:
+            rows = conn.execute("""SELECT id, response FROM messages
+                                  WHERE response_html IS NULL AND id > ?
+                                  ORDER BY id LIMIT ?""", (last_id, batch_size)).fetchall()
+            if not rows:
+                return updated
+            
+            rendered = [(render_markdown(response), row_id) for row_id, response in rows]
+            if rendered[0][0] is None:
+                # markdown-it-py/Pygments kurulu değil
+                return updated
+            with conn:
+                conn.executemany("UPDATE messages SET response_html = ? WHERE id = ?", rendered)
+            updated += len(rows)
+            last_id = rows[-1][0]
+
+    @timed(CHAT_HISTORY_SECONDS, operation='get_chat_memory')
+    def get_chat_memory(self, conversation_id, max_turns=CHAT_MEMORY_MAX_TURNS * 2):
+        """Get the rolling summary and the turns not yet folded into it (at most max_turns, oldest first)"""
+        conn = get_connection(self.db_path)
+        row = conn.execute("SELECT summary, summarized_until FROM chat_summaries WHERE conversation_id = ?",
+                           (conversation_id,)).fetchone()
+        summary, summarized_until = row if row else ('', 0)
+        
+        # Özetleme gecikse bile okunan tur sayısı sınırlı kalır
+        rows = conn.execute("""SELECT id, message, response FROM messages
+                              WHERE conversation_id = ? AND id > ?
+                              ORDER BY id DESC LIMIT ?""",
+                           (conversation_id, summarized_until, max_turns)).fetchall()
+        
+        return {
+            'summary': summary,
+            'summarized_until': summarized_until,
+            'turns': [{'id': row[0], 'message': row[1], 'response': row[2]} for row in reversed(rows)]
+        }
+
+    @timed(CHAT_HISTORY_SECONDS, operation='save_chat_summary')
+    def save_chat_summary(self, conversation_id, summary, summarized_until):
+        """Store a rolling summary covering messages up to summarized_until; older summaries never win"""
+        conn = get_connection(self.db_path)
+        
+        with conn:
+            conn.execute("""INSERT INTO chat_summaries (conversation_id, summary, summarized_until)
+                           VALUES (?, ?, ?)
+                           ON CONFLICT(conversation_id) DO UPDATE SET
+                               summary = excluded.summary,
+                               summarized_until = excluded.summarized_until
+                           WHERE excluded.summarized_until > chat_summaries.summarized_until""",
+                        (conversation_id, summary, summarized_until))
+
+    @timed(CHAT_HISTORY_SECONDS, operation='save_code_context')
+    def save_code_context(self, conversation_id, source, notebook_data=None, repo_path=None):
+        """Store the fetched source and parsed notebook structure of a conversation"""
+        conn = get_connection(self.db_path)
+        
+        with conn:
+            conn.execute("""INSERT OR REPLACE INTO code_contexts (conversation_id, source, notebook_data, repo_path)
+                           VALUES (?, ?, ?, ?)""",
+                        (conversation_id,
+                         zlib.compress(source.encode('utf-8')),
+                         zlib.compress(json.dumps(notebook_data).encode('utf-8')) if notebook_data else None,
+                         repo_path))
+        
+        self._cache_context(conversation_id, {'source': source, 'notebook_data': notebook_data})
+
+    @timed(CHAT_HISTORY_SECONDS, operation='save_analysis')
+    def save_analysis(self, conversation_id, analysis):
+        """Store the raw analysis of a conversation's code so later versions can be analyzed incrementally"""
+        conn = get_connection(self.db_path)
+        
+        with conn:
+            conn.execute("UPDATE code_contexts SET analysis = ? WHERE conversation_id = ?",
+                        (zlib.compress(json.dumps(analysis, ensure_ascii=False).encode('utf-8')),
+                         conversation_id))
+
+    @timed(CHAT_HISTORY_SECONDS, operation='find_previous_analysis')
+    def find_previous_analysis(self, repo_path, exclude_conversation_id=None):
+        """Return the code and analysis of the latest analyzed version of a repository file, or None"""
+        conn = get_connection(self.db_path)
+        row = conn.execute("""SELECT conversation_id, source, notebook_data, analysis FROM code_contexts
+                             WHERE repo_path = ? AND analysis IS NOT NULL AND conversation_id != ?
+                             ORDER BY conversation_id DESC LIMIT 1""",
+                          (repo_path, exclude_conversation_id or -1)).fetchone()
+        if not row:
+            return None
+        
+        return {
+            'conversation_id': row[0],
+            'source': zlib.decompress(row[1]).decode('utf-8'),
+            'notebook_data': json.loads(zlib.decompress(row[2])) if row[2] else None,
+            'analysis': json.loads(zlib.decompress(row[3]))
+        }
+
+    @timed(CHAT_HISTORY_SECONDS, operation='get_code_context')
+    def get_code_context(self, conversation_id):
+        """Get the stored code context of a conversation, or None if it was never saved"""
+        with self._context_lock:
+            context = self._context_cache.get(conversation_id)
+            if context is not None:
+                self._context_cache.move_to_end(conversation_id)
+                return context
+        
+        conn = get_connection(self.db_path)
+        row = conn.execute("""SELECT source, notebook_data 
+                             FROM code_contexts 
+                             WHERE conversation_id = ?""", (conversation_id,)).fetchone()
+        
+        if not row:
+            return None
+        
+        context = {
+            'source': zlib.decompress(row[0]).decode('utf-8'),
+            'notebook_data': json.loads(zlib.decompress(row[1])) if row[1] else None
+        }
+        self._cache_context(conversation_id, context)
+        return context
+
+    def _cache_context(self, conversation_id, context):
+        with self._context_lock:
+            self._context_cache[conversation_id] = context
+            self._context_cache.move_to_end(conversation_id)
+            while len(self._context_cache) > self.context_cache_size:
+                self._context_cache.popitem(last=False)
+
+    def _invalidate_context(self, conversation_id=None):
+        with self._context_lock:
+            if conversation_id is None:
+                self._context_cache.clear()
+            else:
+                self._context_cache.pop(conversation_id, None)
+
+    @timed(CHAT_HISTORY_SECONDS, operation='get_github_url')
+    def get_github_url(self, conversation_id):
+        """Get the GitHub URL of a conversation without loading its messages"""
+        conn = get_connection(self.db_path)
+        row = conn.execute("SELECT github_url FROM conversations WHERE id = ?",
+                           (conversation_id,)).fetchone()
+        
+        if not row:
+            raise ValueError(f"Conversation with ID {conversation_id} not found")
+        
+        return row[0]
+
+    @timed(CHAT_HISTORY_SECONDS, operation='get_conversation_history')
+    def get_conversation_history(self, conversation_id, limit=None):
+        """Get a conversation with its messages (timestamps in epoch microseconds).
+
+        With a limit only the latest messages are returned; next_cursor pages back through older ones.
+        """
+        c = get_connection(self.db_path).cursor()
+        c.row_factory = sqlite3.Row
         
         try:
             # Get conversation details
@@ -74,32 +315,81 @@ class ChatHistory:
                 raise ValueError(f"Conversation with ID {conversation_id} not found")
             
             # Get messages
-            c.execute("""SELECT message, response, timestamp 
-                        FROM messages 
-                        WHERE conversation_id = ?
-                        ORDER BY timestamp""", (conversation_id,))
-            messages = c.fetchall()
+            if limit is None:
+                c.execute("""SELECT id, message, response, response_html, timestamp 
+                            FROM messages 
+                            WHERE conversation_id = ?
+                            ORDER BY timestamp, id""", (conversation_id,))
+                page = {'messages': c.fetchall(), 'next_cursor': None}
+            else:
+                page = self._fetch_messages_page(c, conversation_id, limit)
             
             return {
                 'id': conversation['id'],
                 'github_url': conversation['github_url'],
-                'created_at': datetime.strptime(conversation['created_at'], '%Y-%m-%d %H:%M:%S.%f'),
-                'messages': [
-                    {
-                        'message': msg['message'],
-                        'response': msg['response'],
-                        'timestamp': datetime.strptime(msg['timestamp'], '%Y-%m-%d %H:%M:%S.%f')
-                    } for msg in messages
-                ]
+                'created_at': conversation['created_at'],
+                'messages': [self._message_dict(msg) for msg in page['messages']],
+                'next_cursor': page['next_cursor']
             }
         finally:
-            conn.close()
+            c.close()
+
+    @timed(CHAT_HISTORY_SECONDS, operation='get_messages_page')
+    def get_messages_page(self, conversation_id, limit=HISTORY_PAGE_SIZE, cursor=None):
+        """Get the messages before cursor (the latest ones without it), oldest first, using keyset pagination"""
+        c = get_connection(self.db_path).cursor()
+        c.row_factory = sqlite3.Row
+        
+        try:
+            page = self._fetch_messages_page(c, conversation_id, limit, cursor)
+        finally:
+            c.close()
+        
+        return {
+            'messages': [self._message_dict(msg) for msg in page['messages']],
+            'next_cursor': page['next_cursor']
+        }
+
+    def _fetch_messages_page(self, c, conversation_id, limit, cursor=None):
+        # (conversation_id, timestamp) indeksi rowid'i de içerir; sayfa başına sadece limit + 1 satır okunur
+        if cursor:
+            timestamp, last_id = self._parse_cursor(cursor)
+            c.execute("""SELECT id, message, response, response_html, timestamp 
+                        FROM messages 
+                        WHERE conversation_id = ? AND (timestamp, id) < (?, ?)
+                        ORDER BY timestamp DESC, id DESC
+                        LIMIT ?""", (conversation_id, timestamp, last_id, limit + 1))
+        else:
+            c.execute("""SELECT id, message, response, response_html, timestamp 
+                        FROM messages 
+                        WHERE conversation_id = ?
+                        ORDER BY timestamp DESC, id DESC
+                        LIMIT ?""", (conversation_id, limit + 1))
+        rows = c.fetchall()
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        return {
+            'messages': rows[::-1],
+            'next_cursor': f"{rows[-1]['timestamp']}|{rows[-1]['id']}" if has_more else None
+        }
+
+    @staticmethod
+    def _message_dict(msg):
+        return {
+            'id': msg['id'],
+            'message': msg['message'],
+            'response': msg['response'],
+            'response_html': msg['response_html'],
+            'timestamp': msg['timestamp']
+        }
 
+    @timed(CHAT_HISTORY_SECONDS, operation='get_all_conversations')
     def get_all_conversations(self):
         """Get all conversations with their basic info"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
+        c = get_connection(self.db_path).cursor()
+        c.row_factory = sqlite3.Row
         
         try:
             c.execute("""SELECT id, github_url, created_at 
@@ -110,59 +400,108 @@ class ChatHistory:
                 {
                     'id': row['id'],
                     'github_url': row['github_url'],
-                    'created_at': datetime.strptime(row['created_at'], '%Y-%m-%d %H:%M:%S.%f')
+                    'created_at': row['created_at']
                 }
                 for row in c.fetchall()
             ]
             
             return conversations
         finally:
-            conn.close()
+            c.close()
+
+    @timed(CHAT_HISTORY_SECONDS, operation='get_conversations_page')
+    def get_conversations_page(self, limit=SIDEBAR_PAGE_SIZE, cursor=None):
+        """Get one page of conversations, newest first, using keyset pagination"""
+        c = get_connection(self.db_path).cursor()
+        c.row_factory = sqlite3.Row
+        
+        try:
+            if cursor:
+                created_at, last_id = self._parse_cursor(cursor)
+                c.execute("""SELECT id, github_url, created_at 
+                            FROM conversations 
+                            WHERE (created_at, id) < (?, ?)
+                            ORDER BY created_at DESC, id DESC
+                            LIMIT ?""", (created_at, last_id, limit + 1))
+            else:
+                c.execute("""SELECT id, github_url, created_at 
+                            FROM conversations 
+                            ORDER BY created_at DESC, id DESC
+                            LIMIT ?""", (limit + 1,))
+            rows = c.fetchall()
+        finally:
+            c.close()
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        return {
+            'conversations': [
+                {
+                    'id': row['id'],
+                    'github_url': row['github_url'],
+                    'created_at': row['created_at']
+                }
+                for row in rows
+            ],
+            'next_cursor': f"{rows[-1]['created_at']}|{rows[-1]['id']}" if has_more else None
+        }
+
+    @staticmethod
+    def _parse_cursor(cursor):
+        """Split an opaque 'created_at|id' (or 'timestamp|id') cursor into its keyset values"""
+        try:
+            created_at, last_id = cursor.rsplit('|', 1)
+            return int(created_at), int(last_id)
+        except ValueError:
+            raise ValueError("Invalid cursor")
 
+    @timed(CHAT_HISTORY_SECONDS, operation='delete_conversation')
     def delete_conversation(self, conversation_id):
         """Delete a conversation and all its messages"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
+        conn = get_connection(self.db_path)
         
         try:
-            # Delete messages first (due to foreign key constraint)
-            c.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
-            
-            # Then delete the conversation
-            c.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
+            with conn:
+                # Delete messages, code context and summary first (due to foreign key constraint)
+                conn.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+                conn.execute("DELETE FROM code_contexts WHERE conversation_id = ?", (conversation_id,))
+                conn.execute("DELETE FROM chat_summaries WHERE conversation_id = ?", (conversation_id,))
+                
+                # Then delete the conversation
+                conn.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
             
-            conn.commit()
+            self._invalidate_context(conversation_id)
             return True
         except Exception as e:
             print(f"Error deleting conversation: {e}")
             return False
-        finally:
-            conn.close()
 
+    @timed(CHAT_HISTORY_SECONDS, operation='clear_all_history')
     def clear_all_history(self):
         """Clear all conversations and messages"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
+        conn = get_connection(self.db_path)
         
         try:
-            # Delete all messages first (due to foreign key constraint)
-            c.execute("DELETE FROM messages")
-            
-            # Then delete all conversations
-            c.execute("DELETE FROM conversations")
+            with conn:
+                # Delete all messages, code contexts and summaries first (due to foreign key constraint)
+                conn.execute("DELETE FROM messages")
+                conn.execute("DELETE FROM code_contexts")
+                conn.execute("DELETE FROM chat_summaries")
+                
+                # Then delete all conversations
+                conn.execute("DELETE FROM conversations")
             
-            conn.commit()
+            self._invalidate_context()
             return True
         except Exception as e:
             print(f"Error clearing history: {e}")
             return False
-        finally:
-            conn.close()
 
+    @timed(CHAT_HISTORY_SECONDS, operation='get_conversation_stats')
     def get_conversation_stats(self, conversation_id):
         """Get statistics for a conversation"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
+        c = get_connection(self.db_path).cursor()
         
         try:
             c.execute("""SELECT 
@@ -175,8 +514,8 @@ class ChatHistory:
             stats = c.fetchone()
             return {
                 'message_count': stats[0],
-                'first_message': datetime.strptime(stats[1], '%Y-%m-%d %H:%M:%S.%f') if stats[1] else None,
-                'last_message': datetime.strptime(stats[2], '%Y-%m-%d %H:%M:%S.%f') if stats[2] else None
+                'first_message': stats[1],
+                'last_message': stats[2]
             }
         finally:
-            conn.close()
\ No newline at end of file
+            c.close()
\ No newline at end of file
@@ -0,0 +1,33 @@
+import os
+import sqlite3
+import threading
+from config.settings import SQLITE_BUSY_TIMEOUT, SQLITE_CACHE_SIZE_KB, SQLITE_CACHED_STATEMENTS
+
+_local = threading.local()
+
+def get_connection(db_path):
+    """Return this thread's connection to db_path, opening and tuning it on first use"""
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    # gunicorn fork sonrası üst süreçten kalan bağlantılar kullanılmamalı
+    pid, conn = connections.get(db_path, (None, None))
+    if conn is None or pid != os.getpid():
+        conn = sqlite3.connect(db_path, timeout=SQLITE_BUSY_TIMEOUT,
+                               cached_statements=SQLITE_CACHED_STATEMENTS)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        connections[db_path] = (os.getpid(), conn)
+
+    return conn
+
+def close_connections():
+    """Close every connection opened by the current thread"""
+    connections = getattr(_local, 'connections', None) or {}
+    for pid, conn in connections.values():
+        if pid == os.getpid():
+            conn.close()
+    connections.clear()
@@ -0,0 +1,123 @@
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from config.settings import ANALYSIS_JOB_RETENTION
+from database.connection import get_connection
+
+class JobStore:
+    def __init__(self, db_path="chat_history.db", retention=ANALYSIS_JOB_RETENTION):
+        """Initialize job store; jobs live in SQLite so every worker can report on them"""
+        self.db_path = db_path
+        self.retention = retention
+        self.init_db()
+
+    def init_db(self):
+        """Initialize database tables"""
+        conn = get_connection(self.db_path)
+        c = conn.cursor()
+
+        c.execute('''CREATE TABLE IF NOT EXISTS analysis_jobs
+                    (id TEXT PRIMARY KEY,
+                     conversation_id INTEGER NOT NULL,
+                     status TEXT NOT NULL,
+                     stage TEXT NOT NULL,
+                     result TEXT,
+                     error TEXT,
+                     created_at REAL NOT NULL,
+                     updated_at REAL NOT NULL)''')
+
+        # İşi çalıştıran süreç ('host:pid'); eski tablolara sonradan eklenir
+        columns = {row[1] for row in c.execute("PRAGMA table_info(analysis_jobs)")}
+        if 'owner' not in columns:
+            c.execute("ALTER TABLE analysis_jobs ADD COLUMN owner TEXT")
+
+        conn.commit()
+
+    @staticmethod
+    def _owner():
+        # Fork sonrası her worker kendi pid'ini yazar
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    @staticmethod
+    def _process_alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def fail_orphaned_jobs(self):
+        """Mark queued/running jobs of dead processes on this host as failed; returns how many.
+
+        Jobs only live in their worker's in-memory queue, so after a restart nothing finishes them.
+        """
+        host = socket.gethostname()
+        conn = get_connection(self.db_path)
+        rows = conn.execute("""SELECT id, owner FROM analysis_jobs
+                              WHERE status IN ('queued', 'running')""").fetchall()
+
+        orphaned = []
+        for job_id, owner in rows:
+            if owner is None:
+                # Sahip bilgisinden önceki sürümün işleri
+                orphaned.append(job_id)
+                continue
+            owner_host, _, pid = owner.rpartition(':')
+            if owner_host == host and int(pid) != os.getpid() and not self._process_alive(int(pid)):
+                orphaned.append(job_id)
+
+        if orphaned:
+            with conn:
+                conn.executemany("""UPDATE analysis_jobs
+                                     SET status = 'failed', stage = 'done', error = ?, updated_at = ?
+                                     WHERE id = ? AND status IN ('queued', 'running')""",
+                                 [("Worker yeniden başlatıldı, analiz tamamlanamadı", time.time(), job_id)
+                                  for job_id in orphaned])
+        return len(orphaned)
+
+    def create_job(self, conversation_id):
+        """Create a queued job and return its ID"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        conn = get_connection(self.db_path)
+
+        with conn:
+            conn.execute("""INSERT INTO analysis_jobs
+                           (id, conversation_id, status, stage, owner, created_at, updated_at)
+                           VALUES (?, ?, 'queued', 'queued', ?, ?, ?)""",
+                        (job_id, conversation_id, self._owner(), now, now))
+
+            # Eski işleri temizle
+            conn.execute("DELETE FROM analysis_jobs WHERE updated_at < ?", (now - self.retention,))
+        return job_id
+
+    def update_job(self, job_id, status=None, stage=None, result=None, error=None):
+        """Update the status, stage, result or error of a job"""
+        fields = {'status': status, 'stage': stage, 'result': result, 'error': error}
+        updates = {key: value for key, value in fields.items() if value is not None}
+        updates['updated_at'] = time.time()
+
+        conn = get_connection(self.db_path)
+        assignments = ', '.join(f"{key} = ?" for key in updates)
+
+        with conn:
+            conn.execute(f"UPDATE analysis_jobs SET {assignments} WHERE id = ?",
+                        (*updates.values(), job_id))
+
+    def get_job(self, job_id):
+        """Get a job by ID, or None if it does not exist"""
+        c = get_connection(self.db_path).cursor()
+        c.row_factory = sqlite3.Row
+
+        try:
+            c.execute("""SELECT id, conversation_id, status, stage, result, error
+                        FROM analysis_jobs
+                        WHERE id = ?""", (job_id,))
+            row = c.fetchone()
+            return dict(row) if row else None
+        finally:
+            c.close()
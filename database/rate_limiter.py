@@ -0,0 +1,163 @@
+import asyncio
+import random
+import threading
+import time
+from config.settings import (
+    OPENAI_RPM,
+    OPENAI_TPM,
+    GEMINI_RPM,
+    GEMINI_TPM,
+    LLM_RATE_LIMIT_MAX_WAIT
+)
+from database.connection import get_connection
+
+DEFAULT_LIMITS = {
+    'openai': {'requests': OPENAI_RPM, 'tokens': OPENAI_TPM},
+    'gemini': {'requests': GEMINI_RPM, 'tokens': GEMINI_TPM}
+}
+
+class RateLimitTimeout(Exception):
+    """Raised when a request would have to wait longer than max_wait for quota"""
+
+class RateLimiter:
+    def __init__(self, db_path="rate_limits.db", limits=None, max_wait=LLM_RATE_LIMIT_MAX_WAIT):
+        """Token buckets per provider for requests/min and tokens/min, shared by every worker through SQLite"""
+        self.db_path = db_path
+        self.limits = DEFAULT_LIMITS if limits is None else limits
+        self.max_wait = max_wait
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self._lock = threading.Lock()
+        self.init_db()
+
+    def init_db(self):
+        """Initialize database tables"""
+        conn = get_connection(self.db_path)
+        c = conn.cursor()
+
+        # level: kovada kalan miktar, updated_at anına göre; dolum hızı limit / 60 saniye
+        c.execute('''CREATE TABLE IF NOT EXISTS rate_buckets
+                    (bucket TEXT PRIMARY KEY,
+                     level REAL NOT NULL,
+                     updated_at REAL NOT NULL)''')
+
+        conn.commit()
+
+    def _buckets(self, provider, tokens):
+        """(bucket, per-minute limit, cost) of each enabled bucket of a provider"""
+        limits = self.limits.get(provider, {})
+        buckets = []
+        if limits.get('requests'):
+            buckets.append((f"{provider}:requests", limits['requests'], 1))
+        if limits.get('tokens'):
+            # Kotadan büyük istekler kova dolunca geçer, sonsuza kadar beklemez
+            buckets.append((f"{provider}:tokens", limits['tokens'], min(tokens, limits['tokens'])))
+        return buckets
+
+    def _try_take(self, buckets):
+        """Take the cost from every bucket at once; return 0 on success or the seconds to wait"""
+        conn = get_connection(self.db_path)
+        now = time.time()
+
+        # BEGIN IMMEDIATE: okuma ve yazma arasında başka bir süreç araya giremez
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            levels = []
+            wait = 0.0
+            for bucket, limit, cost in buckets:
+                row = conn.execute("SELECT level, updated_at FROM rate_buckets WHERE bucket = ?",
+                                   (bucket,)).fetchone()
+                rate = limit / 60
+                level = limit if row is None else min(limit, row[0] + (now - row[1]) * rate)
+                levels.append(level - cost)
+                if level < cost:
+                    wait = max(wait, (cost - level) / rate)
+
+            if not wait:
+                conn.executemany("INSERT OR REPLACE INTO rate_buckets (bucket, level, updated_at) VALUES (?, ?, ?)",
+                                 [(bucket, level, now) for (bucket, _, _), level in zip(buckets, levels)])
+            conn.commit()
+            return wait
+        except Exception:
+            conn.rollback()
+            raise
+
+    def acquire(self, provider, tokens=0):
+        """Block until one request with the estimated token count fits the provider's quota"""
+        buckets = self._buckets(provider, tokens)
+        deadline = time.monotonic() + self.max_wait
+        while buckets:
+            delay = self._next_delay(provider, buckets, deadline)
+            if not delay:
+                return
+            time.sleep(delay)
+
+    async def acquire_async(self, provider, tokens=0):
+        """Async version of acquire; waiting for quota does not hold a thread"""
+        buckets = self._buckets(provider, tokens)
+        deadline = time.monotonic() + self.max_wait
+        while buckets:
+            # BEGIN IMMEDIATE busy_timeout kadar bekleyebilir; worker'ın ortak döngüsünü tutmasın
+            delay = await asyncio.to_thread(self._next_delay, provider, buckets, deadline)
+            if not delay:
+                return
+            await asyncio.sleep(delay)
+
+    def _next_delay(self, provider, buckets, deadline):
+        """Take the quota and return 0, or return how long to sleep before the next try"""
+        wait = self._try_take(buckets)
+        if not wait:
+            return 0
+        if time.monotonic() + wait > deadline:
+            raise RateLimitTimeout(f"{provider} hız sınırı: kota için {wait:.1f} saniye beklemek gerekiyor")
+
+        # Küçük jitter, aynı anda uyanan worker'ların tekrar çakışmasını önler
+        delay = wait + random.uniform(0, 0.1)
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds += delay
+        return delay
+
+    def settle(self, provider, estimated_tokens, actual_tokens):
+        """Correct the token bucket once the real usage of a request is known"""
+        limit = self.limits.get(provider, {}).get('tokens')
+        if not limit or actual_tokens is None:
+            return
+
+        conn = get_connection(self.db_path)
+        with conn:
+            conn.execute("UPDATE rate_buckets SET level = MIN(?, level + ?) WHERE bucket = ?",
+                        (limit, min(estimated_tokens, limit) - actual_tokens, f"{provider}:tokens"))
+
+    def pause(self, provider, seconds):
+        """Hold back every worker's requests to a provider that answered with Retry-After"""
+        limit = self.limits.get(provider, {}).get('requests')
+        if not limit:
+            return
+
+        # Kova, tam 'seconds' saniye sonra tek bir isteğe yetecek kadar dolacak şekilde boşaltılır
+        conn = get_connection(self.db_path)
+        with conn:
+            conn.execute("""INSERT INTO rate_buckets (bucket, level, updated_at) VALUES (?, ?, ?)
+                           ON CONFLICT(bucket) DO UPDATE SET level = MIN(level, excluded.level),
+                                                             updated_at = excluded.updated_at""",
+                        (f"{provider}:requests", 1 - seconds * limit / 60, time.time()))
+
+    def get_stats(self):
+        """Current bucket levels and this worker's waiting totals"""
+        conn = get_connection(self.db_path)
+        now = time.time()
+        rows = dict((bucket, (level, updated_at)) for bucket, level, updated_at in
+                    conn.execute("SELECT bucket, level, updated_at FROM rate_buckets"))
+
+        buckets = {}
+        for provider in self.limits:
+            for bucket, limit, _ in self._buckets(provider, 0):
+                level, updated_at = rows.get(bucket, (limit, now))
+                buckets[bucket] = {
+                    'limit_per_minute': limit,
+                    'available': round(min(limit, level + (now - updated_at) * limit / 60), 1)
+                }
+
+        with self._lock:
+            return {'buckets': buckets, 'waits': self.waits, 'wait_seconds': round(self.wait_seconds, 3)}
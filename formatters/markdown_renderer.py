@@ -0,0 +1,100 @@
+from html import escape
+from utils.metrics import MARKDOWN_RENDER_SECONDS, timed
+
+try:
+    from markdown_it import MarkdownIt
+    from markdown_it.common.utils import unescapeAll
+    from pygments import lex
+    from pygments.lexers import get_lexer_by_name
+    from pygments.token import Token
+    from pygments.util import ClassNotFound
+except ImportError:
+    MarkdownIt = None
+
+# Pygments token türleri -> Prism sınıfları; prism-tomorrow teması sunucuda renklendirilen
+# kodu istemcide renklendirilmiş gibi gösterir. En yakın üst tür kullanılır.
+PRISM_CLASSES = {
+    'Comment': 'comment',
+    'Keyword': 'keyword',
+    'Keyword.Constant': 'boolean',
+    'Name.Builtin': 'builtin',
+    'Name.Builtin.Pseudo': None,
+    'Name.Function': 'function',
+    'Name.Class': 'class-name',
+    'Name.Decorator': 'decorator',
+    'Name.Namespace': 'namespace',
+    'Name.Constant': 'constant',
+    'Name.Variable': 'variable',
+    'Name.Tag': 'property',
+    'Literal.String': 'string',
+    'Literal.Number': 'number',
+    'Operator': 'operator',
+    'Operator.Word': 'keyword',
+    'Punctuation': 'punctuation',
+    'Generic.Deleted': 'deleted',
+    'Generic.Inserted': 'inserted',
+}
+
+# Prism toolbar eklentisinin işaretlemesi; kopyalama düğmesi main.js'te tek bir dinleyiciyle çalışır
+COPY_TOOLBAR = ('<div class="toolbar"><div class="toolbar-item">'
+                '<button class="copy-to-clipboard-button" type="button" data-copy-state="copy">'
+                '<span>Copy</span></button></div></div>')
+
+_markdown = None
+_token_classes = {}
+
+def _prism_class(token_type):
+    """Find the Prism class of a Pygments token type (cached per type)"""
+    if token_type not in _token_classes:
+        current = token_type
+        while current is not Token and str(current)[6:] not in PRISM_CLASSES:
+            current = current.parent
+        _token_classes[token_type] = PRISM_CLASSES.get(str(current)[6:])
+    return _token_classes[token_type]
+
+def _highlight(code, lang):
+    """Highlight a code block with Pygments, emitting Prism-compatible markup"""
+    try:
+        lexer = get_lexer_by_name(lang, stripnl=False) if lang else None
+    except ClassNotFound:
+        lexer = None
+
+    if lexer is None:
+        body = escape(code, quote=False)
+        lang = 'none'
+    else:
+        # Aynı sınıftaki ardışık tokenlar tek span olur; saklanan HTML küçük kalır
+        runs = []
+        for token_type, value in lex(code, lexer):
+            prism_class = _prism_class(token_type)
+            if runs and runs[-1][0] == prism_class:
+                runs[-1][1].append(value)
+            else:
+                runs.append((prism_class, [value]))
+        body = ''.join(f'<span class="token {prism_class}">{escape("".join(values), quote=False)}</span>'
+                       if prism_class else escape(''.join(values), quote=False)
+                       for prism_class, values in runs)
+        lang = escape(lang)
+
+    return (f'<div class="code-toolbar"><pre class="language-{lang}"><code class="language-{lang}">'
+            f'{body}</code></pre>{COPY_TOOLBAR}</div>\n')
+
+def _render_fence(renderer, tokens, idx, options, env):
+    """Fenced code block renderer; replaces highlight() so the block can be wrapped in a toolbar"""
+    info = unescapeAll(tokens[idx].info).split()
+    return _highlight(tokens[idx].content, info[0] if info else '')
+
+def _get_markdown():
+    global _markdown
+    if _markdown is None:
+        # main.js ile aynı ayarlar (markdown-it varsayılanları): ham HTML kapalı, tablolar açık
+        _markdown = MarkdownIt('js-default')
+        _markdown.add_render_rule('fence', _render_fence)
+    return _markdown
+
+@timed(MARKDOWN_RENDER_SECONDS)
+def render_markdown(text):
+    """Render a chat response to HTML with highlighted code, or None if markdown-it-py/Pygments are missing"""
+    if MarkdownIt is None or text is None:
+        return None
+    return _get_markdown().render(text)
@@ -1,4 +1,5 @@
 import re
+from utils.metrics import FORMAT_SECONDS, timed
 
 class OutputFormatter:
     @staticmethod
@@ -43,13 +44,30 @@ class OutputFormatter:
         return text
 
     @staticmethod
-    def format_analysis(analysis):
-        """Analiz sonuçlarını markdown formatında döndürür"""
+    def _format_coverage(coverage):
+        """Depo raporunda analiz edilmeyen dosyalar için uyarı satırları"""
+        if not coverage:
+            return []
+
+        notes = []
+        if coverage['analyzed_files'] < coverage['total_files']:
+            notes.append(f"> **Not:** Depoda {coverage['total_files']} .py/.ipynb dosyası bulundu, "
+                         f"ilk {coverage['analyzed_files']} dosya analiz edildi (REPO_MAX_FILES).")
+        if coverage['tree_truncated']:
+            notes.append("> **Not:** GitHub depo ağacını kısaltarak döndürdü; bazı dosyalar listelenmemiş "
+                         "olabilir. Tam kapsam için bir alt dizin URL'si kullanın.")
+        return notes + [""] if notes else []
+
+    @staticmethod
+    @timed(FORMAT_SECONDS)
+    def format_analysis(analysis, coverage=None):
+        """Analiz sonuçlarını markdown formatında döndürür; coverage depo kapsamı uyarısı içindir"""
         if "error" in analysis:
             return f"## Hata\n{analysis['error']}"
 
         formatted_output = []
         formatted_output.append("# Kod Analiz Raporu\n")
+        formatted_output.extend(OutputFormatter._format_coverage(coverage))
         
         # Proje Amacı
         formatted_output.append("## Proje Amacı")
@@ -23,15 +23,37 @@ document.addEventListener('DOMContentLoaded', function() {
         Prism.highlightAllUnder(element);
     }
 
-    // Mevcut markdown içeriğini işle
-    document.querySelectorAll('.markdown-content').forEach(renderMarkdownAndInitPrism);
+    // Sunucuda render edilmiş mesajlar olduğu gibi kalır; sadece HTML'i saklanmamış eski mesajlar işlenir
+    document.querySelectorAll('.markdown-content:not([data-rendered])').forEach(renderMarkdownAndInitPrism);
+
+    // Sunucuda render edilen kod bloklarının kopyalama düğmesi (Prism toolbar işaretlemesiyle aynı)
+    if (messagesDiv) {
+        messagesDiv.addEventListener('click', function(e) {
+            const button = e.target.closest('[data-rendered] .copy-to-clipboard-button');
+            if (!button) return;
+            const code = button.closest('.code-toolbar').querySelector('code');
+            navigator.clipboard.writeText(code.textContent).then(function() {
+                button.dataset.copyState = 'copy-success';
+                button.firstElementChild.textContent = 'Copied!';
+            }, function() {
+                button.dataset.copyState = 'copy-error';
+                button.firstElementChild.textContent = 'Press Ctrl+C to copy';
+            }).finally(function() {
+                setTimeout(function() {
+                    button.dataset.copyState = 'copy';
+                    button.firstElementChild.textContent = 'Copy';
+                }, 5000);
+            });
+        });
+    }
 
     // Mesajları en alta kaydır
     if (messagesDiv) {
         messagesDiv.scrollTop = messagesDiv.scrollHeight;
     }
 
-    function addMessage(sender, content) {
+    // Mesaj elemanını oluştur; html verilirse sunucuda render edilmiş yanıt olduğu gibi kullanılır
+    function createMessage(sender, content, html) {
         const messageDiv = document.createElement('div');
         messageDiv.className = `message ${sender} mb-4`;
         
@@ -40,24 +62,251 @@ document.addEventListener('DOMContentLoaded', function() {
             'bg-blue-100 p-3 rounded-lg mx-auto max-w-3xl' : 
             'bg-white shadow-lg p-4 rounded-lg mx-auto max-w-3xl markdown-content';
         
-        if (sender === 'assistant') {
+        messageDiv.appendChild(contentDiv);
+        if (sender === 'assistant' && html) {
+            contentDiv.dataset.rendered = '';
+            contentDiv.innerHTML = html;
+        } else if (sender === 'assistant') {
             contentDiv.textContent = content;
             renderMarkdownAndInitPrism(contentDiv);
         } else {
             contentDiv.textContent = content;
         }
+        return messageDiv;
+    }
+
+    function addMessage(sender, content) {
+        messagesDiv.appendChild(createMessage(sender, content));
+        messagesDiv.scrollTop = messagesDiv.scrollHeight;
+    }
+
+    // Uzun konuşmalar: sayfa sadece son turlarla açılır, yukarı kaydırıldıkça eski turlar yüklenir
+    let loadingMessages = false;
+
+    async function loadOlderMessages() {
+        const cursor = messagesDiv.dataset.nextCursor;
+        if (!cursor || !conversationId || loadingMessages) return;
+        
+        loadingMessages = true;
+        try {
+            const response = await fetch(`/api/conversations/${conversationId}/messages?cursor=${encodeURIComponent(cursor)}`);
+            const data = await response.json();
+            if (data.error) {
+                throw new Error(data.error);
+            }
+            
+            const fragment = document.createDocumentFragment();
+            data.messages.forEach(function(msg) {
+                fragment.appendChild(createMessage('user', msg.message));
+                fragment.appendChild(createMessage('assistant', msg.response, msg.response_html));
+            });
+            
+            // Üste eklenen içerik görünen mesajları kaydırmasın
+            const previousHeight = messagesDiv.scrollHeight;
+            messagesDiv.insertBefore(fragment, messagesDiv.firstChild);
+            messagesDiv.scrollTop += messagesDiv.scrollHeight - previousHeight;
+            messagesDiv.dataset.nextCursor = data.next_cursor || '';
+        } catch (error) {
+            console.error('Error:', error);
+            return;
+        } finally {
+            loadingMessages = false;
+        }
+        
+        // İlk sayfa ekranı doldurmuyorsa kaydırma olayı gelmez; doluncaya kadar yüklemeye devam et
+        if (messagesDiv.scrollHeight <= messagesDiv.clientHeight) {
+            loadOlderMessages();
+        }
+    }
+
+    if (messagesDiv) {
+        messagesDiv.addEventListener('scroll', function() {
+            if (messagesDiv.scrollTop <= 200) {
+                loadOlderMessages();
+            }
+        });
+        if (messagesDiv.scrollHeight <= messagesDiv.clientHeight) {
+            loadOlderMessages();
+        }
+    }
+
+    // Akış halinde gelen yanıt için boş bir asistan mesajı oluştur
+    function addStreamingMessage() {
+        const messageDiv = document.createElement('div');
+        messageDiv.className = 'message assistant mb-4';
+        
+        const contentDiv = document.createElement('div');
+        contentDiv.className = 'bg-white shadow-lg p-4 rounded-lg mx-auto max-w-3xl markdown-content';
         
         messageDiv.appendChild(contentDiv);
         messagesDiv.appendChild(messageDiv);
+        return contentDiv;
+    }
+
+    // SSE parçalarını okuyup markdown'ı kademeli olarak render et
+    async function renderStream(response, contentDiv) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let text = '';
+        let renderPending = false;
+        
+        function scheduleRender() {
+            if (renderPending) return;
+            renderPending = true;
+            requestAnimationFrame(function() {
+                renderPending = false;
+                contentDiv.innerHTML = md.render(text);
+                messagesDiv.scrollTop = messagesDiv.scrollHeight;
+            });
+        }
+        
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            
+            buffer += decoder.decode(value, { stream: true });
+            const frames = buffer.split('\n\n');
+            buffer = frames.pop();
+            
+            for (const frame of frames) {
+                let event = 'message';
+                let data = '';
+                for (const line of frame.split('\n')) {
+                    if (line.startsWith('event: ')) event = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                }
+                if (event === 'chunk') {
+                    text += JSON.parse(data).text;
+                    scheduleRender();
+                }
+            }
+        }
+        
+        contentDiv.innerHTML = md.render(text);
+        Prism.highlightAllUnder(contentDiv);
         messagesDiv.scrollTop = messagesDiv.scrollHeight;
     }
 
+    const JOB_STAGE_LABELS = {
+        queued: 'Sırada bekleniyor...',
+        fetching: 'Dosya GitHub\'dan alınıyor...',
+        parsing: 'Notebook işleniyor...',
+        llm: 'Kod analiz ediliyor...',
+        formatting: 'Rapor hazırlanıyor...'
+    };
+
+    // Analiz işini bitene kadar yokla ve aşamasını göster
+    async function waitForJob(jobId) {
+        const statusDiv = document.createElement('div');
+        statusDiv.className = 'message assistant mb-4 text-center text-sm text-gray-500';
+        messagesDiv.appendChild(statusDiv);
+        
+        try {
+            while (true) {
+                const response = await fetch(`/jobs/${jobId}`);
+                const job = await response.json();
+                if (job.error && !job.status) {
+                    throw new Error(job.error);
+                }
+                if (job.status === 'done' || job.status === 'failed') {
+                    return job;
+                }
+                statusDiv.textContent = JOB_STAGE_LABELS[job.stage] || job.stage;
+                await new Promise(resolve => setTimeout(resolve, 1000));
+            }
+        } finally {
+            statusDiv.remove();
+        }
+    }
+
+    // Hızlı rapordan sonra tam yapay zeka analizini başlatan buton
+    function addUpgradeButton(conversationId) {
+        const wrapper = document.createElement('div');
+        wrapper.className = 'message assistant mb-4 text-center';
+        const button = document.createElement('button');
+        button.className = 'px-4 py-2 text-sm font-medium rounded-md text-white bg-blue-600 hover:bg-blue-700';
+        button.textContent = 'Tam analizi başlat (yapay zeka)';
+        wrapper.appendChild(button);
+        messagesDiv.appendChild(wrapper);
+        
+        button.addEventListener('click', async function() {
+            wrapper.remove();
+            try {
+                const response = await fetch(`/analyze/${conversationId}/full`, { method: 'POST' });
+                const data = await response.json();
+                if (data.error) {
+                    throw new Error(data.error);
+                }
+                const job = await waitForJob(data.job_id);
+                addMessage('assistant', job.result || job.error);
+            } catch (error) {
+                console.error('Error:', error);
+                alert('Bir hata oluştu!');
+            }
+        });
+    }
+
+    // Kenar çubuğu: aşağı kaydırıldıkça eski konuşmaları yükle
+    const historyScroll = document.getElementById('historyScroll');
+    const historyList = document.getElementById('historyList');
+    let loadingHistory = false;
+
+    function addHistoryItem(conversation) {
+        const isActive = String(conversation.id) === historyList.dataset.activeId;
+        const link = document.createElement('a');
+        link.href = conversation.url;
+        link.className = 'block p-4 rounded-lg hover:bg-gray-50 transition-all duration-200 ' +
+            (isActive ? 'bg-blue-50 border border-blue-200' : 'border border-gray-100');
+        
+        const name = document.createElement('div');
+        name.className = 'text-sm font-medium text-gray-900 truncate max-w-[180px] mb-1';
+        name.textContent = conversation.name;
+        
+        const date = document.createElement('div');
+        date.className = 'flex items-center text-xs text-gray-500';
+        date.textContent = conversation.created_at;
+        
+        link.appendChild(name);
+        link.appendChild(date);
+        historyList.appendChild(link);
+    }
+
+    async function loadMoreHistory() {
+        const cursor = historyList.dataset.nextCursor;
+        if (!cursor || loadingHistory) return;
+        
+        loadingHistory = true;
+        try {
+            const response = await fetch(`/api/conversations?cursor=${encodeURIComponent(cursor)}`);
+            const data = await response.json();
+            if (data.error) {
+                throw new Error(data.error);
+            }
+            data.conversations.forEach(addHistoryItem);
+            historyList.dataset.nextCursor = data.next_cursor || '';
+        } catch (error) {
+            console.error('Error:', error);
+        } finally {
+            loadingHistory = false;
+        }
+    }
+
+    if (historyScroll && historyList) {
+        historyScroll.addEventListener('scroll', function() {
+            if (historyScroll.scrollTop + historyScroll.clientHeight >= historyScroll.scrollHeight - 200) {
+                loadMoreHistory();
+            }
+        });
+    }
+
     // GitHub URL form submit
     const urlForm = document.getElementById('urlForm');
     if (urlForm) {
         urlForm.addEventListener('submit', async function(e) {
             e.preventDefault();
             const url = document.getElementById('githubUrl').value;
+            const quickMode = document.getElementById('quickMode').checked;
             
             try {
                 const response = await fetch('/analyze', {
@@ -65,15 +314,26 @@ document.addEventListener('DOMContentLoaded', function() {
                     headers: {
                         'Content-Type': 'application/json'
                     },
-                    body: JSON.stringify({ url: url })
+                    body: JSON.stringify({ url: url, mode: quickMode ? 'quick' : 'full' })
                 });
                 
                 const data = await response.json();
+                if (data.error) {
+                    throw new Error(data.error);
+                }
                 conversationId = data.conversation_id;
                 
                 // URL input'u gizle
                 document.getElementById('urlInput').style.display = 'none';
                 
+                // URL'i güncelle (sayfa yenilenmeden)
+                window.history.pushState({}, '', `/history/${conversationId}`);
+                
+                // Hızlı rapor hemen döner; tam analizde iş tamamlanana kadar ilerlemeyi göster
+                const result = data.mode === 'quick'
+                    ? data.response
+                    : (job => job.result || job.error)(await waitForJob(data.job_id));
+                
                 // Chat input'u aktif et
                 document.getElementById('userMessage').disabled = false;
                 document.getElementById('chatForm').querySelector('button').disabled = false;
@@ -82,10 +342,10 @@ document.addEventListener('DOMContentLoaded', function() {
                 document.getElementById('chatForm').dataset.conversationId = conversationId;
                 
                 // Analiz sonucunu göster
-                addMessage('assistant', data.response);
-                
-                // URL'i güncelle (sayfa yenilenmeden)
-                window.history.pushState({}, '', `/history/${conversationId}`);
+                addMessage('assistant', result);
+                if (data.mode === 'quick') {
+                    addUpgradeButton(conversationId);
+                }
                 
             } catch (error) {
                 console.error('Error:', error);
@@ -122,15 +382,23 @@ document.addEventListener('DOMContentLoaded', function() {
                     },
                     body: JSON.stringify({
                         message: message,
-                        conversation_id: currentConversationId
+                        conversation_id: currentConversationId,
+                        stream: true
                     })
                 });
                 
-                const data = await response.json();
-                if (data.error) {
-                    throw new Error(data.error);
+                // Hata durumunda sunucu JSON döndürür
+                const contentType = response.headers.get('Content-Type') || '';
+                if (!contentType.startsWith('text/event-stream')) {
+                    const data = await response.json();
+                    if (data.error) {
+                        throw new Error(data.error);
+                    }
+                    addMessage('assistant', data.response);
+                    return;
                 }
-                addMessage('assistant', data.response);
+                
+                await renderStream(response, addStreamingMessage());
                 
             } catch (error) {
                 console.error('Error:', error);
@@ -0,0 +1,63 @@
+import json
+import pytest
+from utils.bulk_runner import BulkAnalyzer, load_finished
+
+class FakeFeedbackSystem:
+    def __init__(self):
+        self.loaded = []
+
+    def load_code_context(self, url):
+        self.loaded.append(url)
+        return {'source': url, 'notebook_data': None}
+
+    def analyze_context(self, code_context):
+        return {'genel_degerlendirme': 'ok'}
+
+    def format_report(self, analysis, code_context):
+        return 'rapor'
+
+def write_lines(path, lines):
+    path.write_bytes(b''.join(lines))
+
+def test_resume_after_partial_line(tmp_path):
+    input_path = tmp_path / 'input.jsonl'
+    output_path = tmp_path / 'output.jsonl'
+    input_path.write_text('\n'.join(json.dumps({'id': item, 'url': f'https://x/{item}.py'})
+                                    for item in 'abc') + '\n')
+
+    done = json.dumps({'id': 'a', 'status': 'done'}).encode() + b'\n'
+    # Çok baytlı 'ş' karakterinin ortasında kesilmiş yarım kayıt
+    partial = json.dumps({'id': 'b', 'status': 'done', 'report': 'ş'}, ensure_ascii=False).encode()[:-3]
+    write_lines(output_path, [done, partial])
+
+    assert load_finished(str(output_path)) == {'a'}
+
+    feedback_system = FakeFeedbackSystem()
+    counts = BulkAnalyzer(feedback_system, concurrency=2).run(str(input_path), str(output_path))
+
+    assert counts == {'done': 2, 'failed': 0, 'skipped': 1}
+    assert sorted(feedback_system.loaded) == ['https://x/b.py', 'https://x/c.py']
+
+    # Yeni kayıtlar yarım satırın devamına yazılmamalı
+    lines = output_path.read_bytes().split(b'\n')
+    assert lines[1] == partial
+    assert load_finished(str(output_path)) == {'a', 'b', 'c'}
+
+def test_failed_items_are_retried_unless_skipped(tmp_path):
+    output_path = tmp_path / 'output.jsonl'
+    write_lines(output_path, [json.dumps({'id': 'a', 'status': 'failed'}).encode() + b'\n',
+                              json.dumps({'id': 'b', 'status': 'failed'}).encode() + b'\n',
+                              json.dumps({'id': 'b', 'status': 'done'}).encode() + b'\n'])
+
+    assert load_finished(str(output_path)) == {'b'}
+    assert load_finished(str(output_path), include_failed=True) == {'a', 'b'}
+
+def test_write_error_fails_the_run(tmp_path):
+    input_path = tmp_path / 'input.jsonl'
+    input_path.write_text(json.dumps('https://x/a.py') + '\n')
+
+    def broken(record, counts):
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        BulkAnalyzer(FakeFeedbackSystem()).run(str(input_path), str(tmp_path / 'out.jsonl'), on_result=broken)
@@ -0,0 +1,58 @@
+import sqlite3
+import time
+from datetime import datetime, timezone
+import pytest
+from database.chat_history import SCHEMA_VERSION, ChatHistory, _text_to_us, to_datetime
+
+@pytest.fixture
+def istanbul(monkeypatch):
+    # Yerel saat UTC'den farklı olmalı ki iki biçim ayırt edilebilsin
+    monkeypatch.setenv('TZ', 'Europe/Istanbul')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+def test_default_current_timestamp_values_are_utc(istanbul):
+    expected = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc).timestamp()
+    assert _text_to_us('2024-01-02 03:04:05') == int(expected) * 1_000_000
+
+def test_values_written_with_datetime_now_are_local(istanbul):
+    local = datetime(2024, 1, 2, 3, 4, 5, 123456)
+    assert _text_to_us('2024-01-02 03:04:05.123456') == int(local.timestamp()) * 1_000_000 + 123456
+    assert to_datetime(_text_to_us(str(local))) == local
+
+def test_timestamps_before_1970_keep_their_microseconds(istanbul):
+    local = datetime(1969, 12, 31, 23, 59, 59, 500000)
+    assert to_datetime(_text_to_us(str(local))) == local
+
+def test_v0_database_is_migrated_once(tmp_path, istanbul):
+    path = str(tmp_path / 'legacy.sqlite')
+    legacy = sqlite3.connect(path)
+    legacy.executescript('''
+        CREATE TABLE conversations (id INTEGER PRIMARY KEY AUTOINCREMENT, github_url TEXT NOT NULL,
+                                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP);
+        CREATE TABLE messages (id INTEGER PRIMARY KEY AUTOINCREMENT, conversation_id INTEGER NOT NULL,
+                               message TEXT NOT NULL, response TEXT NOT NULL,
+                               timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP);
+        INSERT INTO conversations (github_url, created_at) VALUES ('https://x/a.py', '2024-01-02 03:04:05');
+        INSERT INTO messages (conversation_id, message, response, timestamp)
+            VALUES (1, 'Analyze code', 'rapor', '2024-01-02 06:04:06.250000');
+    ''')
+    legacy.commit()
+    legacy.close()
+
+    history = ChatHistory(path)
+    conversation = history.get_conversation_history(1)
+
+    assert conversation['created_at'] == _text_to_us('2024-01-02 03:04:05')
+    assert to_datetime(conversation['messages'][0]['timestamp']) == datetime(2024, 1, 2, 6, 4, 6, 250000)
+    assert conversation['messages'][0]['response_html'] is None
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    assert conn.execute("SELECT typeof(timestamp) FROM messages").fetchone()[0] == 'integer'
+
+    # Yeniden açmak dönüştürülmüş değerlere dokunmaz
+    ChatHistory(path)
+    assert history.get_conversation_history(1)['created_at'] == conversation['created_at']
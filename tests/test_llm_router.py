@@ -0,0 +1,121 @@
+import asyncio
+import time
+import pytest
+from analyzers.llm_router import CircuitBreaker, LLMRouter
+
+def trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    breaker.opened_at = time.monotonic() - breaker.reset_timeout
+
+def failing():
+    raise ConnectionError("a down")
+
+def test_unlaunched_half_open_provider_still_fails_over():
+    router = LLMRouter(['a', 'b'], hedge=False)
+    trip(router.breakers['b'])
+
+    # 'b' yarı açık ama çağrılmıyor; deneme hakkı alınmamalı
+    assert router.call({'a': lambda: 'ok-a', 'b': lambda: 'ok-b'}) == 'ok-a'
+    assert router.breakers['b'].available()
+
+    assert router.call({'a': failing, 'b': lambda: 'ok-b'}) == 'ok-b'
+    assert router.breakers['b'].state == CircuitBreaker.CLOSED
+
+def test_unlaunched_half_open_provider_async():
+    router = LLMRouter(['a', 'b'], hedge=False)
+    trip(router.breakers['b'])
+
+    async def ok(value):
+        return value
+
+    async def fail():
+        raise ConnectionError("a down")
+
+    assert asyncio.run(router.call_async({'a': lambda: ok('ok-a'), 'b': lambda: ok('ok-b')})) == 'ok-a'
+    assert asyncio.run(router.call_async({'a': fail, 'b': lambda: ok('ok-b')})) == 'ok-b'
+    assert router.breakers['b'].state == CircuitBreaker.CLOSED
+
+def test_unlaunched_half_open_provider_stream():
+    router = LLMRouter(['a', 'b'], hedge=False)
+    trip(router.breakers['b'])
+
+    def broken():
+        raise ConnectionError("a down")
+
+    assert list(router.stream({'a': lambda: iter(['x']), 'b': lambda: iter(['y'])})) == ['x']
+    assert list(router.stream({'a': broken, 'b': lambda: iter(['y'])})) == ['y']
+    assert router.breakers['b'].state == CircuitBreaker.CLOSED
+
+def test_cancelled_hedge_releases_trial_slot():
+    router = LLMRouter(['a', 'b'], default_hedge_delay=0.01)
+    trip(router.breakers['b'])
+
+    async def fast_after_hedge():
+        await asyncio.sleep(0.05)
+        return 'ok-a'
+
+    async def slow():
+        await asyncio.sleep(10)
+        return 'ok-b'
+
+    assert asyncio.run(router.call_async({'a': fast_after_hedge, 'b': slow})) == 'ok-a'
+    assert router.breakers['b'].available()
+
+def test_all_breakers_open_still_tries_primary():
+    router = LLMRouter(['a', 'b'], hedge=False)
+    for breaker in router.breakers.values():
+        trip(breaker)
+        breaker.opened_at = time.monotonic()
+    assert router.call({'a': lambda: 'ok-a', 'b': lambda: 'ok-b'}) == 'ok-a'
+    with pytest.raises(ConnectionError):
+        router.call({'a': failing})
+
+def test_cancelled_call_keeps_trial_slot_it_did_not_take():
+    router = LLMRouter(['a', 'b'], default_hedge_delay=0.01)
+    breaker = router.breakers['b']
+
+    async def fast_after_hedge():
+        await asyncio.sleep(0.05)
+        return 'ok-a'
+
+    async def slow():
+        # 'b' kapalıyken başladı; bu sırada devre açılıp deneme hakkını başka bir istek aldı
+        trip(breaker)
+        assert breaker.acquire() == 'trial'
+        await asyncio.sleep(10)
+        return 'ok-b'
+
+    assert asyncio.run(router.call_async({'a': fast_after_hedge, 'b': slow})) == 'ok-a'
+    assert not breaker.available()
+
+def test_hedge_delay_is_per_operation():
+    router = LLMRouter(['a'], default_hedge_delay=5.0, min_samples=3)
+    for _ in range(3):
+        router._record('a', 'chat', 0.2, True)
+        router._record('a', 'reduce', 30.0, True)
+
+    assert router.hedge_delay('a', 'chat') == 0.2
+    assert router.hedge_delay('a', 'reduce') == 30.0
+    assert router.hedge_delay('a', 'summary') == 5.0
+    assert set(router.get_stats()['a']['operations']) == {'chat', 'reduce'}
+
+def test_sync_call_does_not_hedge_to_busy_provider():
+    router = LLMRouter(['a', 'b'], default_hedge_delay=0.01)
+    hedged = []
+
+    def slow_a():
+        time.sleep(0.1)
+        return 'ok-a'
+
+    def record_b():
+        hedged.append('b')
+        return 'ok-b'
+
+    router._in_flight['b'] = 1
+    assert router.call({'a': slow_a, 'b': record_b}) == 'ok-a'
+    assert hedged == []
+
+    router._in_flight['b'] = 0
+    assert router.call({'a': slow_a, 'b': record_b}) == 'ok-b'
+    assert hedged == ['b']
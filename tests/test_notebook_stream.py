@@ -0,0 +1,78 @@
+import json
+import pytest
+from utils.notebook_handler import NotebookHandler
+from utils.notebook_stream import iter_notebook_cells
+
+def notebook(cells, **extra):
+    return {'metadata': {'kernelspec': {'name': 'python3'}}, 'nbformat': 4, 'nbformat_minor': 5,
+            'cells': cells, **extra}
+
+def code_cell(source, outputs=()):
+    return {'cell_type': 'code', 'execution_count': 1, 'metadata': {}, 'source': source,
+            'outputs': list(outputs)}
+
+def test_list_and_string_sources():
+    content = json.dumps(notebook([
+        code_cell(['import os\n', 'print(1)']),
+        code_cell('x = 1'),
+        {'cell_type': 'markdown', 'metadata': {}, 'source': ['# Başlık\n', 'metin']}
+    ]))
+
+    cells = list(iter_notebook_cells(content))
+    assert [cell['source'] for cell in cells] == ['import os\nprint(1)', 'x = 1', '# Başlık\nmetin']
+    assert [cell['cell_type'] for cell in cells] == ['code', 'code', 'markdown']
+
+def test_escapes_in_skipped_and_decoded_values():
+    source = 's = "a \\"quoted\\" \\\\ path"\nt = "\\u00e7 \\n"'
+    image = 'iVBOR\\"}]{[\\\\' * 100
+    content = json.dumps(notebook([code_cell(source, [
+        {'output_type': 'display_data', 'data': {'image/png': image, 'text/plain': ['<Figure>']},
+         'metadata': {'note': 'a "quote" and } brace'}},
+        {'output_type': 'stream', 'name': 'stdout', 'text': ['ok "1"\n', '\\done']}
+    ])], metadata={'title': 'tırnak " ve ters bölü \\'}), ensure_ascii=False)
+
+    [cell] = list(iter_notebook_cells(content))
+    assert cell['source'] == source
+    assert cell['outputs'] == [{'output_type': 'display_data'},
+                               {'output_type': 'stream', 'name': 'stdout', 'text': 'ok "1"\n\\done'}]
+
+def test_outputs_are_bounded():
+    content = json.dumps(notebook([code_cell('print(x)', [
+        {'output_type': 'stream', 'name': 'stdout', 'text': ['a' * 30, 'b' * 30, 'c' * 30]},
+        {'output_type': 'error', 'ename': 'E', 'evalue': 'v', 'traceback': ['first', 'second']}
+    ])]))
+
+    [cell] = list(iter_notebook_cells(content, max_output_chars=40))
+    assert cell['outputs'][0]['text'] == 'a' * 30 + 'b' * 10
+    assert cell['outputs'][1]['traceback'] == ['first']
+
+def test_pre_v4_notebooks_are_rejected():
+    v3 = {'metadata': {}, 'nbformat': 3, 'nbformat_minor': 0,
+          'worksheets': [{'cells': [{'cell_type': 'code', 'input': 'x = 1', 'outputs': []}]}]}
+    with pytest.raises(ValueError):
+        list(iter_notebook_cells(json.dumps(v3)))
+    with pytest.raises(ValueError):
+        list(iter_notebook_cells(json.dumps({'nbformat': 3, 'cells': []})))
+
+    # NotebookHandler eski sürümleri nbformat ile dönüştürerek okur
+    assert NotebookHandler().extract_notebook_code(json.dumps(v3))['code'] == 'x = 1'
+
+def test_malformed_notebook_raises_value_error():
+    content = json.dumps(notebook([code_cell('x = 1')]))
+    with pytest.raises(ValueError):
+        list(iter_notebook_cells(content[:len(content) // 2]))
+
+def test_handler_matches_full_parse():
+    content = json.dumps(notebook([
+        {'cell_type': 'markdown', 'metadata': {}, 'source': '# Veri'},
+        code_cell(['import pandas as pd\n', 'df = pd.read_csv("x.csv")'], [
+            {'output_type': 'error', 'ename': 'FileNotFoundError', 'evalue': 'x.csv',
+             'traceback': ['FileNotFoundError: x.csv', 'frame']}
+        ])
+    ]))
+
+    result = NotebookHandler().extract_notebook_code(content)
+    assert result['code'] == 'import pandas as pd\ndf = pd.read_csv("x.csv")'
+    assert result['has_errors']
+    assert result['code_cells'][0]['outputs'] == [{'type': 'error', 'content': 'FileNotFoundError: x.csv'}]
+    assert result['code_cells'][0]['section'] == 'Veri'
@@ -0,0 +1,92 @@
+import pytest
+from database.chat_history import ChatHistory
+from database.connection import get_connection
+
+@pytest.fixture
+def history(tmp_path):
+    return ChatHistory(str(tmp_path / 'history.sqlite'))
+
+def add_conversations(history, created_at):
+    conn = get_connection(history.db_path)
+    with conn:
+        conn.executemany("INSERT INTO conversations (github_url, created_at) VALUES (?, ?)",
+                         [(f'https://x/{i}.py', value) for i, value in enumerate(created_at)])
+
+def walk(fetch, key):
+    pages, cursor = [], None
+    while True:
+        page = fetch(cursor)
+        pages.append([item['id'] for item in page[key]])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return pages
+
+def test_sidebar_pages_break_ties_by_id(history):
+    # Aynı zaman damgalı kayıtlar sayfa sınırında atlanmamalı veya tekrarlanmamalı
+    add_conversations(history, [100, 200, 200, 200, 200, 300, 300])
+
+    pages = walk(lambda cursor: history.get_conversations_page(2, cursor), 'conversations')
+    assert pages == [[7, 6], [5, 4], [3, 2], [1]]
+
+def test_exact_multiple_has_no_empty_last_page(history):
+    add_conversations(history, [1, 2, 3, 4])
+    assert walk(lambda cursor: history.get_conversations_page(2, cursor), 'conversations') == [[4, 3], [2, 1]]
+
+def test_new_rows_do_not_shift_later_pages(history):
+    add_conversations(history, [1, 2, 3, 4, 5])
+    first = history.get_conversations_page(2)
+    add_conversations(history, [6, 7])
+
+    second = history.get_conversations_page(2, first['next_cursor'])
+    assert [item['id'] for item in second['conversations']] == [3, 2]
+
+def test_invalid_cursor_is_rejected(history):
+    for cursor in ('abc', '12', '1|x', '|'):
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            history.get_conversations_page(2, cursor)
+
+def test_sidebar_query_uses_the_index(history):
+    plan = ' '.join(row[-1] for row in get_connection(history.db_path).execute(
+        """EXPLAIN QUERY PLAN SELECT id, github_url, created_at FROM conversations
+           WHERE (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC LIMIT ?""", (1, 1, 3)))
+    assert 'idx_conversations_created_at' in plan
+    assert 'TEMP B-TREE' not in plan
+
+def test_message_pages_walk_back_oldest_first(history):
+    conversation_id = history.start_conversation('https://x/a.py')
+    conn = get_connection(history.db_path)
+    with conn:
+        conn.executemany("""INSERT INTO messages (conversation_id, message, response, timestamp)
+                           VALUES (?, ?, '', ?)""",
+                         [(conversation_id, f'm{i}', value) for i, value in enumerate([10, 20, 20, 20, 30])])
+
+    pages = walk(lambda cursor: history.get_messages_page(conversation_id, 2, cursor), 'messages')
+    assert pages == [[4, 5], [2, 3], [1]]
+
+    latest = history.get_conversation_history(conversation_id, limit=2)
+    assert [msg['id'] for msg in latest['messages']] == [4, 5]
+    assert latest['next_cursor'] == '20|4'
+
+def test_page_size_is_clamped(tmp_path):
+    from app import create_app
+    app = create_app({
+        'OPENAI_API_KEY': 'x',
+        'DATABASE': str(tmp_path / 'history.sqlite'),
+        'ANALYSIS_CACHE': str(tmp_path / 'cache.sqlite'),
+        'RATE_LIMITS': str(tmp_path / 'limits.sqlite')
+    })
+    history = ChatHistory(app.config['DATABASE'])
+    conversation_id = history.start_conversation('https://x/a.py')
+    history.start_conversation('https://x/b.py')
+    history.add_message(conversation_id, 'a', 'b')
+    history.add_message(conversation_id, 'c', 'd')
+
+    client = app.test_client()
+    for limit in (0, -5):
+        response = client.get(f'/api/conversations?limit={limit}')
+        assert response.status_code == 200
+        assert len(response.get_json()['conversations']) == 1
+
+        response = client.get(f'/api/conversations/{conversation_id}/messages?limit={limit}')
+        assert response.status_code == 200
+        assert len(response.get_json()['messages']) == 1
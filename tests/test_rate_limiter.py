@@ -0,0 +1,99 @@
+import threading
+import pytest
+from database import rate_limiter as rate_limiter_module
+from database.rate_limiter import RateLimiter, RateLimitTimeout
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter_module.time, 'time', clock)
+    return clock
+
+def limiter(tmp_path, **limits):
+    return RateLimiter(str(tmp_path / 'limits.sqlite'), limits={'openai': limits}, max_wait=5)
+
+def test_bucket_empties_and_refills(tmp_path, clock):
+    limits = limiter(tmp_path, requests=60)
+    buckets = limits._buckets('openai', 0)
+
+    for _ in range(60):
+        assert limits._try_take(buckets) == 0
+    assert limits._try_take(buckets) == pytest.approx(1.0)
+
+    # Dakikada 60 istek: saniyede bir istek dolar
+    clock.now += 2.5
+    assert limits._try_take(buckets) == 0
+    assert limits._try_take(buckets) == 0
+    assert limits._try_take(buckets) == pytest.approx(0.5)
+
+def test_refill_is_capped_at_the_limit(tmp_path, clock):
+    limits = limiter(tmp_path, requests=6)
+    buckets = limits._buckets('openai', 0)
+    assert limits._try_take(buckets) == 0
+
+    clock.now += 3600
+    for _ in range(6):
+        assert limits._try_take(buckets) == 0
+    assert limits._try_take(buckets) > 0
+
+def test_buckets_are_taken_together(tmp_path, clock):
+    limits = limiter(tmp_path, requests=60, tokens=1000)
+
+    assert limits._try_take(limits._buckets('openai', 900)) == 0
+    # Token kovası yetmiyorsa istek kovasından da düşülmez
+    assert limits._try_take(limits._buckets('openai', 300)) == pytest.approx(200 / (1000 / 60))
+    assert limits.get_stats()['buckets']['openai:requests']['available'] == 59
+
+    # Kotadan büyük istek kova dolunca geçer
+    clock.now += 60
+    assert limits._try_take(limits._buckets('openai', 5000)) == 0
+
+@pytest.mark.parametrize('round', range(5))
+def test_concurrent_takers_never_overdraw(tmp_path, clock, round):
+    limits = limiter(tmp_path, requests=20)
+    buckets = limits._buckets('openai', 0)
+    start = threading.Barrier(40)
+    granted = []
+    errors = []
+
+    def take():
+        # Her iş parçacığının kendi SQLite bağlantısı var; BEGIN IMMEDIATE okuma-yazmayı sıraya koyar
+        start.wait()
+        try:
+            granted.append(limits._try_take(buckets) == 0)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=take) for _ in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert granted.count(True) == 20
+
+def test_pause_and_settle(tmp_path, clock):
+    limits = limiter(tmp_path, requests=60, tokens=1000)
+
+    limits.pause('openai', 3)
+    assert limits._try_take(limits._buckets('openai', 0)) == pytest.approx(3.0)
+
+    clock.now += 3
+    assert limits._try_take(limits._buckets('openai', 500)) == 0
+    # Tahmin 500, gerçek kullanım 100: fark kovaya geri döner
+    limits.settle('openai', 500, 100)
+    assert limits.get_stats()['buckets']['openai:tokens']['available'] == 900
+
+def test_wait_beyond_max_wait_raises(tmp_path, clock):
+    limits = limiter(tmp_path, requests=60)
+    limits.pause('openai', 30)
+    with pytest.raises(RateLimitTimeout):
+        limits.acquire('openai')
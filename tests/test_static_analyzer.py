@@ -0,0 +1,94 @@
+from analyzers.code_analyzer import CodeAnalyzer
+from analyzers.code_chunker import CodeChunker
+from analyzers.static_analyzer import StaticAnalyzer
+
+SOURCE = '''"""Mod."""
+import os
+from json import loads
+API_KEY = "abc123"
+
+class Store(dict):
+    def get_item(self, key):
+        if key in self:
+            for a in self:
+                for b in self:
+                    pass
+        return self[key]
+
+def process(items):
+    try:
+        eval(items)
+    except:
+        pass
+
+%matplotlib inline
+'''
+
+def test_metrics_and_findings():
+    metrics = StaticAnalyzer().analyze(SOURCE)
+
+    assert metrics['syntax_error'] is None
+    assert metrics['imports'] == ['json', 'os']
+    assert metrics['docstring'] == 'Mod.'
+    assert [f['name'] for f in metrics['functions']] == ['Store.get_item', 'process']
+    assert metrics['functions'][0]['complexity'] == 4
+    assert metrics['max_nesting'] == 3
+    assert metrics['nested_loops'] == 1
+    assert [(f['category'], f['line']) for f in metrics['findings']] == [
+        ('security', 4), ('security', 16), ('quality', 17)
+    ]
+
+def test_syntax_error_is_reported_not_raised():
+    metrics = StaticAnalyzer().analyze('def broken(:\n    pass')
+    assert metrics['syntax_error']
+    assert 'syntax error' in StaticAnalyzer.summary(metrics)
+
+def test_summary_leaves_out_per_function_metrics():
+    summary = StaticAnalyzer.summary(StaticAnalyzer().analyze(SOURCE))
+    assert 'imports: json, os' in summary
+    assert 'eval()' in summary
+    assert 'process' not in summary
+
+def test_digest_excludes_units_sent_as_code():
+    metrics = StaticAnalyzer().analyze(SOURCE)
+
+    digest = StaticAnalyzer.digest(metrics)
+    assert 'class Store(dict) line 6: get_item' in digest
+    assert '- Store.get_item (line 7)' in digest
+
+    digest = StaticAnalyzer.digest(metrics, exclude={'Store'})
+    assert 'Store' not in digest
+    assert '- process (line 14)' in digest
+
+def test_digest_caps_function_list():
+    code = '\n'.join(f'def f{i}(x):\n    return x' for i in range(5))
+    digest = StaticAnalyzer.digest(StaticAnalyzer().analyze(code), max_functions=2)
+    assert '- ... +3 more' in digest
+
+def test_chunker_splits_on_definitions_and_keeps_comments():
+    code = '\n'.join(f'# f{i}\ndef f{i}(x):\n    return x + {i}\n' for i in range(20))
+    chunker = CodeChunker(token_budget=40)
+
+    units = chunker.split_python(code)
+    assert [unit['name'] for unit in units] == [f'f{i}' for i in range(20)]
+    assert units[1]['source'].lstrip('\n').startswith('# f1')
+
+    chunks = chunker.chunk(code)
+    assert len(chunks) > 1
+    assert '\n\n'.join(chunk['source'] for chunk in chunks).count('def ') == 20
+
+def test_each_chunk_gets_only_its_own_summary():
+    analyzer = CodeAnalyzer({'OPENAI_API_KEY': 'x'})
+    analyzer.chunker = CodeChunker(token_budget=40)
+    code = '\n'.join(f'import mod{i}\ndef f{i}(x):\n    return x + {i}\n' for i in range(10))
+
+    digest, chunks = analyzer._prepare_analysis(code, None)
+    assert digest is None
+    assert len(chunks) > 1
+    for chunk in chunks:
+        imported = {line.split()[1] for line in chunk['source'].splitlines() if line.startswith('import ')}
+        assert f"imports: {', '.join(sorted(imported))}" in chunk['digest']
+        assert 'functions (name' not in chunk['digest']
+
+    digest, chunks = analyzer._prepare_analysis('x = 1\n', None)
+    assert len(chunks) == 1 and digest.startswith('lines: 2')
@@ -0,0 +1,69 @@
+from analyzers.code_analyzer import CodeAnalyzer
+from analyzers.unit_diff import diff_units, split_units
+
+OLD = '''import os
+
+def load(path):
+    return open(path).read()
+
+def save(path, data):
+    open(path, 'w').write(data)
+
+def helper():
+    return 1
+
+def extra():
+    return 2
+'''
+
+def names(units):
+    return [unit['name'] for unit in units]
+
+def test_unchanged_file_has_no_changes():
+    units = split_units(OLD)
+    diff = diff_units(units, split_units(OLD.replace('\n\n', '\n\n\n') + '   \n'))
+    assert diff == {'changed': [], 'removed': [], 'total': len(units)}
+
+def test_moved_functions_are_not_changes():
+    moved = OLD.replace("def helper():\n    return 1\n\n", '') + "\ndef helper():\n    return 1\n"
+    assert diff_units(split_units(OLD), split_units(moved))['changed'] == []
+
+def test_changed_added_and_removed_units():
+    new = (OLD.replace("return open(path).read()", "with open(path) as f:\n        return f.read()")
+              .replace("def extra():\n    return 2\n", "def added():\n    return 3\n"))
+
+    diff = diff_units(split_units(OLD), split_units(new))
+    assert names(diff['changed']) == ['load', 'added']
+    # 'load' değişti (kaldırılmadı); 'extra' kaldırıldı
+    assert diff['removed'] == ['extra']
+    assert diff['total'] == 5
+
+def test_notebook_units_are_cells():
+    notebook = {'code_cells': [{'code': 'import pandas', 'section': 'Giriş'},
+                               {'code': 'df = 1', 'section': 'Veri'}]}
+    assert names(split_units('', notebook)) == ['Giriş / hücre 1', 'Veri / hücre 2']
+
+    reordered = {'code_cells': list(reversed(notebook['code_cells']))}
+    assert diff_units(split_units('', notebook), split_units('', reordered))['changed'] == []
+
+def test_update_prompt_sends_only_changed_units():
+    analyzer = CodeAnalyzer({'OPENAI_API_KEY': 'x'})
+    previous = {'source': OLD, 'notebook_data': None, 'analysis': {'proje_amaci': 'eski'}}
+
+    result, prompt = analyzer._plan_update(OLD, None, previous)
+    assert result == {'proje_amaci': 'eski'} and prompt is None
+
+    new = OLD.replace("return 1", "return 10")
+    result, prompt = analyzer._plan_update(new, None, previous)
+    assert result is None
+    assert 'def helper():\n    return 10' in prompt['user']
+    # Değişmeyen birimlerin gövdesi yerine statik özet gönderilir
+    assert 'def load' not in prompt['user']
+    assert '- load (line 3)' in prompt['user']
+    assert '- helper' not in prompt['user']
+
+def test_mostly_changed_file_falls_back_to_full_analysis():
+    analyzer = CodeAnalyzer({'OPENAI_API_KEY': 'x'})
+    previous = {'source': OLD, 'notebook_data': None, 'analysis': {}}
+    rewritten = OLD.replace('return', 'return None or').replace('open(', 'io.open(')
+    assert analyzer._plan_update(rewritten, None, previous) == (None, None)
@@ -0,0 +1,36 @@
+import asyncio
+import threading
+
+class AsyncRuntime:
+    def __init__(self, name='async-runtime'):
+        """One long-lived event loop per worker process, running in a daemon thread.
+
+        Async LLM and HTTP clients keep their connection pools on this loop, so every request
+        handled by the worker shares them; Flask's per-request loops only wait for the result.
+        """
+        self.name = name
+        self.loop = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self.loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name=self.name, daemon=True).start()
+                self.loop = loop
+        return self.loop
+
+    def submit(self, coro):
+        """Schedule a coroutine on the shared loop and return a concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_started())
+
+    async def run(self, coro):
+        """Await a coroutine on the shared loop from another event loop (e.g. an async Flask view)"""
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def run_sync(self, coro, timeout=None):
+        """Block the calling thread until a coroutine finishes on the shared loop"""
+        return self.submit(coro).result(timeout)
+
+# Süreç başına tek döngü; gunicorn fork sonrası ilk kullanımda başlatılır
+default_runtime = AsyncRuntime()
@@ -0,0 +1,121 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import ANALYSIS_TEMPLATE, BULK_CONCURRENCY
+
+def read_items(path):
+    """Yield {'id', 'url'} items from a JSONL file of URLs or {"url": ..., "id": ...} objects"""
+    with open(path, encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+
+            record = json.loads(line)
+            if isinstance(record, str):
+                record = {'url': record}
+            url = record.get('url') or record.get('github_url')
+            if not url:
+                raise ValueError(f"{path}:{line_no}: 'url' alanı eksik")
+            yield {'id': str(record.get('id', url)), 'url': url}
+
+def load_finished(path, include_failed=False):
+    """Return IDs already recorded in an output file; the last record of an ID wins"""
+    statuses = {}
+    if not os.path.exists(path):
+        return set()
+
+    # İkili okunur: yarım kalan satır çok baytlı bir karakterin ortasında kesilmiş olabilir
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                # Kesintiye uğramış yarım satır: bu öğe tekrar işlenir
+                continue
+            statuses[record['id']] = record['status']
+
+    return {item_id for item_id, status in statuses.items()
+            if status == 'done' or include_failed}
+
+class BulkAnalyzer:
+    def __init__(self, feedback_system, concurrency=BULK_CONCURRENCY, retry_failed=True):
+        """Analyze many GitHub URLs offline with bounded concurrency"""
+        self.feedback_system = feedback_system
+        self.concurrency = concurrency
+        self.retry_failed = retry_failed
+
+    def analyze_item(self, item):
+        """Fetch and analyze one URL and return its output record"""
+        started = time.perf_counter()
+        record = {'id': item['id'], 'url': item['url']}
+
+        try:
+            code_context = self.feedback_system.load_code_context(item['url'])
+            analysis = self.feedback_system.analyze_context(code_context)
+            if analysis == ANALYSIS_TEMPLATE:
+                record.update(status='failed', error="Yapay zeka servisi analiz üretemedi")
+            else:
+                record.update(status='done', analysis=analysis,
+                              report=self.feedback_system.format_report(analysis, code_context))
+                if code_context.get('coverage'):
+                    record['coverage'] = code_context['coverage']
+        except Exception as e:
+            record.update(status='failed', error=str(e))
+
+        record['elapsed'] = round(time.perf_counter() - started, 3)
+        return record
+
+    def run(self, input_path, output_path, on_result=None):
+        """Analyze every pending item of input_path, appending records to output_path as they finish"""
+        finished = load_finished(output_path, include_failed=not self.retry_failed)
+        counts = {'done': 0, 'failed': 0, 'skipped': 0}
+        lock = threading.Lock()
+        # Aynı anda bellekte tutulan iş sayısını sınırla
+        slots = threading.BoundedSemaphore(self.concurrency * 2)
+
+        # Önceki çalışma yarım satır bıraktıysa yeni kayıt onun devamına yazılmasın
+        needs_newline = False
+        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+            with open(output_path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b'\n'
+
+        with open(output_path, 'a', encoding='utf-8') as out:
+            if needs_newline:
+                out.write('\n')
+
+            def write(record):
+                with lock:
+                    out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    out.flush()
+                    os.fsync(out.fileno())
+                    counts[record['status']] += 1
+                    if on_result:
+                        on_result(record, counts)
+
+            def process(item):
+                try:
+                    write(self.analyze_item(item))
+                finally:
+                    slots.release()
+
+            seen = set()
+            futures = []
+            with ThreadPoolExecutor(max_workers=self.concurrency,
+                                    thread_name_prefix='bulk') as executor:
+                for item in read_items(input_path):
+                    if item['id'] in finished or item['id'] in seen:
+                        counts['skipped'] += 1
+                        continue
+                    seen.add(item['id'])
+                    slots.acquire()
+                    futures.append(executor.submit(process, item))
+
+            # Yazılamayan kayıt (ör. disk dolu) ne done ne failed sayılır; çalışma hata ile bitmeli
+            for future in futures:
+                future.result()
+
+        return counts
@@ -1,28 +1,147 @@
+import asyncio
+import httpx
 import requests
 import re
+import json
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import (
+    GITHUB_RAW_BASE_URL,
+    GITHUB_API_BASE_URL,
+    GITHUB_TOKEN,
+    REPO_MAX_FILES,
+    REPO_FETCH_CONCURRENCY
+)
+from utils.http_fetcher import default_fetcher
+from utils.metrics import GITHUB_FETCH_SECONDS
 
 class GitHubHandler:
+    SUPPORTED_EXTENSIONS = ('.py', '.ipynb')
+
+    def __init__(self, fetcher=None, raw_base_url=GITHUB_RAW_BASE_URL,
+                 api_base_url=GITHUB_API_BASE_URL, token=GITHUB_TOKEN):
+        """Initialize with a shared fetcher; base URLs can point to a local stub server"""
+        self.fetcher = fetcher or default_fetcher
+        self.raw_base_url = raw_base_url.rstrip('/')
+        self.api_base_url = api_base_url.rstrip('/')
+        self.token = token
+
     @staticmethod
-    def get_raw_github_url(github_url):
+    def get_raw_github_url(github_url, raw_base_url=GITHUB_RAW_BASE_URL):
         """Normal GitHub URL'sini raw içerik URL'sine dönüştürür"""
         pattern = r'https://github\.com/([^/]+)/([^/]+)/blob/([^/]+)/(.+)'
         match = re.match(pattern, github_url)
-        
+
         if not match:
             raise ValueError("Geçersiz GitHub URL'si")
-            
+
         user, repo, branch, path = match.groups()
-        raw_url = f'https://raw.githubusercontent.com/{user}/{repo}/{branch}/{path}'
+        raw_url = f'{raw_base_url.rstrip("/")}/{user}/{repo}/{branch}/{path}'
         return raw_url
 
     @staticmethod
-    def get_file_content(url):
+    def get_repo_path(github_url):
+        """Dosyayı daldan/commit'ten bağımsız tanımlayan 'kullanıcı/depo/yol' anahtarını döndürür"""
+        match = re.match(r'https://github\.com/([^/]+)/([^/]+)/blob/[^/]+/(.+)', github_url)
+        if not match:
+            return None
+        user, repo, path = match.groups()
+        return f'{user}/{repo}/{path}'
+
+    @staticmethod
+    def parse_repository_url(github_url):
+        """Depo veya dizin URL'sini (kullanıcı, depo, dal, yol) olarak ayrıştırır"""
+        pattern = r'https://github\.com/([^/]+)/([^/]+?)(?:\.git)?(?:/tree/([^/]+)(?:/(.*))?)?/?$'
+        match = re.match(pattern, github_url)
+
+        if not match:
+            raise ValueError("Geçersiz GitHub depo URL'si")
+
+        user, repo, branch, path = match.groups()
+        return user, repo, branch, (path or '').strip('/')
+
+    @staticmethod
+    def is_repository_url(github_url):
+        """Check whether the URL points to a whole repository or a directory"""
+        try:
+            GitHubHandler.parse_repository_url(github_url)
+            return True
+        except ValueError:
+            return False
+
+    def get_file_content(self, url):
         """GitHub URL'inden dosya içeriğini alır"""
         try:
-            raw_url = GitHubHandler.get_raw_github_url(url)
-            response = requests.get(raw_url)
-            response.raise_for_status()
-            return response.text
-                
+            raw_url = self.get_raw_github_url(url, self.raw_base_url)
+            with GITHUB_FETCH_SECONDS.time(kind='file'):
+                return self.fetcher.get(raw_url)
+
         except requests.exceptions.RequestException as e:
-            raise Exception(f"Dosya alınırken hata oluştu: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Dosya alınırken hata oluştu: {str(e)}")
+
+    async def get_file_content_async(self, url):
+        """Async version of get_file_content"""
+        try:
+            raw_url = self.get_raw_github_url(url, self.raw_base_url)
+            with GITHUB_FETCH_SECONDS.time(kind='file'):
+                return await self.fetcher.get_async(raw_url)
+
+        except (requests.exceptions.RequestException, httpx.HTTPError) as e:
+            raise Exception(f"Dosya alınırken hata oluştu: {str(e)}")
+
+    def _get_api_json(self, path):
+        headers = {'Accept': 'application/vnd.github+json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        with GITHUB_FETCH_SECONDS.time(kind='api'):
+            return json.loads(self.fetcher.get(f'{self.api_base_url}{path}', headers=headers))
+
+    def list_repository_files(self, github_url, max_files=REPO_MAX_FILES):
+        """Depo veya dizindeki .py ve .ipynb dosyalarının blob URL'lerini listeler.
+
+        Returns {'urls', 'total_files', 'tree_truncated'}: the first max_files URLs, the number of
+        supported files found, and whether GitHub cut the recursive tree short (very large repositories).
+        """
+        try:
+            user, repo, branch, path = self.parse_repository_url(github_url)
+
+            if not branch:
+                branch = self._get_api_json(f'/repos/{user}/{repo}')['default_branch']
+
+            tree = self._get_api_json(f'/repos/{user}/{repo}/git/trees/{branch}?recursive=1')
+
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Depo içeriği alınırken hata oluştu: {str(e)}")
+
+        prefix = f'{path}/' if path else ''
+        files = sorted(
+            item['path'] for item in tree.get('tree', [])
+            if item.get('type') == 'blob'
+            and item['path'].startswith(prefix)
+            and item['path'].endswith(self.SUPPORTED_EXTENSIONS)
+        )
+
+        if not files:
+            raise ValueError("Bu konumda analiz edilecek .py veya .ipynb dosyası bulunamadı")
+
+        return {
+            'urls': [f'https://github.com/{user}/{repo}/blob/{branch}/{file_path}'
+                     for file_path in files[:max_files]],
+            'total_files': len(files),
+            # Ağaç kısaltıldıysa bazı dosyalar hiç listelenmemiştir
+            'tree_truncated': bool(tree.get('truncated'))
+        }
+
+    def get_files_content(self, urls, max_workers=REPO_FETCH_CONCURRENCY):
+        """Birden fazla dosyayı sınırlı eşzamanlılıkla indirir; sırayı korur"""
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self.get_file_content, urls))
+
+    async def get_files_content_async(self, urls, max_workers=REPO_FETCH_CONCURRENCY):
+        """Async version of get_files_content"""
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def fetch(url):
+            async with semaphore:
+                return await self.get_file_content_async(url)
+
+        return await asyncio.gather(*(fetch(url) for url in urls))
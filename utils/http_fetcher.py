@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import weakref
+from collections import OrderedDict
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from config.settings import HTTP_TIMEOUT, HTTP_POOL_SIZE, FETCH_CACHE_MAX_BYTES
+
+class CachedFetcher:
+    def __init__(self, timeout=HTTP_TIMEOUT, pool_size=HTTP_POOL_SIZE,
+                 max_cache_bytes=FETCH_CACHE_MAX_BYTES):
+        """Initialize a keep-alive session pool and a byte-bounded LRU of response bodies"""
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.max_cache_bytes = max_cache_bytes
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._async_clients = weakref.WeakKeyDictionary()
+
+        # url -> {'text', 'etag', 'last_modified', 'size'}
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'not_modified': 0, 'downloaded': 0}
+
+    def get(self, url, headers=None):
+        """Fetch url as text, revalidating cached bodies with conditional requests"""
+        entry, headers = self._conditional_headers(url, headers)
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        return self._handle_response(url, entry, response)
+
+    async def get_async(self, url, headers=None):
+        """Async version of get; shares the body cache with the blocking session"""
+        entry, headers = self._conditional_headers(url, headers)
+        response = await self._async_client().get(url, headers=headers)
+        return self._handle_response(url, entry, response)
+
+    def _async_client(self):
+        # httpx bağlantıları oluşturuldukları döngüye bağlıdır; her döngünün kendi havuzu olur
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            # Havuz dolduğunda istekler zaman aşımına uğramadan sırada bekler
+            client = self._async_clients[loop] = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, pool=None),
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            )
+        return client
+
+    def _conditional_headers(self, url, headers):
+        entry = self._cache_get(url)
+
+        headers = dict(headers or {})
+        if entry:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        return entry, headers
+
+    def _handle_response(self, url, entry, response):
+        """Serve a 304 from the cache or store a fresh body; works for requests and httpx responses"""
+        self._count('requests')
+
+        if response.status_code == 304 and entry:
+            self._count('not_modified')
+            return entry['text']
+
+        response.raise_for_status()
+        self._count('downloaded')
+
+        text = response.text
+        self._cache_put(url, {
+            'text': text,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'size': len(response.content)
+        })
+        return text
+
+    def _cache_get(self, url):
+        with self._lock:
+            entry = self._cache.get(url)
+            if entry:
+                self._cache.move_to_end(url)
+            return entry
+
+    def _cache_put(self, url, entry):
+        # Doğrulayıcı başlığı olmayan yanıtlar yeniden kullanılamaz
+        if not (entry['etag'] or entry['last_modified']):
+            return
+        if entry['size'] > self.max_cache_bytes:
+            return
+
+        with self._lock:
+            old = self._cache.pop(url, None)
+            if old:
+                self._cache_bytes -= old['size']
+
+            self._cache[url] = entry
+            self._cache_bytes += entry['size']
+
+            while self._cache_bytes > self.max_cache_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= evicted['size']
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def get_stats(self):
+        """Get request counters and cache usage"""
+        with self._lock:
+            return dict(self.stats,
+                        cached_entries=len(self._cache),
+                        cached_bytes=self._cache_bytes,
+                        max_cache_bytes=self.max_cache_bytes)
+
+    def clear(self):
+        """Drop all cached bodies"""
+        with self._lock:
+            self._cache.clear()
+            self._cache_bytes = 0
+
+# Aynı süreçteki tüm GitHubHandler örnekleri bağlantı havuzunu paylaşır
+default_fetcher = CachedFetcher()
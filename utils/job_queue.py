@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import ANALYSIS_WORKERS, ANALYSIS_MAX_PENDING, ANALYSIS_TEMPLATE
+from utils.async_runtime import default_runtime
+
+class QueueFullError(Exception):
+    """Raised when the analysis queue cannot accept more jobs"""
+
+class AnalysisJobQueue:
+    def __init__(self, feedback_system, chat_history, job_store,
+                 max_workers=ANALYSIS_WORKERS, max_pending=ANALYSIS_MAX_PENDING, runtime=None):
+        """Initialize a bounded background queue; analyses run as coroutines on the worker's event loop"""
+        self.feedback_system = feedback_system
+        self.chat_history = chat_history
+        self.job_store = job_store
+        self.max_pending = max_pending
+        self.runtime = runtime or default_runtime
+        self._pending = 0
+        self._futures = set()
+        self._lock = threading.Lock()
+        # Bekleyen LLM çağrısı bir iş parçacığı tutmaz; sınır sadece aynı anda çalışan analiz sayısıdır
+        self._slots = asyncio.Semaphore(max_workers)
+        # İş durumu yazımları döngü dışında ve sırayla yapılır; geç gelen bir aşama 'done'un üstüne yazılmaz
+        self._status_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='job-status')
+
+    def submit(self, conversation_id, github_url, code_context=None):
+        """Queue an analysis for a conversation and return the job ID; a given code context is not re-fetched"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFullError("Analiz kuyruğu dolu, lütfen daha sonra tekrar deneyin")
+            self._pending += 1
+
+        job_id = self.job_store.create_job(conversation_id)
+        try:
+            future = self.runtime.submit(self._run(job_id, conversation_id, github_url, code_context))
+        except Exception:
+            self._release()
+            raise
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._finished)
+        return job_id
+
+    def _finished(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    def _write_status(self, job_id, **fields):
+        """Queue a job status write on the status thread and return its future"""
+        return self._status_writer.submit(self.job_store.update_job, job_id, **fields)
+
+    async def _update_job(self, job_id, **fields):
+        await asyncio.wrap_future(self._write_status(job_id, **fields))
+
+    async def _run(self, job_id, conversation_id, github_url, code_context=None):
+        """Run the fetch + LLM + format pipeline and record stage progress"""
+        def progress(stage):
+            # Aşama bilgisi beklenmez; sıradaki son durum yazımı bundan sonra çalışır
+            self._write_status(job_id, status='running', stage=stage)
+
+        try:
+            async with self._slots:
+                await self._analyze(job_id, conversation_id, github_url, code_context, progress)
+        except Exception as e:
+            print(f"Analysis job error: {str(e)}")
+            await self._update_job(job_id, status='failed', stage='done', error=str(e))
+        finally:
+            self._release()
+
+    async def _analyze(self, job_id, conversation_id, github_url, code_context, progress):
+        repo_path = self.feedback_system.github_handler.get_repo_path(github_url)
+        if code_context is None:
+            try:
+                code_context = await self.feedback_system.load_code_context_async(github_url, progress)
+            except Exception as e:
+                response = f"Error occurred: {str(e)}"
+                await asyncio.to_thread(self.chat_history.add_message, conversation_id, "Analyze code", response)
+                await self._update_job(job_id, status='failed', stage='done',
+                                       result=response, error=str(e))
+                return
+
+            # Bağlam sıkıştırılarak yazılır; büyük dosyalarda döngüyü bekletmesin
+            await asyncio.to_thread(self.chat_history.save_code_context, conversation_id,
+                                    code_context['source'], code_context['notebook_data'], repo_path)
+
+        # Aynı dosyanın başka bir commit'te analiz edilmiş hali varsa sadece farklar analiz edilir
+        previous = None
+        if repo_path:
+            previous = await asyncio.to_thread(self.chat_history.find_previous_analysis,
+                                               repo_path, conversation_id)
+        analysis, response = await self.feedback_system.analyze_async(github_url, code_context,
+                                                                      progress, previous)
+
+        if analysis is not None and analysis != ANALYSIS_TEMPLATE:
+            await asyncio.to_thread(self.chat_history.save_analysis, conversation_id, analysis)
+        # Yanıt markdown'dan HTML'e render edilerek yazılır; büyük raporlarda döngüyü bekletmesin
+        await asyncio.to_thread(self.chat_history.add_message, conversation_id, "Analyze code", response)
+        await self._update_job(job_id, status='done', stage='done', result=response)
+
+    def shutdown(self, wait=True):
+        """Optionally wait for queued and running jobs"""
+        if wait:
+            with self._lock:
+                futures = list(self._futures)
+            concurrent.futures.wait(futures)
+        self._status_writer.shutdown(wait=wait)
@@ -0,0 +1,165 @@
+import bisect
+import functools
+import threading
+import time
+
+# Saniye cinsinden; GitHub/SQLite milisaniyeler, LLM çağrıları onlarca saniye sürebilir
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} etiketleri: {', '.join(self.labelnames)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._samples(list(zip(self.labelnames, key)), value))
+        return lines
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self, pairs, value):
+        return [f"{self.name}{_format_labels(pairs)} {_format_value(value)}"]
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        self._observe(self._key(labels), value)
+
+    def _observe(self, key, value):
+        # Gözlem başına tek kova artırılır; kümülatif değerler sadece /metrics okunurken hesaplanır
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, **labels):
+        """Observe the duration of a with block, including blocks that raise"""
+        return _Timer(self, self._key(labels))
+
+    def _samples(self, pairs, state):
+        counts, total, count = state
+        samples = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += bucket_count
+            samples.append(f"{self.name}_bucket{_format_labels(pairs + [('le', _format_value(bound))])} {cumulative}")
+        samples.append(f"{self.name}_sum{_format_labels(pairs)} {_format_value(total)}")
+        samples.append(f"{self.name}_count{_format_labels(pairs)} {count}")
+        return samples
+
+class _Timer:
+    __slots__ = ('histogram', 'key', 'started')
+
+    def __init__(self, histogram, key):
+        self.histogram = histogram
+        self.key = key
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.histogram._observe(self.key, time.perf_counter() - self.started)
+
+class MetricsRegistry:
+    def __init__(self):
+        """In-process metrics rendered in the Prometheus text format; each worker exposes its own"""
+        self._metrics = []
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+def timed(histogram, **labels):
+    """Decorator that observes the duration of every call of a function"""
+    key = histogram._key(labels)
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram._observe(key, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+registry = MetricsRegistry()
+
+GITHUB_FETCH_SECONDS = registry.histogram(
+    'feedback_agent_github_fetch_seconds', 'GitHub raw file and API request duration', ['kind'])
+NOTEBOOK_PARSE_SECONDS = registry.histogram(
+    'feedback_agent_notebook_parse_seconds', 'Notebook parse duration')
+PROMPT_BUILD_SECONDS = registry.histogram(
+    'feedback_agent_prompt_build_seconds', 'Analysis prompt build duration', ['kind'])
+LLM_REQUEST_SECONDS = registry.histogram(
+    'feedback_agent_llm_request_seconds', 'Duration of one LLM provider request', ['provider', 'model', 'outcome'])
+FORMAT_SECONDS = registry.histogram(
+    'feedback_agent_format_seconds', 'OutputFormatter.format_analysis duration')
+MARKDOWN_RENDER_SECONDS = registry.histogram(
+    'feedback_agent_markdown_render_seconds', 'Server-side markdown rendering duration of one chat response')
+CHAT_HISTORY_SECONDS = registry.histogram(
+    'feedback_agent_chat_history_seconds', 'ChatHistory operation duration', ['operation'])
+
+LLM_TOKENS = registry.counter(
+    'feedback_agent_llm_tokens_total', 'Tokens reported by the LLM providers', ['provider', 'model', 'type'])
+ANALYSIS_CACHE_REQUESTS = registry.counter(
+    'feedback_agent_analysis_cache_requests_total', 'Analysis cache lookups', ['result'])
+FALLBACK_RESPONSES = registry.counter(
+    'feedback_agent_fallback_responses_total', 'Analyses answered with the fallback ANALYSIS_TEMPLATE')
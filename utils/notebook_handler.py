@@ -1,123 +1,117 @@
 import nbformat
 import re
+from config.settings import NOTEBOOK_OUTPUT_MAX_CHARS
+from utils.notebook_stream import iter_notebook_cells
+from analyzers.static_analyzer import default_static_analyzer
+from utils.metrics import NOTEBOOK_PARSE_SECONDS, timed
 
 class NotebookHandler:
-    def __init__(self):
+    def __init__(self, static_analyzer=None):
         """Initialize NotebookHandler"""
-        self.known_imports = set([
-            'pandas', 'numpy', 'matplotlib', 'seaborn', 'sklearn', 'tensorflow',
-            'torch', 'keras', 'scipy', 'requests', 'beautifulsoup4', 'flask',
-            'django', 'sqlalchemy', 'pytest', 'unittest', 'os', 'sys', 'json',
-            'csv', 'random', 'datetime', 'time', 'math', 're', 'collections'
-        ])
+        self.static_analyzer = static_analyzer or default_static_analyzer
 
+    @timed(NOTEBOOK_PARSE_SECONDS)
     def extract_notebook_code(self, notebook_content):
         """Extract code and markdown content from notebook"""
         try:
-            notebook = nbformat.reads(notebook_content, as_version=4)
-            code_content = []
-            markdown_content = []
-            imports = set()
-            
-            current_section = None
-            section_content = []
-            
-            for cell in notebook.cells:
-                # Markdown hücrelerini işle
-                if cell.cell_type == "markdown":
-                    markdown_text = cell.source.strip()
-                    if markdown_text:
-                        # Yeni bir bölüm başlığı mı kontrol et
-                        header_match = re.match(r'^#+ (.+)', markdown_text)
-                        if header_match:
-                            # Önceki bölümü kaydet
-                            if current_section and section_content:
-                                markdown_content.append({
-                                    'section': current_section,
-                                    'content': '\n'.join(section_content)
-                                })
-                            # Yeni bölümü başlat
-                            current_section = header_match.group(1).strip()
-                            section_content = [markdown_text]
-                        else:
-                            if current_section:
-                                section_content.append(markdown_text)
-                            else:
-                                markdown_content.append({
-                                    'section': 'General',
-                                    'content': markdown_text
-                                })
-
-                # Kod hücrelerini işle
-                elif cell.cell_type == "code":
-                    code_text = cell.source.strip()
-                    if code_text:
-                        # Import ifadelerini tespit et
-                        imports.update(self._extract_imports(code_text))
-                        
-                        # Hücre çıktılarını kontrol et
-                        outputs = []
-                        if hasattr(cell, 'outputs'):
-                            for output in cell.outputs:
-                                if output.get('output_type') == 'error':
-                                    # Hata varsa kaydet
-                                    outputs.append({
-                                        'type': 'error',
-                                        'content': output.get('traceback', [''])[0]
-                                    })
-                                elif output.get('output_type') == 'stream':
-                                    # Print çıktılarını kaydet
-                                    outputs.append({
-                                        'type': 'stream',
-                                        'content': output.get('text', '')
-                                    })
-                        
-                        code_content.append({
-                            'code': code_text,
-                            'outputs': outputs
-                        })
-
-            # Son bölümü ekle
-            if current_section and section_content:
-                markdown_content.append({
-                    'section': current_section,
-                    'content': '\n'.join(section_content)
-                })
-
-            # Markdown içeriğini analiz et
-            documentation = self._analyze_markdown_content(markdown_content)
-            
-            return {
-                'code': '\n\n'.join(cell['code'] for cell in code_content),
-                'code_cells': code_content,
-                'markdown_content': markdown_content,
-                'documentation': documentation,
-                'imports': list(imports),
-                'has_errors': any(any(output['type'] == 'error' for output in cell['outputs']) 
-                                for cell in code_content),
-                'cell_count': {
-                    'code': len(code_content),
-                    'markdown': len(markdown_content)
-                }
-            }
+            # Akış halinde ayrıştırma: görseller ve büyük çıktılar belleğe alınmadan atlanır
+            return self._extract_from_cells(iter_notebook_cells(notebook_content))
+        except ValueError:
+            pass
 
+        # Eski sürüm veya standart dışı notebook'lar için nbformat ile tam ayrıştırma
+        try:
+            notebook = nbformat.reads(notebook_content, as_version=4)
+            return self._extract_from_cells(notebook.cells)
         except Exception as e:
             raise Exception(f"Notebook içeriği işlenirken hata oluştu: {str(e)}")
 
-    def _extract_imports(self, code):
-        """Extract imported libraries from code"""
-        imports = set()
+    def _extract_from_cells(self, cells):
+        """Build the notebook dict from an iterable of cell dicts"""
+        code_content = []
+        markdown_content = []
         
-        # import x pattern
-        import_matches = re.findall(r'import\s+(\w+)', code)
-        imports.update(import_matches)
+        current_section = None
+        section_content = []
         
-        # from x import y pattern
-        from_matches = re.findall(r'from\s+(\w+)\s+import', code)
-        imports.update(from_matches)
+        for cell in cells:
+            # Markdown hücrelerini işle
+            if cell['cell_type'] == "markdown":
+                markdown_text = cell['source'].strip()
+                if markdown_text:
+                    # Yeni bir bölüm başlığı mı kontrol et
+                    header_match = re.match(r'^#+ (.+)', markdown_text)
+                    if header_match:
+                        # Önceki bölümü kaydet
+                        if current_section and section_content:
+                            markdown_content.append({
+                                'section': current_section,
+                                'content': '\n'.join(section_content)
+                            })
+                        # Yeni bölümü başlat
+                        current_section = header_match.group(1).strip()
+                        section_content = [markdown_text]
+                    else:
+                        if current_section:
+                            section_content.append(markdown_text)
+                        else:
+                            markdown_content.append({
+                                'section': 'General',
+                                'content': markdown_text
+                            })
+
+            # Kod hücrelerini işle
+            elif cell['cell_type'] == "code":
+                code_text = cell['source'].strip()
+                if code_text:
+                    # Hücre çıktılarını kontrol et
+                    outputs = []
+                    for output in cell.get('outputs', []):
+                        if output.get('output_type') == 'error':
+                            # Hata varsa kaydet
+                            outputs.append({
+                                'type': 'error',
+                                'content': (output.get('traceback') or [''])[0]
+                            })
+                        elif output.get('output_type') == 'stream':
+                            # Print çıktılarını kaydet (uzun çıktılar kısaltılır)
+                            outputs.append({
+                                'type': 'stream',
+                                'content': output.get('text', '')[:NOTEBOOK_OUTPUT_MAX_CHARS]
+                            })
+                    
+                    code_content.append({
+                        'code': code_text,
+                        'outputs': outputs,
+                        'section': current_section or 'General'
+                    })
+
+        # Son bölümü ekle
+        if current_section and section_content:
+            markdown_content.append({
+                'section': current_section,
+                'content': '\n'.join(section_content)
+            })
+
+        # Markdown içeriğini analiz et
+        documentation = self._analyze_markdown_content(markdown_content)
+
+        # Import ifadeleri tüm hücreler üzerinde tek bir AST geçişiyle bulunur
+        imports = self.static_analyzer.analyze_cells(code_content)['imports']
         
-        # Sadece bilinen kütüphaneleri döndür
-        return {imp for imp in imports if imp in self.known_imports}
+        return {
+            'code': '\n\n'.join(cell['code'] for cell in code_content),
+            'code_cells': code_content,
+            'markdown_content': markdown_content,
+            'documentation': documentation,
+            'imports': imports,
+            'has_errors': any(any(output['type'] == 'error' for output in cell['outputs']) 
+                            for cell in code_content),
+            'cell_count': {
+                'code': len(code_content),
+                'markdown': len(markdown_content)
+            }
+        }
 
     def _analyze_markdown_content(self, markdown_cells):
         """Analyze markdown content for documentation"""
@@ -167,38 +161,21 @@ class NotebookHandler:
 
     def get_code_summary(self, code_cells):
         """Generate a summary of the code content"""
-        summary = {
-            'total_lines': 0,
-            'has_functions': False,
-            'has_classes': False,
+        metrics = self.static_analyzer.analyze_cells(code_cells)
+        return {
+            'total_lines': metrics['lines'],
+            'has_functions': bool(metrics['functions']),
+            'has_classes': bool(metrics['classes']),
             'complexity_indicators': {
-                'nested_loops': 0,
-                'conditional_statements': 0,
-                'function_definitions': 0,
-                'class_definitions': 0
+                'nested_loops': metrics['nested_loops'],
+                'conditional_statements': metrics['conditionals'],
+                'function_definitions': len(metrics['functions']),
+                'class_definitions': len(metrics['classes']),
+                'cyclomatic_complexity': metrics['complexity'],
+                'max_nesting': metrics['max_nesting']
             }
         }
 
-        for cell in code_cells:
-            code = cell['code']
-            # Satır sayısı
-            summary['total_lines'] += len(code.split('\n'))
-            
-            # Fonksiyon ve sınıf kontrolü
-            if 'def ' in code:
-                summary['has_functions'] = True
-                summary['complexity_indicators']['function_definitions'] += len(re.findall(r'\bdef\s+\w+', code))
-            
-            if 'class ' in code:
-                summary['has_classes'] = True
-                summary['complexity_indicators']['class_definitions'] += len(re.findall(r'\bclass\s+\w+', code))
-            
-            # Karmaşıklık göstergeleri
-            summary['complexity_indicators']['nested_loops'] += len(re.findall(r'\bfor\b.*\bfor\b|\bwhile\b.*\bwhile\b', code))
-            summary['complexity_indicators']['conditional_statements'] += len(re.findall(r'\bif\b|\belif\b|\belse\b', code))
-
-        return summary
-
     def is_notebook_organized(self, markdown_cells, code_cells):
         """Check if the notebook is well-organized"""
         return {
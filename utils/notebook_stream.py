@@ -0,0 +1,205 @@
+import json
+import re
+from config.settings import NOTEBOOK_OUTPUT_MAX_CHARS
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r'[ \t\n\r]*')
+_structural = re.compile(r'[{}\[\]"]')
+
+def _skip_ws(text, pos):
+    return _whitespace.match(text, pos).end()
+
+def _expect(text, pos, char):
+    pos = _skip_ws(text, pos)
+    if text[pos:pos + 1] != char:
+        raise ValueError(f"Beklenen '{char}', bulunan {text[pos:pos + 20]!r} (konum {pos})")
+    return pos + 1
+
+def _skip_string(text, pos):
+    """Return the position after the string starting at pos without decoding it"""
+    end = pos + 1
+    while True:
+        end = text.find('"', end)
+        if end < 0:
+            raise ValueError("Notebook JSON'u beklenmedik şekilde bitti")
+        # Tırnaktan önce çift sayıda ters bölü varsa tırnak kaçışlı değildir
+        backslash = end - 1
+        while text[backslash] == '\\':
+            backslash -= 1
+        if (end - 1 - backslash) % 2 == 0:
+            return end + 1
+        end += 1
+
+def _skip_value(text, pos):
+    """Skip a JSON value without building it; large strings (e.g. base64 images) are never decoded"""
+    pos = _skip_ws(text, pos)
+    char = text[pos:pos + 1]
+    if char == '"':
+        return _skip_string(text, pos)
+    if char not in ('{', '['):
+        return _decoder.raw_decode(text, pos)[1]
+
+    depth = 0
+    while True:
+        match = _structural.search(text, pos)
+        if not match:
+            raise ValueError("Notebook JSON'u beklenmedik şekilde bitti")
+        char = match.group()
+        if char == '"':
+            pos = _skip_string(text, match.start())
+            continue
+        pos = match.end()
+        if char in ('{', '['):
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return pos
+
+def _iter_members(text, pos):
+    """Yield (key, value_position) for each member of the object at pos; the caller consumes the value
+    and sends back the position after it"""
+    pos = _expect(text, pos, '{')
+    pos = _skip_ws(text, pos)
+    if text[pos:pos + 1] == '}':
+        return pos + 1
+
+    while True:
+        key, pos = _decoder.raw_decode(text, _skip_ws(text, pos))
+        pos = _expect(text, pos, ':')
+        pos = yield key, _skip_ws(text, pos)
+        pos = _skip_ws(text, pos)
+        if text[pos:pos + 1] == '}':
+            return pos + 1
+        pos = _expect(text, pos, ',')
+
+def _iter_elements(text, pos):
+    """Yield the position of each element of the array at pos; the caller sends back the end position"""
+    pos = _expect(text, pos, '[')
+    pos = _skip_ws(text, pos)
+    if text[pos:pos + 1] == ']':
+        return pos + 1
+
+    while True:
+        pos = yield _skip_ws(text, pos)
+        pos = _skip_ws(text, pos)
+        if text[pos:pos + 1] == ']':
+            return pos + 1
+        pos = _expect(text, pos, ',')
+
+def _drive(generator, handle):
+    """Run a member/element generator, letting handle(item) consume each value and return its end"""
+    try:
+        item = next(generator)
+        while True:
+            item = generator.send(handle(item))
+    except StopIteration as stop:
+        return stop.value
+
+def _read_text(text, pos, max_chars):
+    """Read a string or list-of-strings value, keeping at most max_chars characters"""
+    if text[pos:pos + 1] != '[':
+        value, end = _decoder.raw_decode(text, pos)
+        return value[:max_chars], end
+
+    parts = []
+    size = 0
+
+    def handle(element_pos):
+        nonlocal size
+        if size >= max_chars:
+            return _skip_value(text, element_pos)
+        value, end = _decoder.raw_decode(text, element_pos)
+        parts.append(value[:max_chars - size])
+        size += len(parts[-1])
+        return end
+
+    end = _drive(_iter_elements(text, pos), handle)
+    return ''.join(parts), end
+
+def _read_first(text, pos):
+    """Read only the first element of an array value"""
+    first = []
+
+    def handle(element_pos):
+        if first:
+            return _skip_value(text, element_pos)
+        value, end = _decoder.raw_decode(text, element_pos)
+        first.append(value)
+        return end
+
+    end = _drive(_iter_elements(text, pos), handle)
+    return first, end
+
+def _read_output(text, pos, max_chars):
+    """Read an output object, skipping data/metadata payloads such as base64 images"""
+    output = {}
+
+    def handle(member):
+        key, value_pos = member
+        if key in ('output_type', 'name', 'ename', 'evalue'):
+            output[key], end = _decoder.raw_decode(text, value_pos)
+        elif key == 'text':
+            output[key], end = _read_text(text, value_pos, max_chars)
+        elif key == 'traceback':
+            output[key], end = _read_first(text, value_pos)
+        else:
+            end = _skip_value(text, value_pos)
+        return end
+
+    return output, _drive(_iter_members(text, pos), handle)
+
+def _read_cell(text, pos, max_chars):
+    cell = {'cell_type': None, 'source': '', 'outputs': []}
+
+    def handle_output(element_pos):
+        output, end = _read_output(text, element_pos, max_chars)
+        cell['outputs'].append(output)
+        return end
+
+    def handle(member):
+        key, value_pos = member
+        if key == 'cell_type':
+            cell[key], end = _decoder.raw_decode(text, value_pos)
+        elif key == 'source':
+            cell[key], end = _read_text(text, value_pos, len(text))
+        elif key == 'outputs':
+            end = _drive(_iter_elements(text, value_pos), handle_output)
+        else:
+            end = _skip_value(text, value_pos)
+        return end
+
+    return cell, _drive(_iter_members(text, pos), handle)
+
+def iter_notebook_cells(content, max_output_chars=NOTEBOOK_OUTPUT_MAX_CHARS):
+    """Lazily yield the cells of a v4 notebook as plain dicts without parsing the whole document.
+
+    Only cell_type, source and the text/traceback of outputs are decoded; everything else is
+    skipped in place. Raises ValueError for malformed or pre-v4 notebooks.
+    """
+    members = _iter_members(content, 0)
+    end = None
+    try:
+        key, value_pos = next(members)
+        while True:
+            if key == 'cells':
+                elements = _iter_elements(content, value_pos)
+                try:
+                    element_pos = next(elements)
+                    while True:
+                        cell, cell_end = _read_cell(content, element_pos, max_output_chars)
+                        yield cell
+                        element_pos = elements.send(cell_end)
+                except StopIteration as stop:
+                    end = stop.value
+            elif key == 'worksheets':
+                raise ValueError("nbformat 4 öncesi notebook")
+            elif key == 'nbformat':
+                major, end = _decoder.raw_decode(content, value_pos)
+                if major < 4:
+                    raise ValueError("nbformat 4 öncesi notebook")
+            else:
+                end = _skip_value(content, value_pos)
+            key, value_pos = members.send(end)
+    except StopIteration:
+        pass